@@ -0,0 +1,179 @@
+"""Persistent AniList relation graph.
+
+Media nodes (with all their relation edges) are fetched in batches — several
+aliased Media queries per GraphQL request, each also returning its neighbours'
+edges — and stored in the anilist_media table. PREQUEL/SEQUEL chain walks then
+resolve from the local graph; the network is only used for nodes we have not
+seen (or that are older than _NODE_TTL).
+"""
+import logging
+import time
+import orjson
+from app.db import execute, execute_batch
+from app.utils.lru import ByteLRU
+from app.utils.http_sessions import http_session
+from app.utils.negative_cache import UpstreamUnavailable
+
+ANILIST_URL = "https://graphql.anilist.co"
+_NODE_TTL = 86400 * 3  # 3 days (new sequels get announced on the last node)
+_BATCH_SIZE = 4  # aliased Media queries per request
+_mem_cache = ByteLRU(2 * 1024 * 1024, 'anilist')  # anilist_id -> node
+_stats = {'requests': 0, 'nodes_fetched': 0, 'local_hits': 0}
+
+# Node edges also carry the neighbour's own edges, so one request advances two hops
+_MEDIA_FIELDS = '''
+    id idMal format type
+    relations { edges { relationType node {
+        id idMal format type
+        relations { edges { relationType node { id idMal format type } } }
+    } } }
+'''
+_MEDIA_FIELDS_FLAT = '''
+    id idMal format type
+    relations { edges { relationType node { id idMal format type } } }
+'''
+
+
+def anilist_graph_stats() -> dict:
+    return {**_stats, 'mem': _mem_cache.stats()}
+
+
+def _to_node(media: dict) -> dict:
+    """Compact node: {'id', 'mal', 'format', 'type', 'edges': [[relation, id, mal, format, type], ...]}"""
+    edges = []
+    for edge in (media.get('relations') or {}).get('edges') or []:
+        n = edge.get('node') or {}
+        if n.get('id'):
+            edges.append([edge.get('relationType'), n['id'], n.get('idMal'), n.get('format'), n.get('type')])
+    return {
+        'id': media['id'], 'mal': media.get('idMal'), 'format': media.get('format'),
+        'type': media.get('type'), 'edges': edges, 'ts': int(time.time()),
+    }
+
+
+async def _load_nodes(anilist_ids: list[int] = None, mal_id: int = None) -> dict[int, dict]:
+    """Fresh nodes from memory/DB, keyed by AniList ID."""
+    now = time.time()
+    found = {}
+    if anilist_ids:
+        missing = []
+        for aid in anilist_ids:
+            node = _mem_cache.get(aid)
+            if node and now - node['ts'] < _NODE_TTL:
+                found[aid] = node
+            else:
+                missing.append(aid)
+        if not missing:
+            return found
+        placeholders = ','.join('?' * len(missing))
+        rows = await execute(f"SELECT node FROM anilist_media WHERE anilist_id IN ({placeholders})", tuple(missing))
+    else:
+        rows = await execute("SELECT node FROM anilist_media WHERE mal_id=?", (int(mal_id),))
+    for row in rows or []:
+        node = orjson.loads(row['node'])
+        if now - node['ts'] < _NODE_TTL:
+            _mem_cache[node['id']] = node
+            found[node['id']] = node
+    return found
+
+
+async def _store_nodes(nodes: list[dict]):
+    if not nodes:
+        return
+    for node in nodes:
+        _mem_cache[node['id']] = node
+    await execute_batch([
+        ("INSERT OR REPLACE INTO anilist_media (anilist_id, mal_id, node, timestamp) VALUES (?,?,?,?)",
+         (node['id'], node['mal'], orjson.dumps(node).decode(), node['ts']))
+        for node in nodes
+    ])
+
+
+async def _fetch_batch(keys: list[tuple[str, int]], nested: bool = True) -> list[dict]:
+    """Fetch Media for [('id'|'idMal', value), ...] in one aliased request; returns stored nodes."""
+    fields = _MEDIA_FIELDS if nested else _MEDIA_FIELDS_FLAT
+    parts = [f"m{i}: Media({kind}: {int(value)}, type: ANIME) {{{fields}}}" for i, (kind, value) in enumerate(keys)]
+    query = "query {" + "\n".join(parts) + "}"
+    _stats['requests'] += 1
+    async with http_session('anilist', 15) as session:
+        async with session.post(ANILIST_URL, json={'query': query}) as resp:
+            if resp.status == 429 or resp.status >= 500:
+                raise UpstreamUnavailable(f"AniList HTTP {resp.status}")
+            data = await resp.json(content_type=None) if resp.status in (200, 404) else None
+    if data is None or (data.get('errors') and not data.get('data')):
+        if nested:
+            # Too complex for the API limit — retry without neighbour edges
+            logging.info(f"[AniList] nested batch of {len(keys)} rejected, retrying flat")
+            return await _fetch_batch(keys, nested=False)
+        return []
+
+    nodes = {}
+    for media in (data.get('data') or {}).values():
+        if not media:
+            continue  # unknown ID (AniList answers null for the alias)
+        nodes[media['id']] = _to_node(media)
+        if nested:
+            for edge in (media.get('relations') or {}).get('edges') or []:
+                neighbour = edge.get('node') or {}
+                if neighbour.get('id') and neighbour.get('relations') is not None and neighbour['id'] not in nodes:
+                    nodes[neighbour['id']] = _to_node(neighbour)
+    _stats['nodes_fetched'] += len(nodes)
+    await _store_nodes(list(nodes.values()))
+    return list(nodes.values())
+
+
+async def get_nodes(anilist_ids: list[int]) -> dict[int, dict]:
+    """Nodes by AniList ID; unknown ones are fetched _BATCH_SIZE per request."""
+    found = await _load_nodes(anilist_ids)
+    missing = [aid for aid in anilist_ids if aid not in found]
+    _stats['local_hits'] += len(found)
+    for i in range(0, len(missing), _BATCH_SIZE):
+        for node in await _fetch_batch([('id', aid) for aid in missing[i:i + _BATCH_SIZE]]):
+            if node['id'] in missing:
+                found[node['id']] = node
+    return found
+
+
+async def get_node_by_mal(mal_id: int) -> dict | None:
+    local = await _load_nodes(mal_id=mal_id)
+    if local:
+        _stats['local_hits'] += 1
+        return next(iter(local.values()))
+    for node in await _fetch_batch([('idMal', mal_id)]):
+        if node['mal'] == int(mal_id):
+            return node
+    return None
+
+
+def _next_tv(node: dict, relation: str, visited: set) -> list | None:
+    """First TV-format ANIME edge of the given relation type not yet visited."""
+    for edge in node['edges']:
+        rel, aid, _, fmt, typ = edge
+        if rel == relation and typ == 'ANIME' and fmt == 'TV' and aid not in visited:
+            return edge
+    return None
+
+
+async def walk_tv_chain(mal_id: int, relation: str, max_steps: int) -> list[dict]:
+    """Follow PREQUEL or SEQUEL TV edges from a MAL ID.
+
+    Returns [{'anilist_id', 'mal_id', 'steps'}, ...] closest first. Only nodes
+    missing from the local graph cost a request; one request covers two hops.
+    """
+    node = await get_node_by_mal(int(mal_id))
+    if not node:
+        return []
+    results = []
+    visited = {node['id']}
+    while len(results) < max_steps:
+        edge = _next_tv(node, relation, visited)
+        if not edge:
+            break
+        visited.add(edge[1])
+        results.append({'anilist_id': edge[1], 'mal_id': edge[2], 'steps': len(results) + 1})
+        if len(results) >= max_steps:
+            break
+        node = (await get_nodes([edge[1]])).get(edge[1])
+        if not node:
+            break
+    return results
@@ -1,11 +1,55 @@
 import logging
+import time
 import aiohttp
+import orjson
 from urllib.parse import urlencode, quote
 from datetime import datetime
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+from config import Config
+from app.utils.http_sessions import http_session
+from app.utils.lru import ByteLRU
+from app.utils.single_flight import single_flight
 
 BASE_URL = "https://api.docchi.pl/v1"
 TIMEOUT = 30
 
+# Response cache TTL per endpoint (seconds); 0 = not cached
+_ENDPOINT_TTLS = {
+    'details': 21600,  # 6 hours (series/find)
+    'related': 21600,  # 6 hours (series/related — slug lookups)
+    'episodes_count': 3600,  # 1 hour
+    'players': 600,  # 10 min
+    'category': 3600,  # 1 hour
+    'list': 3600,  # 1 hour
+    'latest': 300,  # 5 min
+    'recent': 300,  # 5 min
+    'trending': 600,  # 10 min
+    'season': 1800,  # 30 min
+}
+_NEGATIVE_TTL = 1800  # 30 min for 404s
+_PERSIST_MIN_TTL = 3600  # only endpoints cached >= 1h are written to the DB
+_cache = ByteLRU(8 * 1024 * 1024, 'docchi')  # url -> (status, body JSON bytes, expires_at)
+_stats: dict[str, dict[str, int]] = {}  # endpoint -> {'hits', 'misses', 'negative_hits'}
+
+
+def docchi_cache_stats() -> dict:
+    """Per-endpoint hit/miss counters and hit ratio of the Docchi response cache."""
+    result = {}
+    for endpoint, counts in _stats.items():
+        lookups = counts['hits'] + counts['negative_hits'] + counts['misses']
+        result[endpoint] = {
+            **counts,
+            'hit_ratio': round((counts['hits'] + counts['negative_hits']) / lookups, 3) if lookups else None,
+        }
+    return {'endpoints': result, 'mem': _cache.stats()}
+
+
+def _not_found(url: str) -> aiohttp.ClientResponseError:
+    """Recreate the error raise_for_status() gives for a 404, for negative cache hits."""
+    request_info = aiohttp.RequestInfo(URL(url), 'GET', CIMultiDictProxy(CIMultiDict()), URL(url))
+    return aiohttp.ClientResponseError(request_info, (), status=404, message='Not Found (cached)')
+
 
 class DocchiAPI:
     """
@@ -18,18 +62,54 @@ class DocchiAPI:
         """
         # Don't create session in __init__
 
-    async def _make_request(self, url: str):
-        """Make HTTP request with proper session management"""
-        timeout = aiohttp.ClientTimeout(total=TIMEOUT)
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=10)
-        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+    async def _make_request(self, url: str, endpoint: str = None):
+        """Make HTTP request, served from the per-endpoint TTL cache when possible.
+
+        404s are cached as negative entries and re-raised as ClientResponseError,
+        so callers see the same behaviour as an uncached request. Bodies are kept
+        as JSON bytes and decoded per call, so every caller gets its own object.
+        """
+        ttl = _ENDPOINT_TTLS.get(endpoint, 0)
+        if not ttl:
+            return await self._fetch(url)
+
+        counts = _stats.setdefault(endpoint, {'hits': 0, 'misses': 0, 'negative_hits': 0})
+        entry = _cache.get(url)
+        if entry is None and ttl >= _PERSIST_MIN_TTL and Config.DOCCHI_CACHE_DB:
+            entry = await _load_persisted(url)
+        if entry is not None and entry[2] > time.time():
+            status, body, _ = entry
+            if status == 404:
+                counts['negative_hits'] += 1
+                raise _not_found(url)
+            counts['hits'] += 1
+            return orjson.loads(body)
+
+        counts['misses'] += 1
+        return orjson.loads(await single_flight('docchi', url, lambda: self._fetch_and_cache(url, ttl)))
+
+    async def _fetch_and_cache(self, url: str, ttl: int) -> bytes:
+        try:
+            body = await self._fetch(url)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                await _store(url, 404, None, _NEGATIVE_TTL, persist=ttl >= _PERSIST_MIN_TTL)
+            raise
+        raw = orjson.dumps(body)
+        await _store(url, 200, raw, ttl, persist=ttl >= _PERSIST_MIN_TTL)
+        return raw
+
+    @staticmethod
+    async def _fetch(url: str):
+        """Make HTTP request over the shared Docchi session (keep-alive across calls)"""
+        async with http_session('docchi', TIMEOUT) as session:
             async with session.get(url) as resp:
                 resp.raise_for_status()
                 return await resp.json(content_type=None)
 
     async def close(self):
         """Close the session"""
-        pass  # No session to close
+        pass  # Shared session is closed by close_sessions() on shutdown
 
     async def get_anime_details(self, slug: str):
         """
@@ -41,7 +121,7 @@ class DocchiAPI:
             raise Exception("A Valid Anime slug Must Be Provided")
 
         url = f'{BASE_URL}/series/find/{slug}'
-        return await self._make_request(url)
+        return await self._make_request(url, 'details')
 
     async def get_episode_players(self, slug: str, episode: int):
         """
@@ -55,7 +135,7 @@ class DocchiAPI:
 
         try:
             url = f'{BASE_URL}/episodes/find/{slug}/{episode}'
-            return await self._make_request(url)
+            return await self._make_request(url, 'players')
         except aiohttp.ClientError:
             return None
 
@@ -69,7 +149,7 @@ class DocchiAPI:
             raise Exception("A Valid mal id Must Be Provided")
 
         url = f'{BASE_URL}/series/related/{mal_id}'
-        related_items = await self._make_request(url)
+        related_items = await self._make_request(url, 'related')
         for item in related_items:
             if item['mal_id'] == int(mal_id):
                 return item['slug']
@@ -101,7 +181,7 @@ class DocchiAPI:
         :return: JSON response
         """
         url = f'{BASE_URL}/episodes/count/{slug}'
-        return await self._make_request(url)
+        return await self._make_request(url, 'episodes_count')
 
     async def search_anime(self, name: str):
         """
@@ -113,7 +193,7 @@ class DocchiAPI:
             raise Exception("A valid search string Must Be Provided")
 
         url = f'{BASE_URL}/series/related/{quote(name)}'
-        return await self._make_request(url)
+        return await self._make_request(url, 'related')
 
     async def get_anime_by_genre(self, genre: str):
         """
@@ -126,7 +206,7 @@ class DocchiAPI:
 
         url = f'{BASE_URL}/series/category?name={genre}&sort=DESC'
         try:
-            return await self._make_request(url)
+            return await self._make_request(url, 'category')
         except aiohttp.ClientError as e:
             logging.error(f"Docchi API error (genre): {e}")
             return []
@@ -141,7 +221,7 @@ class DocchiAPI:
         query_params = self.__to_query_string(kwargs)
         if query_params:
             url += f'?{query_params}'
-        return await self._make_request(url)
+        return await self._make_request(url, 'list')
 
     async def get_latest_episodes(self, season: str = None, year: str = None, **kwargs):
         """
@@ -160,7 +240,7 @@ class DocchiAPI:
             url += f'&{query_params}' if '?' in url else f'?{query_params}'
 
         try:
-            return await self._make_request(url)
+            return await self._make_request(url, 'latest')
         except aiohttp.ClientError as e:
             logging.error(f"Docchi API error (latest): {e}")
             return []
@@ -176,7 +256,7 @@ class DocchiAPI:
             season, year = self.get_current_season()
         url = f'{BASE_URL}/episodes/recent?season_year={year}&season={season}'
         try:
-            return await self._make_request(url)
+            return await self._make_request(url, 'recent')
         except aiohttp.ClientError as e:
             logging.error(f"Docchi API error (recent): {e}")
             return []
@@ -193,7 +273,7 @@ class DocchiAPI:
             url += f'?{query_params}'
 
         try:
-            return await self._make_request(url)
+            return await self._make_request(url, 'trending')
         except aiohttp.ClientError as e:
             logging.error(f"Docchi API error (trending): {e}")
             return []
@@ -212,7 +292,7 @@ class DocchiAPI:
             url += f'&{query_params}'
 
         try:
-            return await self._make_request(url)
+            return await self._make_request(url, 'season')
         except aiohttp.ClientError as e:
             logging.error(f"Docchi API error (seasonal): {e}")
             return []
@@ -226,3 +306,34 @@ class DocchiAPI:
         """
         data = dict(**kwargs)
         return urlencode(data) if data else None
+
+
+async def _load_persisted(url: str):
+    """Read a persisted response into L1; returns (status, body, expires_at) or None."""
+    from app.db import execute
+    try:
+        rows = await execute("SELECT status, body, expires_at FROM docchi_cache WHERE url=?", (url,))
+    except Exception as e:
+        logging.warning(f"[DocchiCache] DB read failed: {e}")
+        return None
+    if not rows or rows[0]['expires_at'] <= time.time():
+        return None
+    raw = rows[0]['body'].encode() if rows[0]['body'] else None
+    entry = (rows[0]['status'], raw, rows[0]['expires_at'])
+    _cache.put(url, entry, size=len(raw or b''))
+    return entry
+
+
+async def _store(url: str, status: int, raw: bytes | None, ttl: int, persist: bool):
+    expires_at = int(time.time()) + ttl
+    _cache.put(url, (status, raw, expires_at), size=len(raw or b''))
+    if not (persist and Config.DOCCHI_CACHE_DB):
+        return
+    from app.db import execute
+    try:
+        await execute(
+            "INSERT OR REPLACE INTO docchi_cache (url, status, body, expires_at) VALUES (?,?,?,?)",
+            (url, status, raw.decode() if raw is not None else None, expires_at)
+        )
+    except Exception as e:
+        logging.warning(f"[DocchiCache] DB write failed: {e}")
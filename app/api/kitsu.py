@@ -1,19 +1,30 @@
 import re
+import asyncio
+import logging
+import time
 import aiohttp
+import orjson
 from datetime import datetime, timedelta
+from config import Config
 from app.utils.common_utils import get_fanart_images
 from app.utils.anime_mapping import get_mal_id_from_kitsu_id, get_slug_from_mal_id
+from app.utils.http_sessions import http_session
+from app.utils.lru import ByteLRU
 
 BASE_URL = "https://kitsu.io/api/edge"
 TIMEOUT = aiohttp.ClientTimeout(total=5)
 INCLUDES = "genres,episodes,mediaRelationships.destination"
+BULK_FIELDS = "subtype,episodeCount,posterImage,coverImage,averageRating,youtubeVideoId"
+_BULK_PAGE = 20  # Kitsu's page[limit] maximum
+_attr_cache = ByteLRU(2 * 1024 * 1024, 'kitsu')  # kitsu_id -> (attrs | None, expires_at)
+_bulk_stats = {'hits': 0, 'misses': 0, 'requests': 0}
 
 
 async def get_anime_meta(kitsu_id: str, mal_id: str = None, imdb_id: str = None, tvdb_id: int = None, tmdb_id: int = None) -> dict | None:
     """Fetch full anime metadata from Kitsu API and return in kitsu_to_meta-compatible format."""
     url = f"{BASE_URL}/anime/{kitsu_id}"
     params = {"include": INCLUDES}
-    async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+    async with http_session('kitsu', TIMEOUT) as session:
         async with session.get(url, params=params) as resp:
             if resp.status != 200:
                 return None
@@ -84,7 +95,7 @@ async def get_anime_meta(kitsu_id: str, mal_id: str = None, imdb_id: str = None,
         dest_attrs = dest.get("attributes", {})
         dest_kitsu_id = dest.get("id")
         title = dest_attrs.get("canonicalTitle", dest_kitsu_id)
-        dest_mal_id = get_mal_id_from_kitsu_id(dest_kitsu_id)
+        dest_mal_id = await get_mal_id_from_kitsu_id(dest_kitsu_id)
         dest_id = f"mal:{dest_mal_id}" if dest_mal_id else f"kitsu:{dest_kitsu_id}"
         franchise_links.append({
             "name": f"{role.capitalize()}: {title}",
@@ -220,3 +231,112 @@ def _clean_desc(text: str | None) -> str | None:
     if not text:
         return None
     return re.sub(r'\n+(?:[(\[].+[)\]\n]|Source:.*)?(?:\n+Note(.|\n)+)?$', '', text) or None
+
+
+def kitsu_bulk_stats() -> dict:
+    return {**_bulk_stats, 'mem': _attr_cache.stats()}
+
+
+def _compact_attrs(attrs: dict) -> dict:
+    """Keep only the bulk fields (posters trimmed to the sizes we use)."""
+    poster = attrs.get("posterImage") or {}
+    cover = attrs.get("coverImage") or {}
+    return {
+        "subtype": attrs.get("subtype"),
+        "episodeCount": attrs.get("episodeCount"),
+        "posterImage": {k: poster[k] for k in ("large", "medium", "original") if poster.get(k)},
+        "coverImage": {"original": cover["original"]} if cover.get("original") else {},
+        "averageRating": attrs.get("averageRating"),
+        "youtubeVideoId": attrs.get("youtubeVideoId"),
+    }
+
+
+async def _fetch_attr_chunk(session, kitsu_ids: list[str]) -> dict[str, dict] | None:
+    """One filter[id] query (following pagination); None on failure."""
+    found = {}
+    url = f"{BASE_URL}/anime"
+    params = {"filter[id]": ",".join(kitsu_ids), "fields[anime]": BULK_FIELDS, "page[limit]": str(_BULK_PAGE)}
+    while url:
+        _bulk_stats['requests'] += 1
+        async with session.get(url, params=params, headers={"Accept": "application/vnd.api+json"}) as resp:
+            if resp.status != 200:
+                return None
+            raw = await resp.json(content_type=None)
+        for item in raw.get("data") or []:
+            found[str(item.get("id"))] = _compact_attrs(item.get("attributes") or {})
+        url = (raw.get("links") or {}).get("next")
+        params = None  # the next link carries the query
+    return found
+
+
+async def get_anime_attributes(kitsu_ids: list) -> dict[str, dict]:
+    """Bulk subtype/episodeCount/poster/cover/rating/trailer for many Kitsu IDs.
+
+    Served from memory and the kitsu_cache table first; the rest is fetched
+    with filter[id] queries of _BULK_PAGE IDs each, run concurrently. IDs
+    Kitsu does not return are cached as missing. Returns {kitsu_id: attrs}
+    for the IDs that exist.
+    """
+    from app.db import execute, execute_batch
+    ids = list(dict.fromkeys(str(k) for k in kitsu_ids if k))
+    now = time.time()
+    result, missing = {}, []
+    for kid in ids:
+        entry = _attr_cache.get(kid)
+        if entry and entry[1] > now:
+            if entry[0] is not None:
+                result[kid] = entry[0]
+        else:
+            missing.append(kid)
+
+    if missing:
+        try:
+            placeholders = ",".join("?" * len(missing))
+            rows = await execute(
+                f"SELECT kitsu_id, attrs, expires_at FROM kitsu_cache WHERE kitsu_id IN ({placeholders})",
+                tuple(missing)
+            )
+        except Exception as e:
+            logging.warning(f"[Kitsu] cache read failed: {e}")
+            rows = []
+        for row in rows or []:
+            if row['expires_at'] > now:
+                attrs = orjson.loads(row['attrs']) if row['attrs'] else None
+                _attr_cache[row['kitsu_id']] = (attrs, row['expires_at'])
+                if attrs is not None:
+                    result[row['kitsu_id']] = attrs
+        missing = [kid for kid in missing if (_attr_cache.peek(kid) or (None, 0))[1] <= now]
+
+    _bulk_stats['hits'] += len(ids) - len(missing)
+    _bulk_stats['misses'] += len(missing)
+    if not missing:
+        return result
+
+    chunks = [missing[i:i + _BULK_PAGE] for i in range(0, len(missing), _BULK_PAGE)]
+    try:
+        async with http_session('kitsu', TIMEOUT) as session:
+            fetched = await asyncio.gather(*[_fetch_attr_chunk(session, c) for c in chunks], return_exceptions=True)
+    except Exception as e:
+        logging.warning(f"[Kitsu] bulk fetch failed: {e}")
+        return result
+
+    expires_at = int(now) + Config.KITSU_CACHE_TTL
+    writes = []
+    for chunk, found in zip(chunks, fetched):
+        if not isinstance(found, dict):
+            continue  # failed chunk: not cached, retried next time
+        for kid in chunk:
+            attrs = found.get(kid)
+            _attr_cache[kid] = (attrs, expires_at)
+            if attrs is not None:
+                result[kid] = attrs
+            writes.append((
+                "INSERT OR REPLACE INTO kitsu_cache (kitsu_id, attrs, expires_at) VALUES (?,?,?)",
+                (kid, orjson.dumps(attrs).decode() if attrs is not None else None, expires_at)
+            ))
+    if writes:
+        try:
+            await execute_batch(writes)
+        except Exception as e:
+            logging.warning(f"[Kitsu] cache write failed: {e}")
+    return result
@@ -37,7 +37,7 @@ async def get_anime_meta(mal_id: str) -> dict | None:
         poster = mal_anime.main_picture.large or mal_anime.main_picture.medium
     # background = poster
 
-    ids = get_ids_from_mal_id(mal_id)
+    ids = await get_ids_from_mal_id(mal_id)
     fanart = await get_fanart_images(**{k: v for k, v in ids.items() if k in ('imdb_id', 'tvdb_id', 'tmdb_id')})
     logo = fanart.get('logo')
     background = fanart.get('background') or background
@@ -132,9 +132,9 @@ async def get_anime_meta(mal_id: str) -> dict | None:
 
 async def _fetch_trailer_from_kitsu(kitsu_id: str) -> list:
     """Fetch YouTube trailer ID from Kitsu API."""
-    import aiohttp
+    from app.utils.http_sessions import http_session
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3)) as session:
+        async with http_session('kitsu', 3) as session:
             async with session.get(f"https://kitsu.io/api/edge/anime/{kitsu_id}",
                                    params={"fields[anime]": "youtubeVideoId"}) as resp:
                 if resp.status != 200:
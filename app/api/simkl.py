@@ -1,68 +1,164 @@
-"""Simkl API client for resolving anime ID mappings."""
+"""Simkl API client for resolving anime ID mappings.
+
+Every lookup (MAL -> Simkl ID search, ID details, episode mapping, IMDB -> MAL)
+is cached in the simkl_cache table — including "not found" answers — and in a
+per-process LRU in front of it, with concurrent lookups of the same key
+coalesced. Transient failures (timeouts, 429/5xx) are never cached; lookups
+made with strict=True raise UpstreamUnavailable for them instead of
+returning None, so callers can tell them apart from "not found".
+"""
 import logging
+import time
 import aiohttp
+import orjson
 from config import Config
+from app.db import execute
+from app.utils.http_sessions import http_session
+from app.utils.lru import ByteLRU
+from app.utils.single_flight import single_flight
+from app.utils.negative_cache import UpstreamUnavailable
 
 SIMKL_URL = "https://api.simkl.com"
 TIMEOUT = aiohttp.ClientTimeout(total=10)
+_HEADERS = {"User-Agent": "docchi-stremio/1.0"}
+_mem_cache = ByteLRU(2 * 1024 * 1024, 'simkl')  # cache_key -> (value, expires_at)
+_stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'transient_errors': 0}
 
 
-async def get_ids_from_mal(mal_id: int) -> dict | None:
-    """Resolve all external IDs for an anime by MAL ID via Simkl.
+class _TransientError(Exception):
+    """Upstream failure that says nothing about the title (not cached)."""
 
-    Returns dict with tvdb_id, imdb_id, tmdb_id, tvdb_season, or None if not found.
+
+def simkl_cache_stats() -> dict:
+    return {**_stats, 'mem': _mem_cache.stats()}
+
+
+async def _get_json(session, url: str):
+    """JSON body on 200, None on 404; anything else is transient."""
+    async with session.get(url, headers=_HEADERS) as resp:
+        if resp.status == 404:
+            return None
+        if resp.status != 200:
+            raise _TransientError(f"HTTP {resp.status}")
+        return await resp.json()
+
+
+async def _cached(cache_key: str, fetch, strict: bool = False):
+    """Return the cached value for cache_key, or await fetch() and cache its result.
+
+    fetch() returns the value (None = not found, cached with the same TTL) or
+    raises; exceptions are logged and not cached. They give None, or
+    UpstreamUnavailable when strict.
     """
-    if not Config.SIMKL_CLIENT_ID:
+    now = time.time()
+    entry = _mem_cache.get(cache_key)
+    if entry is None:
+        try:
+            rows = await execute("SELECT value, expires_at FROM simkl_cache WHERE cache_key=?", (cache_key,))
+        except Exception as e:
+            logging.warning(f"[Simkl] cache read failed for {cache_key}: {e}")
+            rows = None
+        if rows:
+            entry = (orjson.loads(rows[0]['value']), rows[0]['expires_at'])
+            _mem_cache[cache_key] = entry
+    if entry is not None and entry[1] > now:
+        _stats['hits' if entry[0] is not None else 'negative_hits'] += 1
+        return entry[0]
+
+    _stats['misses'] += 1
+    try:
+        return await single_flight('simkl', cache_key, lambda: _fetch_and_store(cache_key, fetch))
+    except _TransientError as e:
+        if strict:
+            raise UpstreamUnavailable(f"Simkl {cache_key}: {e}") from e
         return None
 
+
+async def _fetch_and_store(cache_key: str, fetch):
     try:
-        async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
-            # Step 1: Search by MAL ID to get Simkl ID
-            search_url = f"{SIMKL_URL}/search/id?mal={mal_id}&client_id={Config.SIMKL_CLIENT_ID}"
-            async with session.get(search_url, headers={"User-Agent": "docchi-stremio/1.0"}) as resp:
-                if resp.status != 200:
-                    return None
-                results = await resp.json()
+        value = await fetch()
+    except Exception as e:
+        _stats['transient_errors'] += 1
+        logging.warning(f"[Simkl] {cache_key} failed: {e}")
+        if isinstance(e, _TransientError):
+            raise
+        raise _TransientError(f"{type(e).__name__}: {e}") from e
+    expires_at = int(time.time()) + Config.SIMKL_CACHE_TTL
+    value_json = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    _mem_cache.put(cache_key, (value, expires_at), size=len(value_json))
+    try:
+        await execute(
+            "INSERT OR REPLACE INTO simkl_cache (cache_key, value, expires_at) VALUES (?,?,?)",
+            (cache_key, value_json, expires_at)
+        )
+    except Exception as e:
+        logging.warning(f"[Simkl] cache write failed for {cache_key}: {e}")
+    return value
 
-            if not results:
-                return None
 
-            simkl_id = results[0].get("ids", {}).get("simkl")
-            if not simkl_id:
-                return None
+async def _search_mal(mal_id: int, strict: bool = False) -> dict | None:
+    """First /search/id result for a MAL ID (shared by the ID and episode lookups)."""
+    async def fetch():
+        async with http_session('simkl', TIMEOUT) as session:
+            results = await _get_json(
+                session, f"{SIMKL_URL}/search/id?mal={mal_id}&client_id={Config.SIMKL_CLIENT_ID}"
+            )
+        return results[0] if results else None
 
-            # Step 2: Get full details with extended IDs and season info
-            details_url = f"{SIMKL_URL}/anime/{simkl_id}?extended=full&client_id={Config.SIMKL_CLIENT_ID}"
-            async with session.get(details_url, headers={"User-Agent": "docchi-stremio/1.0"}) as resp:
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
+    return await _cached(f"search:mal:{mal_id}", fetch, strict)
 
-            ids = data.get("ids", {})
-            tvdb_id = int(ids["tvdb"]) if ids.get("tvdb") else None
-            imdb_id = ids.get("imdb")
-            tmdb_id = int(ids["tmdb"]) if ids.get("tmdb") else None
-            tvdb_season = data.get("season")  # Simkl provides TVDB season number directly
 
-            if not tvdb_id and not imdb_id and not tmdb_id:
-                return None
+async def _simkl_id_for_mal(mal_id: int, strict: bool = False) -> int | None:
+    result = await _search_mal(mal_id, strict)
+    return (result or {}).get("ids", {}).get("simkl")
 
-            logging.info(
-                f"[Simkl] Resolved mal:{mal_id} -> tvdb:{tvdb_id}, imdb:{imdb_id}, "
-                f"tmdb:{tmdb_id}, season:{tvdb_season}"
-            )
 
-            return {
-                "tvdb_id": tvdb_id,
-                "imdb_id": imdb_id,
-                "tmdb_id": tmdb_id,
-                "tvdb_season": tvdb_season,
-            }
+async def get_ids_from_mal(mal_id: int, strict: bool = False) -> dict | None:
+    """Resolve all external IDs for an anime by MAL ID via Simkl.
 
-    except Exception as e:
-        logging.warning(f"[Simkl] Failed to resolve mal:{mal_id}: {e}")
+    Returns dict with tvdb_id, imdb_id, tmdb_id, tvdb_season, or None if not found.
+    strict: raise UpstreamUnavailable on transient failures instead of returning None.
+    """
+    if not Config.SIMKL_CLIENT_ID:
         return None
 
+    # Step 1: Search by MAL ID to get Simkl ID
+    simkl_id = await _simkl_id_for_mal(mal_id, strict)
+    if not simkl_id:
+        return None
+
+    # Step 2: Get full details with extended IDs and season info
+    async def fetch():
+        async with http_session('simkl', TIMEOUT) as session:
+            data = await _get_json(
+                session, f"{SIMKL_URL}/anime/{simkl_id}?extended=full&client_id={Config.SIMKL_CLIENT_ID}"
+            )
+        if not data:
+            return None
+
+        ids = data.get("ids", {})
+        tvdb_id = int(ids["tvdb"]) if ids.get("tvdb") else None
+        imdb_id = ids.get("imdb")
+        tmdb_id = int(ids["tmdb"]) if ids.get("tmdb") else None
+        tvdb_season = data.get("season")  # Simkl provides TVDB season number directly
+
+        if not tvdb_id and not imdb_id and not tmdb_id:
+            return None
+
+        logging.info(
+            f"[Simkl] Resolved mal:{mal_id} -> tvdb:{tvdb_id}, imdb:{imdb_id}, "
+            f"tmdb:{tmdb_id}, season:{tvdb_season}"
+        )
+
+        return {
+            "tvdb_id": tvdb_id,
+            "imdb_id": imdb_id,
+            "tmdb_id": tmdb_id,
+            "tvdb_season": tvdb_season,
+        }
+
+    return await _cached(f"ids:mal:{mal_id}", fetch, strict)
+
 
 async def get_episode_tvdb_mapping(mal_id: int) -> dict | None:
     """Get TVDB season/episode mapping for all episodes of an anime by MAL ID.
@@ -85,75 +181,63 @@ async def get_episode_tvdb_mapping(mal_id: int) -> dict | None:
     if not Config.SIMKL_CLIENT_ID:
         return None
 
-    try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
-            # Step 1: Get Simkl ID from MAL ID
-            search_url = f"{SIMKL_URL}/search/id?mal={mal_id}&client_id={Config.SIMKL_CLIENT_ID}"
-            async with session.get(search_url, headers={"User-Agent": "docchi-stremio/1.0"}) as resp:
-                if resp.status != 200:
-                    return None
-                results = await resp.json()
-
-            if not results:
-                return None
-
-            simkl_id = results[0].get("ids", {}).get("simkl")
-            if not simkl_id:
-                return None
-
-            # Step 2: Get all episodes with TVDB coordinates
-            episodes_url = f"{SIMKL_URL}/anime/episodes/{simkl_id}?client_id={Config.SIMKL_CLIENT_ID}"
-            async with session.get(episodes_url, headers={"User-Agent": "docchi-stremio/1.0"}) as resp:
-                if resp.status != 200:
-                    return None
-                episodes = await resp.json()
-
-            if not episodes:
-                return None
-
-            # Build mapping: absolute ep number -> tvdb {season, episode}
-            mapping = {}
-            for ep in episodes:
-                ep_num = ep.get("episode")
-                tvdb = ep.get("tvdb")
-                if ep_num and tvdb and tvdb.get("season") and tvdb.get("episode"):
-                    mapping[int(ep_num)] = {
-                        "season": tvdb["season"],
-                        "episode": tvdb["episode"],
-                    }
-
-            if not mapping:
-                return None
-
-            logging.info(f"[Simkl] Got episode mapping for mal:{mal_id}: {len(mapping)} episodes with TVDB coords")
+    # Step 1: Get Simkl ID from MAL ID
+    simkl_id = await _simkl_id_for_mal(mal_id)
+    if not simkl_id:
+        return None
 
-            return {
-                "simkl_id": simkl_id,
-                "total_episodes": len(mapping),
-                "mapping": mapping,
-            }
+    # Step 2: Get all episodes with TVDB coordinates
+    async def fetch():
+        async with http_session('simkl', 15) as session:
+            episodes = await _get_json(
+                session, f"{SIMKL_URL}/anime/episodes/{simkl_id}?client_id={Config.SIMKL_CLIENT_ID}"
+            )
+        if not episodes:
+            return None
+
+        # Build mapping: absolute ep number -> tvdb {season, episode}
+        mapping = {}
+        for ep in episodes:
+            ep_num = ep.get("episode")
+            tvdb = ep.get("tvdb")
+            if ep_num and tvdb and tvdb.get("season") and tvdb.get("episode"):
+                mapping[int(ep_num)] = {
+                    "season": tvdb["season"],
+                    "episode": tvdb["episode"],
+                }
+
+        if not mapping:
+            return None
+
+        logging.info(f"[Simkl] Got episode mapping for mal:{mal_id}: {len(mapping)} episodes with TVDB coords")
+
+        return {
+            "simkl_id": simkl_id,
+            "total_episodes": len(mapping),
+            "mapping": mapping,
+        }
 
-    except Exception as e:
-        logging.warning(f"[Simkl] Failed to get episode mapping for mal:{mal_id}: {e}")
-        return None
+    result = await _cached(f"episodes:mal:{mal_id}", fetch)
+    if result and isinstance(next(iter(result['mapping'])), str):
+        # Rows read back from the DB have JSON (string) episode keys
+        result = {**result, 'mapping': {int(k): v for k, v in result['mapping'].items()}}
+    return result
 
 
-async def get_ids_from_mal_by_imdb(imdb_id: str) -> int | None:
+async def get_ids_from_mal_by_imdb(imdb_id: str, strict: bool = False) -> int | None:
     """Resolve IMDB ID to MAL ID via Simkl search.
     
     Returns MAL ID (int) or None if not found.
+    strict: raise UpstreamUnavailable on transient failures instead of returning None.
     """
     if not Config.SIMKL_CLIENT_ID or not imdb_id:
         return None
 
-    try:
-        async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
-            url = f"{SIMKL_URL}/search/id?imdb={imdb_id}&client_id={Config.SIMKL_CLIENT_ID}"
-            async with session.get(url, headers={"User-Agent": "docchi-stremio/1.0"}) as resp:
-                if resp.status != 200:
-                    return None
-                results = await resp.json()
-
+    async def fetch():
+        async with http_session('simkl', TIMEOUT) as session:
+            results = await _get_json(
+                session, f"{SIMKL_URL}/search/id?imdb={imdb_id}&client_id={Config.SIMKL_CLIENT_ID}"
+            )
             if not results:
                 return None
 
@@ -162,20 +246,17 @@ async def get_ids_from_mal_by_imdb(imdb_id: str) -> int | None:
             if mal_id:
                 logging.info(f"[Simkl] Resolved imdb:{imdb_id} -> mal:{mal_id}")
                 return int(mal_id)
-            
+
             # If not in search result, try full details
             simkl_id = results[0].get("ids", {}).get("simkl")
             if simkl_id:
-                details_url = f"{SIMKL_URL}/anime/{simkl_id}?extended=full&client_id={Config.SIMKL_CLIENT_ID}"
-                async with session.get(details_url, headers={"User-Agent": "docchi-stremio/1.0"}) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        mal_id = data.get("ids", {}).get("mal")
-                        if mal_id:
-                            logging.info(f"[Simkl] Resolved imdb:{imdb_id} -> mal:{mal_id} (via details)")
-                            return int(mal_id)
-
-    except Exception as e:
-        logging.warning(f"[Simkl] Failed to resolve imdb:{imdb_id}: {e}")
+                data = await _get_json(
+                    session, f"{SIMKL_URL}/anime/{simkl_id}?extended=full&client_id={Config.SIMKL_CLIENT_ID}"
+                )
+                mal_id = (data or {}).get("ids", {}).get("mal")
+                if mal_id:
+                    logging.info(f"[Simkl] Resolved imdb:{imdb_id} -> mal:{mal_id} (via details)")
+                    return int(mal_id)
+        return None
 
-    return None
+    return await _cached(f"mal:imdb:{imdb_id}", fetch, strict)
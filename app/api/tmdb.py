@@ -2,6 +2,7 @@
 import logging
 import aiohttp
 from config import Config
+from app.utils.http_sessions import http_session
 
 BASE_URL = "https://api.themoviedb.org/3"
 IMAGE_BASE = "https://image.tmdb.org/t/p"
@@ -17,7 +18,7 @@ async def _api_get(path: str, params: dict = None) -> dict | None:
     params["api_key"] = Config.TMDB_API_KEY
 
     try:
-        async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+        async with http_session('tmdb', TIMEOUT) as session:
             async with session.get(f"{BASE_URL}{path}", params=params) as resp:
                 if resp.status != 200:
                     logging.warning(f"TMDB API {path}: status {resp.status}")
@@ -4,24 +4,26 @@ import time
 import aiohttp
 from config import Config
 from app.utils.common_utils import get_fanart_images
+from app.utils.http_sessions import http_session, reset_session, timed_session
 
 BASE_URL = "https://api4.thetvdb.com/v4"
 TIMEOUT = aiohttp.ClientTimeout(total=10)
 
+_PAGE_CONCURRENCY = 6  # parallel episode-page requests per listing
+
+
+
+class IncompleteListing(Exception):
+    """An episode listing came back shorter than TVDB's links.total_items."""
+
+
 _token: str | None = None
 _token_expires: float = 0
 
-# Shared session for connection reuse (avoids TCP/TLS handshake per request)
-_session: aiohttp.ClientSession | None = None
-
 
-def _get_session() -> aiohttp.ClientSession:
-    """Get or create shared aiohttp session for TVDB API calls."""
-    global _session
-    if _session is None or _session.closed:
-        connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
-        _session = aiohttp.ClientSession(timeout=TIMEOUT, connector=connector)
-    return _session
+def _get_session():
+    """Shared TVDB session from the upstream registry (avoids TCP/TLS handshake per request)."""
+    return timed_session('tvdb', TIMEOUT)
 
 
 def _is_non_latin(text: str) -> bool:
@@ -84,12 +86,7 @@ async def _api_get(path: str, params: dict = None) -> dict | None:
     except (RuntimeError, aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as e:
         # SSL/transport error — reset session and retry once
         logging.warning(f"TVDB session error ({path}): {e}, resetting session")
-        global _session
-        try:
-            await _session.close()
-        except Exception:
-            pass
-        _session = None
+        await reset_session('tvdb')
         session = _get_session()
         try:
             async with session.get(f"{BASE_URL}{path}", headers=headers, params=params) as resp:
@@ -271,13 +268,14 @@ async def get_series_episodes(tvdb_id: int, season_number: int = None, lang: str
 
 def _mark_untranslated(episodes: list, eng_episodes: list):
     """Compare Polish episodes with English and mark untranslated fields. Fill missing from English."""
-    eng_map = {ep.get("number"): ep for ep in eng_episodes if ep.get("number")}
+    # Keyed by (season, number): full-series listings repeat episode numbers per season
+    eng_map = {(ep.get("seasonNumber"), ep.get("number")): ep for ep in eng_episodes if ep.get("number")}
 
     for ep in episodes:
         num = ep.get("number", 0)
         if num <= 0:
             continue
-        eng_ep = eng_map.get(num, {})
+        eng_ep = eng_map.get((ep.get("seasonNumber"), num), {})
         
         # If overview matches English exactly or is missing, it's not translated
         if ep.get("overview") and eng_ep.get("overview") and ep["overview"] == eng_ep["overview"]:
@@ -301,34 +299,60 @@ def _mark_untranslated(episodes: list, eng_episodes: list):
 async def _fetch_episodes_for_lang(tvdb_id: int, season_number: int = None, lang: str = "pol") -> list:
     """Internal: fetch episodes for a specific language.
     
+    Page 0 tells the total size (links.total_items / page_size); the remaining
+    pages are then fetched concurrently (at most _PAGE_CONCURRENCY at a time)
+    and stitched back in page order. Without size info it falls back to
+    following links.next one page at a time.
+
+    Raises IncompleteListing when fewer episodes than links.total_items came
+    back (a page was rate limited or failed), so the gap is never cached.
+
     Note: TVDB API v4 'season' query param may not reliably filter episodes server-side,
     so we always filter client-side by seasonNumber after fetching.
     """
-    all_episodes = []
-    page = 0
-
-    while True:
-        path = f"/series/{tvdb_id}/episodes/default/{lang}"
-        params = {"page": page}
-        if season_number is not None:
-            params["season"] = season_number
-
-        data = await _api_get(path, params=params)
-        if not data:
-            break
+    import asyncio
 
-        episodes = data.get("data", {}).get("episodes", [])
-        if not episodes:
-            break
+    path = f"/series/{tvdb_id}/episodes/default/{lang}"
+    base_params = {"season": season_number} if season_number is not None else {}
 
-        all_episodes.extend(episodes)
+    async def _page(page: int) -> dict | None:
+        return await _api_get(path, params={"page": page, **base_params})
 
-        # Check pagination
-        links = data.get("links", {})
-        if links.get("next"):
+    data = await _page(0)
+    episodes = (data or {}).get("data", {}).get("episodes", [])
+    if not episodes:
+        return []
+    all_episodes = list(episodes)
+
+    links = data.get("links", {})
+    total_items, page_size = links.get("total_items"), links.get("page_size")
+    if links.get("next") and total_items and page_size:
+        page_count = -(-int(total_items) // int(page_size))
+        semaphore = asyncio.Semaphore(_PAGE_CONCURRENCY)
+
+        async def _bounded(page: int):
+            async with semaphore:
+                return await _page(page)
+
+        pages = await asyncio.gather(*[_bounded(p) for p in range(1, page_count)])
+        for data in pages:
+            episodes = (data or {}).get("data", {}).get("episodes", [])
+            if not episodes:
+                break
+            all_episodes.extend(episodes)
+    else:
+        page = 0
+        while links.get("next"):
             page += 1
-        else:
-            break
+            data = await _page(page)
+            episodes = (data or {}).get("data", {}).get("episodes", [])
+            if not episodes:
+                break
+            all_episodes.extend(episodes)
+            links = data.get("links", {})
+
+    if total_items and len(all_episodes) < int(total_items):
+        raise IncompleteListing(f"TVDB {tvdb_id}/{lang}: {len(all_episodes)} of {total_items} episodes")
 
     # Client-side season filter — TVDB API may return all episodes regardless of 'season' param
     if season_number is not None:
@@ -365,20 +389,16 @@ async def get_anime_meta(tvdb_id: int, mal_id: str = None, season_number: int =
     kitsu_id = None
     if mal_id:
         from app.utils.anime_mapping import get_kitsu_from_mal_id
-        kitsu_id = get_kitsu_from_mal_id(mal_id)
+        kitsu_id = await get_kitsu_from_mal_id(mal_id)
     
     async def _fetch_kitsu_data():
         if not kitsu_id:
             return {}
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(f"https://kitsu.io/api/edge/anime/{kitsu_id}",
-                                       params={"fields[anime]": "posterImage,coverImage,youtubeVideoId,averageRating"}) as resp:
-                    if resp.status == 200:
-                        return (await resp.json()).get("data", {}).get("attributes", {})
+            from app.api.kitsu import get_anime_attributes
+            return (await get_anime_attributes([kitsu_id])).get(str(kitsu_id), {})
         except Exception:
-            pass
-        return {}
+            return {}
 
     series_ext, translation, kdata, fanart = await asyncio.gather(
         series_ext_task, translation_task, _fetch_kitsu_data(), fanart_task
@@ -704,7 +724,7 @@ def _build_videos_from_episodes(episodes: list, mal_id: str = None, season_numbe
 async def _fetch_trailer_from_kitsu(kitsu_id: str) -> list:
     """Fetch YouTube trailer ID from Kitsu API."""
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3)) as session:
+        async with http_session('kitsu', 3) as session:
             async with session.get(f"https://kitsu.io/api/edge/anime/{kitsu_id}",
                                    params={"fields[anime]": "youtubeVideoId"}) as resp:
                 if resp.status != 200:
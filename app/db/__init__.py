@@ -1,6 +1,8 @@
+import asyncio
 import sqlite3
 import logging
 import threading
+import time
 from config import Config
 
 db_lock = threading.Lock()
@@ -38,6 +40,77 @@ connection.executescript("""
         episodes TEXT,
         timestamp INTEGER
     );
+    CREATE TABLE IF NOT EXISTS stream_cache (
+        cache_key TEXT PRIMARY KEY,
+        players TEXT,
+        timestamp INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS docchi_cache (
+        url TEXT PRIMARY KEY,
+        status INTEGER,
+        body TEXT,
+        expires_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS anilist_media (
+        anilist_id INTEGER PRIMARY KEY,
+        mal_id INTEGER,
+        node TEXT,
+        timestamp INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_anilist_media_mal ON anilist_media(mal_id);
+    CREATE TABLE IF NOT EXISTS simkl_cache (
+        cache_key TEXT PRIMARY KEY,
+        value TEXT,
+        expires_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS kitsu_cache (
+        kitsu_id TEXT PRIMARY KEY,
+        attrs TEXT,
+        expires_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS kitsu_mal_cache (
+        kitsu_id TEXT PRIMARY KEY,
+        mal_id TEXT,
+        expires_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS negative_cache (
+        cache_key TEXT PRIMARY KEY,
+        strikes INTEGER,
+        expires_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS translation_memory (
+        src_hash TEXT PRIMARY KEY,
+        translation TEXT,
+        timestamp INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS translation_pending (
+        mal_id TEXT,
+        kind TEXT,
+        pending INTEGER,
+        PRIMARY KEY (mal_id, kind)
+    );
+    CREATE INDEX IF NOT EXISTS idx_translation_pending_kind ON translation_pending(kind);
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name TEXT PRIMARY KEY,
+        applied_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS franchise_videos (
+        tvdb_id INTEGER,
+        layout TEXT,
+        videos BLOB,
+        timestamp INTEGER,
+        PRIMARY KEY (tvdb_id, layout)
+    );
+    CREATE TABLE IF NOT EXISTS videos_pointer (
+        mal_id TEXT PRIMARY KEY,
+        tvdb_id INTEGER,
+        layout TEXT
+    );
+    CREATE VIEW IF NOT EXISTS videos_view AS
+        SELECT p.mal_id AS mal_id, f.videos AS videos, f.timestamp AS timestamp, f.tvdb_id AS tvdb_id, f.layout AS layout
+        FROM videos_pointer p JOIN franchise_videos f ON f.tvdb_id = p.tvdb_id AND f.layout = p.layout
+        UNION ALL
+        SELECT mal_id, videos, timestamp, NULL, NULL FROM videos_cache;
 """)
 connection.commit()
 
@@ -60,20 +133,189 @@ if Config.TURSO_URL and Config.TURSO_TOKEN:
     except ImportError:
         _libsql_client = None
 
+# Long-lived Turso client pool (one HTTPS keep-alive session per client instead of
+# a new connection + TLS handshake per statement)
+_POOL_SIZE = max(1, Config.TURSO_POOL_SIZE)
+_HEALTHCHECK_INTERVAL = 60  # re-validate clients idle longer than this (seconds)
+_SLOW_QUERY_MS = 500  # log statements slower than this
+
+_pool: asyncio.Queue | None = None
+_pool_clients: list = []
+_pool_loop = None
+
+# Per-query latency accounting (exposed via db_stats())
+_stats = {
+    'queries': 0,
+    'errors': 0,
+    'reconnects': 0,
+    'total_ms': 0.0,
+    'max_ms': 0.0,
+}
+
+
+class _PooledClient:
+    """Pool slot holding one libsql client, recreated on failure."""
+    def __init__(self):
+        self.client = None
+        self.last_used = 0.0
+
+    async def get(self):
+        if self.client is None or self.client.closed:
+            self.client = _libsql_client.create_client(url=_turso_url, auth_token=Config.TURSO_TOKEN)
+        elif time.time() - self.last_used > _HEALTHCHECK_INTERVAL:
+            # Idle keep-alive connections get dropped by Turso/proxies — validate before use
+            try:
+                await self.client.execute("SELECT 1")
+            except Exception as e:
+                logging.warning(f"Turso health check failed: {e}, reconnecting")
+                await self.reset()
+                self.client = _libsql_client.create_client(url=_turso_url, auth_token=Config.TURSO_TOKEN)
+        self.last_used = time.time()
+        return self.client
+
+    async def reset(self):
+        if self.client is not None:
+            try:
+                await self.client.close()
+            except Exception:
+                pass
+        self.client = None
+        _stats['reconnects'] += 1
+
+
+def _get_pool() -> asyncio.Queue:
+    """Get or create the client pool for the running event loop."""
+    global _pool, _pool_clients, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        # New loop (e.g. separate asyncio.run() in scripts) — old clients are bound to the dead loop
+        _pool = asyncio.Queue()
+        _pool_clients = [_PooledClient() for _ in range(_POOL_SIZE)]
+        for slot in _pool_clients:
+            _pool.put_nowait(slot)
+        _pool_loop = loop
+    return _pool
+
+
+async def _turso_call(fn):
+    """Run fn(client) on a pooled Turso client. Reconnects and retries once on transport errors."""
+    pool = _get_pool()
+    slot = await pool.get()
+    try:
+        try:
+            return await fn(await slot.get())
+        except _libsql_client.LibsqlError:
+            raise  # SQL error — reconnecting won't help
+        except Exception as e:
+            logging.warning(f"Turso connection error: {e}, reconnecting")
+            await slot.reset()
+            return await fn(await slot.get())
+    finally:
+        pool.put_nowait(slot)
+
+
+def _record_latency(sql: str, elapsed_ms: float):
+    _stats['queries'] += 1
+    _stats['total_ms'] += elapsed_ms
+    if elapsed_ms > _stats['max_ms']:
+        _stats['max_ms'] = elapsed_ms
+    if elapsed_ms > _SLOW_QUERY_MS:
+        logging.info(f"[DB] slow query ({elapsed_ms:.0f}ms): {sql.strip()[:80]}")
+
+
+async def init_db():
+    """Open the Turso client pool eagerly (called from app lifespan)."""
+    if not (_libsql_client and _turso_url):
+        return
+    pool = _get_pool()
+    for slot in _pool_clients:
+        try:
+            await slot.get()
+        except Exception as e:
+            logging.warning(f"Turso pool warm-up failed: {e}")
+    logging.info(f"Turso client pool ready ({pool.qsize()} clients)")
+
+
+async def close_db():
+    """Close all pooled Turso clients (called on app shutdown)."""
+    global _pool, _pool_loop
+    for slot in _pool_clients:
+        if slot.client is not None:
+            try:
+                await slot.client.close()
+            except Exception:
+                pass
+            slot.client = None
+    _pool = None
+    _pool_loop = None
+
+
+def db_stats() -> dict:
+    """Return query count and latency stats for the cache database."""
+    queries = _stats['queries']
+    return {
+        'backend': 'turso' if (_libsql_client and _turso_url) else 'sqlite',
+        'pool_size': _POOL_SIZE if (_libsql_client and _turso_url) else 0,
+        'queries': queries,
+        'errors': _stats['errors'],
+        'reconnects': _stats['reconnects'],
+        'avg_ms': round(_stats['total_ms'] / queries, 2) if queries else 0,
+        'max_ms': round(_stats['max_ms'], 2),
+    }
+
 
 async def execute(sql: str, params=()) -> list:
     """Unified async execute for Turso or SQLite. Returns list of _Row."""
+    t0 = time.perf_counter()
     if _libsql_client and _turso_url:
         try:
-            async with _libsql_client.create_client(url=_turso_url, auth_token=Config.TURSO_TOKEN) as client:
-                rs = await client.execute(sql, list(params))
-                cols = list(rs.columns)
-                return [_Row(zip(cols, row)) for row in rs.rows]
+            rs = await _turso_call(lambda client: client.execute(sql, list(params)))
+            cols = list(rs.columns)
+            return [_Row(zip(cols, row)) for row in rs.rows]
         except Exception as e:
+            _stats['errors'] += 1
             logging.error(f"Turso execute failed: {e}")
             # Don't fallback to local SQLite when Turso is configured
             # (local DB is empty on serverless — fallback would lose data)
             return []
+        finally:
+            _record_latency(sql, (time.perf_counter() - t0) * 1000)
     rows = connection.execute(sql, params).fetchall()
     connection.commit()
+    _record_latency(sql, (time.perf_counter() - t0) * 1000)
     return [_Row(row) for row in rows]
+
+
+async def execute_batch(statements: list[tuple[str, tuple]]) -> list[list]:
+    """Run several statements atomically in one round trip.
+
+    Turso: single pipelined batch request (wrapped in a transaction server-side).
+    SQLite: single local transaction.
+    Returns one list of _Row per statement (empty lists on Turso failure).
+    """
+    if not statements:
+        return []
+    t0 = time.perf_counter()
+    label = f"batch[{len(statements)}] {statements[0][0]}"
+    if _libsql_client and _turso_url:
+        try:
+            stmts = [_libsql_client.Statement(sql, list(params)) for sql, params in statements]
+            result_sets = await _turso_call(lambda client: client.batch(stmts))
+            results = []
+            for rs in result_sets:
+                cols = list(rs.columns)
+                results.append([_Row(zip(cols, row)) for row in rs.rows])
+            return results
+        except Exception as e:
+            _stats['errors'] += 1
+            logging.error(f"Turso batch failed: {e}")
+            return [[] for _ in statements]
+        finally:
+            _record_latency(label, (time.perf_counter() - t0) * 1000)
+    results = []
+    with db_lock:
+        with connection:
+            for sql, params in statements:
+                results.append([_Row(row) for row in connection.execute(sql, params).fetchall()])
+    _record_latency(label, (time.perf_counter() - t0) * 1000)
+    return results
@@ -2,37 +2,48 @@
 from app.db import connection, db_lock
 
 
-def load_anime_mapping(data: list):
-    rows = []
-    for item in data:
-        imdb = item.get('imdb_id')
-        if isinstance(imdb, list):
-            imdb = imdb[0] if imdb else None
-        tmdb = item.get('themoviedb_id')
-        if isinstance(tmdb, dict):
-            # Extract first value from dict like {"tv": 26209} or {"movie": [128]}
-            val = next(iter(tmdb.values()), None) if tmdb else None
-            if isinstance(val, list):
-                tmdb = val[0] if val else None
-            else:
-                tmdb = val
-        elif isinstance(tmdb, list):
-            tmdb = tmdb[0] if tmdb else None
-        rows.append((
-            item.get('mal_id'),
-            item.get('kitsu_id'),
-            imdb,
-            item.get('tvdb_id'),
-            tmdb,
-            item.get('season', {}).get('tvdb') if isinstance(item.get('season'), dict) else None,
-        ))
+def _mapping_row(item: dict) -> tuple:
+    imdb = item.get('imdb_id')
+    if isinstance(imdb, list):
+        imdb = imdb[0] if imdb else None
+    tmdb = item.get('themoviedb_id')
+    if isinstance(tmdb, dict):
+        # Extract first value from dict like {"tv": 26209} or {"movie": [128]}
+        val = next(iter(tmdb.values()), None) if tmdb else None
+        if isinstance(val, list):
+            tmdb = val[0] if val else None
+        else:
+            tmdb = val
+    elif isinstance(tmdb, list):
+        tmdb = tmdb[0] if tmdb else None
+    return (
+        item.get('mal_id'),
+        item.get('kitsu_id'),
+        imdb,
+        item.get('tvdb_id'),
+        tmdb,
+        item.get('season', {}).get('tvdb') if isinstance(item.get('season'), dict) else None,
+    )
+
+
+def load_anime_mapping(data, chunk_size: int = 5000) -> int:
+    """Replace anime_mapping with the given entries (any iterable, consumed in chunks of chunk_size)."""
+    sql = "INSERT INTO anime_mapping (mal_id, kitsu_id, imdb_id, tvdb_id, themoviedb_id, season_tvdb) VALUES (?,?,?,?,?,?)"
+    count = 0
     with db_lock:
         with connection:
             connection.execute("DELETE FROM anime_mapping")
-            connection.executemany(
-                "INSERT INTO anime_mapping (mal_id, kitsu_id, imdb_id, tvdb_id, themoviedb_id, season_tvdb) VALUES (?,?,?,?,?,?)",
-                rows
-            )
+            rows = []
+            for item in data:
+                rows.append(_mapping_row(item))
+                if len(rows) >= chunk_size:
+                    connection.executemany(sql, rows)
+                    count += len(rows)
+                    rows = []
+            if rows:
+                connection.executemany(sql, rows)
+                count += len(rows)
+    return count
 
 
 def _row_to_dict(row) -> dict:
@@ -77,8 +88,13 @@ def get_mal_id_from_slug(slug) -> tuple:
 
 
 def save_slug_from_mal_id(mal_id, slug):
-    connection.execute(
-        "INSERT OR IGNORE INTO slug_mapping (mal_id, slug) VALUES (?,?)",
-        (int(mal_id), slug)
-    )
-    connection.commit()
+    save_slug_mappings({mal_id: slug})
+
+
+def save_slug_mappings(mappings: dict):
+    with db_lock:
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO slug_mapping (mal_id, slug) VALUES (?,?)",
+                [(int(mal_id), slug) for mal_id, slug in mappings.items()]
+            )
@@ -8,8 +8,9 @@ from aiocache.decorators import cached as aiocached
 from fastapi import APIRouter, Request, HTTPException
 
 from app.routes import docchi_client
-from app.utils.anime_mapping import get_mal_id_from_slug, save_mal_slug_mapping
+from app.utils.anime_mapping import get_mal_id_from_slug, save_mal_slug_mappings
 from app.utils.stream_utils import respond_with, log_error
+from app.utils.shared_cache import TieredCache, l2_claim, l2_release
 from app.utils.meta_cache import build_genre_links, fetch_and_cache_meta, with_genre_links, batch_fetch_and_cache_meta
 from .manifest import MANIFEST, genres as manifest_genres
 
@@ -17,8 +18,8 @@ from config import Config
 
 catalog_router = APIRouter()
 
-# In-memory aiocache instance for catalog responses
-_catalog_cache = Cache(Cache.MEMORY, ttl=600, namespace="catalog")
+# Catalog responses: in-memory aiocache (L1) backed by the cross-worker shared tier (L2)
+_catalog_cache = TieredCache('catalog', Cache(Cache.MEMORY, ttl=600, namespace="catalog"))
 
 
 def _is_valid_catalog(catalog_type: str, catalog_id: str):
@@ -135,36 +136,13 @@ async def addon_catalog(
     is_vip = Config.VIP_PATH in request.url.path
 
     # Check aiocache
-    cache_key = f"{catalog_type}:{catalog_id}:{genre}:{search}:{is_vip}"
+    cache_key = _catalog_cache_key(catalog_type, catalog_id, genre, search, is_vip)
     cached = await _catalog_cache.get(cache_key)
     if cached is not None:
         return respond_with(cached, cache_time)
 
     try:
-        response_data = await _fetch_anime_list(search, catalog_id, genre)
-
-        content_ids = [f"mal:{item['mal_id']}" for item in response_data if item.get('mal_id')]
-        batch_results = await batch_fetch_and_cache_meta(content_ids, is_vip)
-
-        meta_previews = [
-            batch_results.get(f"mal:{item['mal_id']}") or docchi_to_meta(item, is_vip, catalog_id)
-            for item in response_data
-        ]
-
-        # VIP catalogs: use IMDB ID as content ID when available
-        # This allows Stremio to match with cinemeta and other IMDB-based addons
-        if is_vip and Config.VIP_IMDB_IDS:
-            from app.utils.anime_mapping import get_ids_from_mal_id
-            for meta in meta_previews:
-                if meta and meta.get('id', '').startswith('mal:'):
-                    mal_id = meta['id'].split(':')[1]
-                    ids = get_ids_from_mal_id(mal_id)
-                    if ids.get('imdb_id'):
-                        meta['id'] = ids['imdb_id']
-
-        result = {'metas': list(meta_previews)}
-        if cache_time:
-            await _catalog_cache.set(cache_key, result, ttl=cache_time)
+        result = await _build_catalog(catalog_type, catalog_id, genre, search, is_vip)
         return respond_with(result, cache_time)
     except ValueError as e:
         return respond_with({'metas': [], 'message': str(e)})
@@ -173,9 +151,105 @@ async def addon_catalog(
         return respond_with({'metas': []}, cache_time)
 
 
+def _catalog_cache_key(catalog_type: str, catalog_id: str, genre, search, is_vip: bool) -> str:
+    return f"{catalog_type}:{catalog_id}:{genre}:{search}:{is_vip}"
+
+
+async def _build_catalog(catalog_type: str, catalog_id: str, genre=None, search=None, is_vip: bool = False) -> dict:
+    """Build a catalog response (Docchi list -> MAL ids -> cached metas) and store it in _catalog_cache."""
+    cache_time = _set_cache_time(catalog_id)
+    response_data = await _fetch_anime_list(search, catalog_id, genre)
+
+    content_ids = [f"mal:{item['mal_id']}" for item in response_data if item.get('mal_id')]
+    await save_mal_slug_mappings({item.get('mal_id'): item.get('slug') for item in response_data})
+    batch_results = await batch_fetch_and_cache_meta(content_ids, is_vip)
+
+    meta_previews = [
+        batch_results.get(f"mal:{item['mal_id']}") or docchi_to_meta(item, is_vip, catalog_id)
+        for item in response_data
+    ]
+
+    # VIP catalogs: use IMDB ID as content ID when available
+    # This allows Stremio to match with cinemeta and other IMDB-based addons
+    if is_vip and Config.VIP_IMDB_IDS:
+        from app.utils.anime_mapping import get_ids_for_mal_ids
+        mal_metas = [m for m in meta_previews if m and m.get('id', '').startswith('mal:')]
+        ids_map = await get_ids_for_mal_ids([m['id'].split(':')[1] for m in mal_metas])
+        for meta in mal_metas:
+            ids = ids_map.get(meta['id'].split(':')[1], {})
+            if ids.get('imdb_id'):
+                meta['id'] = ids['imdb_id']
+
+    result = {'metas': list(meta_previews)}
+    if cache_time:
+        await _catalog_cache.set(_catalog_cache_key(catalog_type, catalog_id, genre, search, is_vip),
+                                 result, ttl=cache_time)
+    return result
+
+
+# Fixed catalogs rebuilt in the background before their cache entry expires
+_PREWARM_CATALOGS = ('season', 'trending', 'latest', 'newest')
+_PREWARM_LEAD = 0.2  # refresh when 80% of the TTL has passed
+_PREWARM_MIN_INTERVAL = 60
+_prewarm_task: asyncio.Task | None = None
+_prewarm_stats = {'runs': 0, 'failures': 0, 'last_run': {}}
+
+
+def prewarm_stats() -> dict:
+    return dict(_prewarm_stats)
+
+
+async def _prewarm_loop():
+    """Refresh each fixed catalog (normal + VIP variant) shortly before its TTL runs out."""
+    import time
+    variants = (False, True) if Config.VIP_PATH else (False,)
+    next_run = {(catalog_id, is_vip): 0.0 for catalog_id in _PREWARM_CATALOGS for is_vip in variants}
+    while True:
+        now = time.time()
+        for (catalog_id, is_vip), due in next_run.items():
+            if due > now:
+                continue
+            interval = max(_PREWARM_MIN_INTERVAL, _set_cache_time(catalog_id) * (1 - _PREWARM_LEAD))
+            next_run[(catalog_id, is_vip)] = now + interval
+            # With several workers only one rebuilds; the others read the result from L2
+            claim = f"prewarm:{catalog_id}:{int(is_vip)}"
+            if not await l2_claim(claim, int(interval * 0.9)):
+                continue
+            t0 = time.time()
+            try:
+                result = await _build_catalog('anime', catalog_id, is_vip=is_vip)
+                _prewarm_stats['runs'] += 1
+                _prewarm_stats['last_run'][f"{catalog_id}:{is_vip}"] = int(t0)
+                logging.info(f"[Prewarm] {catalog_id} (vip={is_vip}): {len(result['metas'])} items in {time.time()-t0:.1f}s")
+            except Exception as e:
+                _prewarm_stats['failures'] += 1
+                # Retry soon — and let any worker take it, not just this one after the full window
+                next_run[(catalog_id, is_vip)] = now + _PREWARM_MIN_INTERVAL
+                await l2_release(claim)
+                logging.warning(f"[Prewarm] {catalog_id} (vip={is_vip}) failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(max(1.0, min(next_run.values()) - time.time()))
+
+
+def start_catalog_prewarm():
+    """Start the background pre-warming loop (called from the app lifespan)."""
+    global _prewarm_task
+    if Config.CATALOG_PREWARM and (_prewarm_task is None or _prewarm_task.done()):
+        _prewarm_task = asyncio.ensure_future(_prewarm_loop())
+
+
+async def stop_catalog_prewarm():
+    global _prewarm_task
+    if _prewarm_task:
+        _prewarm_task.cancel()
+        try:
+            await _prewarm_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _prewarm_task = None
+
+
 def docchi_to_meta(anime_item: dict, is_vip: bool = False, catalog_id: str = 'season'):
     content_id = anime_item.get('mal_id', None)
-    save_mal_slug_mapping(content_id, anime_item.get('slug', None))
 
     anime_item_genres = list(anime_item.get('genres', []))
     filtered_genres = list(filter(lambda y: y in manifest_genres, anime_item_genres))
@@ -10,6 +10,7 @@ from config import Config
 from .manifest import MANIFEST
 from app.utils.stream_utils import respond_with
 from app.utils.meta_cache import fetch_and_cache_meta, fetch_videos
+from app.utils.shared_cache import l2_get, l2_set
 
 meta_router = APIRouter()
 
@@ -21,7 +22,7 @@ _RESPONSE_CACHE_TTL = 60  # 1 min in-memory response cache
 _kitsu_id_cache: dict[str, str | None] = {}
 
 
-def _remap_video_ids_to_kitsu(videos: list):
+async def _remap_video_ids_to_kitsu(videos: list):
     """Remap video IDs from mal:X:Y to kitsu:X:Y in-place.
     
     Falls back to mal:X:Y if no Kitsu ID is available for that MAL entry.
@@ -40,7 +41,7 @@ def _remap_video_ids_to_kitsu(videos: list):
         ep = parts[2]
 
         if mal_id not in _kitsu_id_cache:
-            _kitsu_id_cache[mal_id] = get_kitsu_from_mal_id(mal_id)
+            _kitsu_id_cache[mal_id] = await get_kitsu_from_mal_id(mal_id)
 
         kitsu_id = _kitsu_id_cache[mal_id]
         if kitsu_id:
@@ -59,7 +60,7 @@ async def addon_meta(request: Request, meta_type: str, meta_id: str):
     if '_' in meta_id:
         meta_id = meta_id.replace("_", ":")
 
-    # Check in-memory response cache first (avoids all processing)
+    # Check in-memory response cache first (avoids all processing), then the shared tier
     cache_key = (meta_id, is_vip)
     if cache_key in _response_cache:
         data, cache_time, ts = _response_cache[cache_key]
@@ -67,6 +68,10 @@ async def addon_meta(request: Request, meta_type: str, meta_id: str):
             return respond_with(data, cache_time)
         else:
             del _response_cache[cache_key]
+    shared = await l2_get('meta_response', f"{meta_id}:{is_vip}")
+    if shared and time.time() - shared['ts'] < _RESPONSE_CACHE_TTL:
+        _response_cache[cache_key] = (shared['data'], shared['cache_time'], shared['ts'])
+        return respond_with(shared['data'], shared['cache_time'])
 
     _t_route = time.time()
 
@@ -106,7 +111,7 @@ async def addon_meta(request: Request, meta_type: str, meta_id: str):
             meta['app_extras'] = app_extras
 
     # Remap video IDs from mal:X:Y to kitsu:X:Y where possible
-    _remap_video_ids_to_kitsu(meta.get('videos', []))
+    await _remap_video_ids_to_kitsu(meta.get('videos', []))
 
     # Recompute 'available' dynamically based on current time (cache may have stale values)
     from datetime import datetime, timezone
@@ -160,5 +165,7 @@ async def addon_meta(request: Request, meta_type: str, meta_id: str):
         oldest_key = min(_response_cache, key=lambda k: _response_cache[k][2])
         del _response_cache[oldest_key]
     _response_cache[cache_key] = (response_data, cache_time, time.time())
+    await l2_set('meta_response', f"{meta_id}:{is_vip}",
+                 {'data': response_data, 'cache_time': cache_time, 'ts': time.time()}, _RESPONSE_CACHE_TTL)
 
     return respond_with(response_data, cache_time)
@@ -0,0 +1,47 @@
+"""Internal endpoint exposing cache/backend counters for monitoring."""
+import hmac
+from fastapi import APIRouter, Request, HTTPException
+from config import Config
+from app.db import db_stats
+from app.utils.anime_mapping import mapping_load_stats
+from app.utils.single_flight import single_flight_stats
+from app.utils.meta_cache import mem_cache_stats, swr_stats
+from app.utils.stream_cache import stream_cache_stats
+from app.api.docchi import docchi_cache_stats
+from app.api.anilist_graph import anilist_graph_stats
+from app.api.simkl import simkl_cache_stats
+from app.api.kitsu import kitsu_bulk_stats
+from app.routes.catalog import prewarm_stats
+from app.utils.shared_cache import shared_cache_stats
+from app.utils.negative_cache import negative_cache_stats
+from app.utils.rate_limit import rate_limit_stats
+from app.utils.translate import translation_memory_stats
+
+stats_router = APIRouter()
+
+
+@stats_router.get('/internal/stats')
+async def internal_stats(request: Request):
+    """Return runtime counters of the DB, mapping and cache layers."""
+    if not Config.INTERNAL_STATS_KEY:
+        raise HTTPException(status_code=404)
+    if not hmac.compare_digest(request.headers.get('X-Internal-Key', '').encode(), Config.INTERNAL_STATS_KEY.encode()):
+        raise HTTPException(status_code=403)
+
+    return {
+        'db': db_stats(),
+        'mapping_load': mapping_load_stats(),
+        'coalescing': single_flight_stats(),
+        'mem_cache': mem_cache_stats(),
+        'stale_while_revalidate': swr_stats(),
+        'stream_cache': stream_cache_stats(),
+        'docchi': docchi_cache_stats(),
+        'anilist_graph': anilist_graph_stats(),
+        'simkl': simkl_cache_stats(),
+        'kitsu_bulk': kitsu_bulk_stats(),
+        'catalog_prewarm': prewarm_stats(),
+        'shared_cache': shared_cache_stats(),
+        'negative_cache': negative_cache_stats(),
+        'rate_limits': rate_limit_stats(),
+        'translation_memory': translation_memory_stats(),
+    }
@@ -10,6 +10,7 @@ from app.routes import docchi_client, mapping
 from app.utils.stream_utils import respond_with
 from app.utils.anime_mapping import get_slug_from_mal_id
 from app.utils.player_utils import detect_player, get_player_handler
+from app.utils.stream_cache import get_cached_streams, save_streams
 
 
 from config import Config
@@ -123,23 +124,31 @@ def build_binge_group(anime_name, content_id, quality, translator_norm):
     return f"{content_base}.{quality}-{translator_norm}.docc"
 
 
-async def process_players(players, content_id=None, content_type='series', is_vip=False):
+async def process_players(players, content_id=None, content_type='series', is_vip=False, slug=None, episode=None):
     streams = {'streams': []}
 
     parts = content_id.split(':') if content_id else []
     episode_num = parts[-1] if len(parts) > 2 else None
 
+    # Reuse still-fresh extractions; only failed/expired players are extracted again
+    cached = await get_cached_streams(slug, episode, is_vip) if slug else {}
+    to_extract = [player for player in players if player['player'] not in cached]
+
     timeout = aiohttp.ClientTimeout(total=None, connect=5)
     connector = aiohttp.TCPConnector(limit=15, limit_per_host=5, ttl_dns_cache=300, verify_ssl=False)
 
     async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
-        tasks = [process_player(session, player, is_vip) for player in players]
+        tasks = [process_player(session, player, is_vip) for player in to_extract]
 
         # Fetch meta in parallel with player extraction (for filename/bingeGroup)
         meta_task = asyncio.ensure_future(fetch_and_cache_meta(content_id, is_vip)) if content_id else None
 
-        player_results = await asyncio.gather(*tasks)
+        extracted = dict(zip((player['player'] for player in to_extract), await asyncio.gather(*tasks)))
+        player_results = [cached.get(player['player']) or extracted.get(player['player']) for player in players]
         valid_streams = [s for s in player_results if s and s['url']]
+        if slug:
+            await save_streams(slug, episode, is_vip, cached,
+                               {url: s for url, s in extracted.items() if s and s['url']}, len(players))
 
         anime_name = None
         if valid_streams and meta_task:
@@ -262,21 +271,9 @@ async def addon_stream(request: Request, content_type: str, content_id: str):
             season = int(parts[1])
             episode = int(parts[2])
 
-        prefix_id = mapping.get_mal_id_from_imdb_id(prefix, season)
-        # If season > 1 and no direct mapping, try resolving via AniList SEQUEL chain
-        if not prefix_id and season and season > 1:
-            base_mal_id = mapping.get_mal_id_from_imdb_id(prefix, 1)
-            if base_mal_id:
-                from app.api.anilist import get_tv_sequel_mal_id
-                prefix_id = await get_tv_sequel_mal_id(int(base_mal_id), season - 1)
-                if prefix_id:
-                    prefix_id = str(prefix_id)
-        # Fallback: try Simkl for IMDB -> MAL resolution
-        if not prefix_id and Config.SIMKL_CLIENT_ID:
-            from app.api.simkl import get_ids_from_mal_by_imdb
-            simkl_mal = await get_ids_from_mal_by_imdb(prefix)
-            if simkl_mal:
-                prefix_id = str(simkl_mal)
+        # Local mapping, then AniList SEQUEL chain / Simkl (negative-cached)
+        from app.utils.meta_cache import resolve_mal_id_from_imdb
+        prefix_id = await resolve_mal_id_from_imdb(prefix, season)
         if prefix_id:
             prefix = 'mal'
             # Resolve absolute episode number to (mal_id, local_ep) via videos cache
@@ -298,7 +295,7 @@ async def addon_stream(request: Request, content_type: str, content_id: str):
             return respond_with({'streams': []}, 2592000)
     elif prefix == 'kitsu':
         prefix_id = parts[1]
-        prefix_id = mapping.get_mal_id_from_kitsu_id(prefix_id)
+        prefix_id = await mapping.get_mal_id_from_kitsu_id(prefix_id)
         if prefix_id:
             prefix = 'mal'
             episode = parts[2] if len(parts) > 2 else '1'
@@ -325,7 +322,7 @@ async def addon_stream(request: Request, content_type: str, content_id: str):
                 seen.add(player_url)
                 unique_players.append(player)
 
-        streams = await process_players(unique_players, content_id, content_type, is_vip)
+        streams = await process_players(unique_players, content_id, content_type, is_vip, slug=slug, episode=episode)
         cache_time = 20 if streams.pop('_had_failures', False) else 600
         return respond_with(streams, cache_time)
     return respond_with({'streams': []})
@@ -7,7 +7,7 @@ import logging
 import orjson
 from fastapi import APIRouter, Request, HTTPException
 from config import Config
-from app.utils.meta_cache import get_cached_videos, set_cached_videos, get_cached_meta, set_cached_meta, _mem_cache
+from app.utils.meta_cache import get_cached_videos, set_cached_videos, get_cached_meta, set_cached_meta, set_cached_meta_many, _mem_cache
 from app.utils.translate import batch_translate_to_polish, batch_translate_episodes
 
 translate_router = APIRouter()
@@ -120,6 +120,7 @@ async def translate_batch_meta(request: Request):
     translations = await batch_translate_to_polish(texts)
 
     results = []
+    updates = {}
     for item, translated in zip(items, translations):
         mal_id = item.get('mal_id')
         if translated and mal_id:
@@ -127,9 +128,9 @@ async def translate_batch_meta(request: Request):
             cached = await get_cached_meta(mal_id)
             if cached:
                 cached['description'] = translated
-                await set_cached_meta(mal_id, cached)
-                _mem_cache[mal_id] = (cached, __import__('time').time())
+                updates[mal_id] = cached
             results.append({'mal_id': mal_id, 'description': translated})
+    await set_cached_meta_many(updates)
 
     logging.info(f"[TranslateEP] Batch meta done - {len(results)}/{len(items)} translated")
     return {'status': 'ok', 'results': results}
@@ -147,48 +148,53 @@ async def cron_translate(request: Request):
         if not request.headers.get('Authorization', '').startswith('Bearer'):
             raise HTTPException(status_code=403)
 
-    import time
-    import orjson as _orjson
+    from app.utils import blob_codec
     from app.db import execute
     from app.utils.translate import batch_translate_episodes, translate_to_polish
 
-    now = int(time.time())
     translated_meta = 0
     translated_videos = 0
 
     # 1. Translate untranslated meta descriptions
     meta_rows = await execute(
-        "SELECT mal_id, meta FROM meta_cache WHERE meta LIKE '%_untranslated_description%' LIMIT 5"
+        "SELECT m.mal_id, m.meta FROM translation_pending p JOIN meta_cache m ON m.mal_id = p.mal_id "
+        "WHERE p.kind='meta' LIMIT 5"
     )
 
     if meta_rows:
         texts = []
         metas = []
         for row in meta_rows:
-            meta = _orjson.loads(row['meta'])
+            meta = blob_codec.decode(row['meta'])
             if meta.get('_untranslated_description'):
                 desc = meta.get('description', '')
                 if desc:
                     texts.append(desc)
                     metas.append((row['mal_id'], meta))
+                    continue
+            # Nothing to translate (e.g. backfilled row without description)
+            await execute("DELETE FROM translation_pending WHERE mal_id=? AND kind='meta'", (row['mal_id'],))
 
         if texts:
             translations = await batch_translate_to_polish(texts)
+            updates = {}
             for (mal_id, meta), translated in zip(metas, translations):
                 if translated:
                     meta['description'] = translated
                     meta.pop('_untranslated_description', None)
-                    await set_cached_meta(str(mal_id), meta)
-                    _mem_cache[str(mal_id)] = (meta, now)
+                    updates[str(mal_id)] = meta
                     translated_meta += 1
+            await set_cached_meta_many(updates)
 
     # 2. Translate untranslated video episodes (titles + overviews)
+    # One row per franchise list (siblings share it through videos_pointer)
     vid_rows = await execute(
-        "SELECT mal_id, videos FROM videos_cache WHERE videos LIKE '%_untranslated_%' LIMIT 10"
+        "SELECT MIN(v.mal_id) AS mal_id, v.videos FROM translation_pending p JOIN videos_view v ON v.mal_id = p.mal_id "
+        "WHERE p.kind='videos' GROUP BY COALESCE(v.tvdb_id || ':' || v.layout, v.mal_id) LIMIT 10"
     )
 
     for row in (vid_rows or []):
-        videos = _orjson.loads(row['videos'])
+        videos = blob_codec.decode(row['videos'])
         mal_id = str(row['mal_id'])
 
         # Collect ALL episodes needing translation for this entry
@@ -238,4 +244,5 @@ async def cron_translate(request: Request):
             logging.info(f"[Cron] Saved mal:{mal_id} - {translated_videos} fields so far")
 
     logging.info(f"[Cron] Translated {translated_meta} meta + {translated_videos} video fields")
-    return {'status': 'ok', 'meta': translated_meta, 'videos': translated_videos}
+    from app.utils.translate import translation_memory_stats
+    return {'status': 'ok', 'meta': translated_meta, 'videos': translated_videos, 'memory': translation_memory_stats()}
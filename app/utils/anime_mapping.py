@@ -1,17 +1,27 @@
 import json
 import os
+import time
 import logging
 from typing import Optional
 from config import Config
 from app.db import db
+from app.utils import mapping_index
 from app.api.docchi import DocchiAPI
+from app.utils.lru import ByteLRU
 
+# Async Redis client (connection pool) for all request-time lookups.
+# Loading at startup uses a short-lived sync client via _get_sync_redis().
 _redis_client = None
+_REDIS_POOL_SIZE = 20
+_KITSU_NEGATIVE_TTL = 86400 * 7  # 1 week, Kitsu IDs without a MAL mapping
+_kitsu_mal_cache = ByteLRU(256 * 1024, 'kitsu_mal')  # kitsu_id -> (mal_id | None, expires_at)
 
 if Config.USE_REDIS and Config.REDIS_URL:
     try:
-        import redis
-        _redis_client = redis.from_url(Config.REDIS_URL, decode_responses=True)
+        import redis.asyncio as aioredis
+        _redis_client = aioredis.from_url(
+            Config.REDIS_URL, decode_responses=True, max_connections=_REDIS_POOL_SIZE
+        )
         logging.info("Using Redis for anime mapping")
     except ImportError:
         logging.warning("redis package not installed. Falling back to SQLite")
@@ -21,44 +31,154 @@ if Config.USE_REDIS and Config.REDIS_URL:
 if not _redis_client:
     logging.info("Using SQLite/Turso for anime mapping")
 
+
+def _get_sync_redis():
+    """Sync Redis client for startup loading and CLI maintenance only (never in request handlers)."""
+    import redis
+    return redis.from_url(Config.REDIS_URL, decode_responses=True)
+
+
+async def close_mapping():
+    """Close the async Redis connection pool (called on app shutdown)."""
+    if _redis_client:
+        try:
+            await _redis_client.aclose()
+        except Exception:
+            pass
+
+
 MAPPING_FILE = os.path.join(os.path.dirname(__file__), '../../data/anime-lists/anime-list-full.json')
+MAPPING_INDEX_FILE = Config.MAPPING_INDEX_FILE or os.path.join(os.path.dirname(__file__), '../../data/anime-mapping.idx')
 _loaded = False
+_index: mapping_index.MappingIndex | None = None  # mmapped snapshot; preferred over Redis/SQLite when present
+
+_LOAD_CHUNK = 5000  # entries per SQLite executemany / Redis pipeline flush
+_load_stats = {}  # last load_mapping() run: backend, entries, seconds, peak RSS
+
+
+def mapping_load_stats() -> dict:
+    """Stats of the last startup mapping load (exposed on /internal/stats)."""
+    return dict(_load_stats)
+
+
+def _peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except (ImportError, OSError):
+        return None
+
+
+def _iter_mapping_file(path: str, read_size: int = 1 << 16):
+    """Yield entries of a top-level JSON array one at a time.
+
+    Reads the file in fixed-size blocks and decodes each object with raw_decode,
+    so only the current block and entry are held in memory instead of the whole list.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buf = f.read(read_size).lstrip()
+        if not buf.startswith('['):
+            raise ValueError(f"{path}: expected a JSON array")
+        pos = 1
+        eof = False
+        while True:
+            # Skip whitespace and separators between entries
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                buf, pos = f.read(read_size), 0
+                eof = not buf
+            if pos >= len(buf) or buf[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(read_size)
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield item
+            pos = end
+            if pos > read_size:
+                buf, pos = buf[pos:], 0
+
 
 def load_mapping():
     """Load anime mapping from file to Redis or TinyDB (run once at startup)"""
-    global _loaded
+    global _loaded, _index
     if _loaded:
         return
     
     try:
         import hashlib
+        import time
         import os as _os
         MAPPING_SCHEMA_VERSION = "2"  # bump when _load_to_redis changes structure
         
         # Use file size + mtime as fast hash proxy (avoids reading 15MB into RAM)
         stat = _os.stat(MAPPING_FILE)
         file_hash = hashlib.md5(f"{stat.st_size}:{stat.st_mtime}:{MAPPING_SCHEMA_VERSION}".encode()).hexdigest()
-        
-        if _redis_client:
-            # Check if Redis has same version — skip expensive JSON parse if so
-            cached_hash = _redis_client.get('mapping:hash')
-            if cached_hash == file_hash:
-                logging.info(f"Redis has up-to-date anime mapping (hash: {file_hash[:8]}), skipping load")
+        started = time.perf_counter()
+
+        def _done(backend: str, count: int | None = None):
+            _load_stats.update({
+                'backend': backend,
+                'entries': count,
+                'seconds': round(time.perf_counter() - started, 3),
+                'peak_rss_mb': _peak_rss_mb(),
+                'hash': file_hash[:8],
+            })
+            logging.info(
+                f"[Mapping] {backend}: {count if count is not None else 'cached'} entries in "
+                f"{_load_stats['seconds']}s (peak RSS {_load_stats['peak_rss_mb']} MB, hash: {file_hash[:8]})"
+            )
+
+        # Fast path: mmap an up-to-date binary index (no JSON parse, no DB load)
+        _index = mapping_index.open_index(MAPPING_INDEX_FILE, file_hash)
+        if _index:
+            _done('index', _index.size)
+            _loaded = True
+            return
+
+        # Build the index once if we can write it (other workers/restarts then just mmap it)
+        if _os.access(_os.path.dirname(_os.path.abspath(MAPPING_INDEX_FILE)), _os.W_OK):
+            try:
+                count = mapping_index.build_index(_iter_mapping_file(MAPPING_FILE), MAPPING_INDEX_FILE, file_hash)
+                _index = mapping_index.open_index(MAPPING_INDEX_FILE, file_hash)
+            except OSError as e:
+                logging.warning(f"Could not write mapping index: {e}. Falling back to Redis/SQLite")
+            if _index:
+                _done('index (built)', count)
                 _loaded = True
                 return
-            
-            # Hash mismatch — need to parse and reload
-            with open(MAPPING_FILE, 'r') as f:
-                data = json.load(f)
-            _load_to_redis(data)
-            del data  # Free parsed data after loading to Redis
-            _redis_client.set('mapping:hash', file_hash)
-            logging.info(f"Loaded anime mapping with hash: {file_hash[:8]}")
+
+        if _redis_client:
+            sync_redis = _get_sync_redis()
+            try:
+                # Check if Redis has same version — skip expensive JSON parse if so
+                cached_hash = sync_redis.get('mapping:hash')
+                if cached_hash == file_hash:
+                    _done('redis')
+                    _loaded = True
+                    return
+
+                # Hash mismatch — need to parse and reload
+                count = _load_to_redis(sync_redis, _iter_mapping_file(MAPPING_FILE))
+                sync_redis.set('mapping:hash', file_hash)
+            finally:
+                sync_redis.close()
+            _done('redis', count)
         else:
-            with open(MAPPING_FILE, 'r') as f:
-                data = json.load(f)
-            _load_to_sqlite(data)
-            del data
+            _done('sqlite', _load_to_sqlite(_iter_mapping_file(MAPPING_FILE)))
         _loaded = True
     except FileNotFoundError:
         logging.error("anime-list-full.json not found. Run: git submodule update --init")
@@ -66,155 +186,148 @@ def load_mapping():
         logging.error(f"Failed to load anime mapping: {e}")
         _loaded = True  # Don't retry on every request if Redis is full
 
-def _load_to_redis(data):
-    """Load only necessary fields to Redis with TTL"""
-    pipe = _redis_client.pipeline()
+def _mini_item(item: dict) -> dict:
+    """Reduce a raw mapping entry to the fields we store."""
+    mini = {}
+    if item.get('mal_id'):
+        mini['mal_id'] = item['mal_id']
+    if item.get('kitsu_id'):
+        mini['kitsu_id'] = item['kitsu_id']
+    if item.get('imdb_id'):
+        mini['imdb_id'] = item['imdb_id']
+    if item.get('tvdb_id'):
+        mini['tvdb_id'] = item['tvdb_id']
+    tmdb = item.get('themoviedb_id')
+    if tmdb:
+        mini['themoviedb_id'] = next(iter(tmdb.values())) if isinstance(tmdb, dict) else tmdb
+    if isinstance(item.get('season'), dict) and item['season'].get('tvdb'):
+        mini['season'] = {'tvdb': item['season']['tvdb']}
+    return mini
+
+
+def _load_to_redis(redis_client, entries) -> int:
+    """Load only necessary fields to Redis with TTL (sync client, startup only).
+
+    Single pass over a (streamed) iterable: mal:/kitsu: keys are flushed every
+    _LOAD_CHUNK entries, imdb:/tvdb: groups keep only the small serialised minis
+    until the end because each key holds a list of all matching entries.
+    """
     ttl = 86400 * 7  # 7 days
-    
-    for item in data:
-        mini = {}
-        if item.get('mal_id'):
-            mini['mal_id'] = item['mal_id']
-        if item.get('kitsu_id'):
-            mini['kitsu_id'] = item['kitsu_id']
-        if item.get('imdb_id'):
-            mini['imdb_id'] = item['imdb_id']
-        if item.get('tvdb_id'):
-            mini['tvdb_id'] = item['tvdb_id']
-        tmdb = item.get('themoviedb_id')
-        if tmdb:
-            mini['themoviedb_id'] = next(iter(tmdb.values())) if isinstance(tmdb, dict) else tmdb
-        if item.get('season', {}).get('tvdb'):
-            mini['season'] = {'tvdb': item['season']['tvdb']}
+    imdb_map: dict[str, list[str]] = {}
+    tvdb_map: dict[str, list[str]] = {}
+    pipe = redis_client.pipeline(transaction=False)
+    count = 0
 
+    for item in entries:
+        mini = _mini_item(item)
         item_json = json.dumps(mini)
         if mini.get('mal_id'):
             pipe.setex(f"mal:{mini['mal_id']}", ttl, item_json)
         if mini.get('kitsu_id'):
             pipe.setex(f"kitsu:{mini['kitsu_id']}", ttl, item_json)
-    
-    pipe.execute()
-
-    imdb_map = {}
-    for item in data:
-        imdb_id = item.get('imdb_id')
-        if not imdb_id:
-            continue
-            
-        mini = {}
-        if item.get('mal_id'):
-            mini['mal_id'] = item['mal_id']
-        if item.get('kitsu_id'):
-            mini['kitsu_id'] = item['kitsu_id']
-        if item.get('imdb_id'):
-            mini['imdb_id'] = item['imdb_id']
-        if item.get('tvdb_id'):
-            mini['tvdb_id'] = item['tvdb_id']
-        tmdb = item.get('themoviedb_id')
-        if tmdb:
-            mini['themoviedb_id'] = next(iter(tmdb.values())) if isinstance(tmdb, dict) else tmdb
-        if item.get('season', {}).get('tvdb'):
-            mini['season'] = {'tvdb': item['season']['tvdb']}
-            
-        ids = [imdb_id] if not isinstance(imdb_id, list) else imdb_id
-        for iid in ids:
-            if iid not in imdb_map:
-                imdb_map[iid] = []
-            imdb_map[iid].append(mini)
-    
-    pipe = _redis_client.pipeline()
-    for iid, items in imdb_map.items():
-        pipe.setex(f"imdb:{iid}", ttl, json.dumps(items))
-    pipe.execute()
-
-    # Build TVDB map (tvdb_id -> list of seasons)
-    tvdb_map = {}
-    for item in data:
-        tvdb_id = item.get('tvdb_id')
-        if not tvdb_id:
-            continue
-        mini = {}
-        if item.get('mal_id'):
-            mini['mal_id'] = item['mal_id']
-        if item.get('kitsu_id'):
-            mini['kitsu_id'] = item['kitsu_id']
-        if item.get('imdb_id'):
-            mini['imdb_id'] = item['imdb_id']
-        if item.get('tvdb_id'):
-            mini['tvdb_id'] = item['tvdb_id']
-        tmdb = item.get('themoviedb_id')
-        if tmdb:
-            mini['themoviedb_id'] = next(iter(tmdb.values())) if isinstance(tmdb, dict) else tmdb
-        if item.get('season', {}).get('tvdb'):
-            mini['season'] = {'tvdb': item['season']['tvdb']}
-        tvdb_key = str(tvdb_id)
-        if tvdb_key not in tvdb_map:
-            tvdb_map[tvdb_key] = []
-        tvdb_map[tvdb_key].append(mini)
-
-    pipe = _redis_client.pipeline()
-    for tid, items in tvdb_map.items():
-        pipe.setex(f"tvdb:{tid}", ttl, json.dumps(items))
+        imdb_id = mini.get('imdb_id')
+        for iid in (imdb_id if isinstance(imdb_id, list) else [imdb_id] if imdb_id else []):
+            imdb_map.setdefault(iid, []).append(item_json)
+        if mini.get('tvdb_id'):
+            tvdb_map.setdefault(str(mini['tvdb_id']), []).append(item_json)
+        count += 1
+        if count % _LOAD_CHUNK == 0:
+            pipe.execute()
+
+    for prefix, groups in (('imdb', imdb_map), ('tvdb', tvdb_map)):
+        for i, (key, items) in enumerate(groups.items(), 1):
+            pipe.setex(f"{prefix}:{key}", ttl, f"[{','.join(items)}]")
+            if i % _LOAD_CHUNK == 0:
+                pipe.execute()
     pipe.execute()
-    
-    logging.info(f"Loaded {len(data)} anime to Redis with {ttl}s TTL")
+    return count
 
-def _load_to_sqlite(data):
+def _load_to_sqlite(entries) -> int:
     """Load data to SQLite (using existing database)"""
-    db.load_anime_mapping(data)
-    logging.info(f"Loaded {len(data)} anime to SQLite")
+    return db.load_anime_mapping(entries, chunk_size=_LOAD_CHUNK)
 
-def get_mal_id_from_kitsu_id(kitsu_id: str) -> Optional[str]:
+async def get_mal_id_from_kitsu_id(kitsu_id: str) -> Optional[str]:
     """Get MAL ID from Kitsu ID. Falls back to Kitsu Mappings API if not in local DB."""
-    item = _get_item('kitsu', kitsu_id)
+    item = await _get_item('kitsu', kitsu_id)
     if item and item.get('mal_id'):
         return str(item['mal_id'])
 
-    # Fallback: query Kitsu API mappings endpoint
-    mal_id = _kitsu_api_fallback(kitsu_id)
-    if mal_id:
-        # Cache the result for future lookups
-        _cache_kitsu_mapping(kitsu_id, mal_id)
+    from app.utils.single_flight import single_flight
+    kitsu_id = str(kitsu_id)
+    return await single_flight('kitsu_mal', kitsu_id, lambda: _resolve_kitsu_via_api(kitsu_id))
+
+
+async def _resolve_kitsu_via_api(kitsu_id: str) -> Optional[str]:
+    """kitsu_mal_cache lookup, then the Kitsu Mappings API (result cached either way).
+
+    Found mappings are kept forever; "no MAL mapping" answers for _KITSU_NEGATIVE_TTL.
+    """
+    from app.db import execute
+    now = int(time.time())
+    cached = _kitsu_mal_cache.get(kitsu_id)
+    if cached is None:
+        try:
+            rows = await execute("SELECT mal_id, expires_at FROM kitsu_mal_cache WHERE kitsu_id=?", (kitsu_id,))
+        except Exception as e:
+            logging.warning(f"kitsu_mal_cache read failed for kitsu:{kitsu_id}: {e}")
+            rows = None
+        if rows:
+            cached = (rows[0]['mal_id'], rows[0]['expires_at'])
+            _kitsu_mal_cache[kitsu_id] = cached
+    if cached is not None and (cached[0] or cached[1] > now):
+        return cached[0]
+
+    mal_id, definitive = await _kitsu_api_fallback(kitsu_id)
+    if not definitive:
+        return None  # timeout/5xx: ask again next time
+    expires_at = 0 if mal_id else now + _KITSU_NEGATIVE_TTL
+    _kitsu_mal_cache[kitsu_id] = (mal_id, expires_at)
+    try:
+        await execute(
+            "INSERT OR REPLACE INTO kitsu_mal_cache (kitsu_id, mal_id, expires_at) VALUES (?,?,?)",
+            (kitsu_id, mal_id, expires_at)
+        )
+    except Exception as e:
+        logging.warning(f"kitsu_mal_cache write failed for kitsu:{kitsu_id}: {e}")
     return mal_id
 
 
-def _kitsu_api_fallback(kitsu_id: str) -> Optional[str]:
-    """Query Kitsu Mappings API to resolve kitsu_id -> MAL ID."""
-    import requests
+async def _kitsu_api_fallback(kitsu_id: str) -> tuple[Optional[str], bool]:
+    """Query Kitsu Mappings API to resolve kitsu_id -> MAL ID.
+
+    Returns (mal_id, definitive); definitive is False when the lookup failed
+    and says nothing about the ID.
+    """
+    from app.utils.http_sessions import http_session
     try:
         url = (
             f"https://kitsu.io/api/edge/anime/{kitsu_id}/mappings"
             f"?filter[externalSite]=myanimelist/anime"
         )
-        resp = requests.get(url, timeout=5)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
+        async with http_session('kitsu', 5) as session:
+            async with session.get(url) as resp:
+                if resp.status == 404:
+                    return None, True
+                if resp.status != 200:
+                    return None, False
+                data = await resp.json(content_type=None)
         mappings = data.get("data", [])
         if mappings:
-            return mappings[0].get("attributes", {}).get("externalId")
+            return str(mappings[0].get("attributes", {}).get("externalId")), True
+        return None, True
     except Exception as e:
         logging.warning(f"Kitsu API fallback failed for kitsu:{kitsu_id}: {e}")
-    return None
+    return None, False
 
 
-def _cache_kitsu_mapping(kitsu_id: str, mal_id: str):
-    """Cache a kitsu->mal mapping discovered via API fallback."""
-    mini = {'kitsu_id': int(kitsu_id), 'mal_id': int(mal_id)}
-    if _redis_client:
-        import json as _json
-        ttl = 86400 * 7
-        _redis_client.setex(f"kitsu:{kitsu_id}", ttl, _json.dumps(mini))
-    # For SQLite, we don't persist API-discovered mappings to avoid stale data
-
-def get_kitsu_from_mal_id(mal_id: str) -> Optional[str]:
+async def get_kitsu_from_mal_id(mal_id: str) -> Optional[str]:
     """Get Kitsu ID from MAL ID"""
-    item = _get_item('mal', mal_id)
+    item = await _get_item('mal', mal_id)
     return str(item.get('kitsu_id')) if item and item.get('kitsu_id') else None
 
-def get_mal_id_from_imdb_id(imdb_id: str, season: int = None) -> Optional[str]:
+async def get_mal_id_from_imdb_id(imdb_id: str, season: int = None) -> Optional[str]:
     """Get MAL ID from IMDB ID and optional season number"""
-    items = _get_imdb_items(imdb_id)
+    items = await _get_imdb_items(imdb_id)
     if not items:
         return None
 
@@ -233,14 +346,14 @@ def get_mal_id_from_imdb_id(imdb_id: str, season: int = None) -> Optional[str]:
 
 async def get_slug_from_imdb_id(imdb_id: str, season: int = None) -> Optional[str]:
     """Get Docchi slug from IMDB ID and optional season (IMDB -> MAL -> slug)"""
-    mal_id = get_mal_id_from_imdb_id(imdb_id, season)
+    mal_id = await get_mal_id_from_imdb_id(imdb_id, season)
     if mal_id:
         return await get_slug_from_mal_id(mal_id)
     return None
 
-def get_imdb_id_from_mal_id(mal_id: str) -> Optional[str]:
+async def get_imdb_id_from_mal_id(mal_id: str) -> Optional[str]:
     """Get IMDB ID from MAL ID (returns first if multiple)"""
-    item = _get_item('mal', mal_id)
+    item = await _get_item('mal', mal_id)
     if item:
         imdb_id = item.get('imdb_id')
         if imdb_id:
@@ -248,10 +361,9 @@ def get_imdb_id_from_mal_id(mal_id: str) -> Optional[str]:
     return None
 
 
-def get_ids_from_mal_id(mal_id: str) -> dict:
-    """Get kitsu_id, imdb_id, tvdb_id, themoviedb_id for a given MAL ID.
-    Checks both the main mapping and resolved: cache (from Simkl/AniList fallback)."""
-    item = _get_item('mal', mal_id) or {}
+def _ids_from_item(item: dict, resolved: dict = None) -> dict:
+    """Build the get_ids_from_mal_id() result from a mapping item and optional resolved: overlay."""
+    item = item or {}
     imdb_id = item.get('imdb_id')
     result = {
         'kitsu_id': str(item['kitsu_id']) if item.get('kitsu_id') else None,
@@ -260,21 +372,72 @@ def get_ids_from_mal_id(mal_id: str) -> dict:
         'tmdb_id': item.get('themoviedb_id'),
         'tvdb_season': item.get('season', {}).get('tvdb') if item.get('season') else None,
     }
-    # If main mapping lacks tvdb_id, check resolved cache (Simkl/AniList fallback)
-    if not result['tvdb_id'] and _redis_client:
-        resolved_data = _redis_client.get(f"resolved:mal:{mal_id}")
-        if resolved_data:
-            resolved = json.loads(resolved_data)
-            result['tvdb_id'] = result['tvdb_id'] or resolved.get('tvdb_id')
-            result['imdb_id'] = result['imdb_id'] or resolved.get('imdb_id')
-            result['tmdb_id'] = result['tmdb_id'] or resolved.get('themoviedb_id')
-            result['tvdb_season'] = result['tvdb_season'] or (resolved.get('season', {}).get('tvdb') if resolved.get('season') else None)
+    # If main mapping lacks tvdb_id, use resolved cache (Simkl/AniList fallback)
+    if not result['tvdb_id'] and resolved:
+        result['tvdb_id'] = result['tvdb_id'] or resolved.get('tvdb_id')
+        result['imdb_id'] = result['imdb_id'] or resolved.get('imdb_id')
+        result['tmdb_id'] = result['tmdb_id'] or resolved.get('themoviedb_id')
+        result['tvdb_season'] = result['tvdb_season'] or (resolved.get('season', {}).get('tvdb') if resolved.get('season') else None)
     return result
 
-def _get_imdb_items(imdb_id: str) -> list:
+
+async def get_ids_from_mal_id(mal_id: str) -> dict:
+    """Get kitsu_id, imdb_id, tvdb_id, themoviedb_id for a given MAL ID.
+    Checks both the main mapping and resolved: cache (from Simkl/AniList fallback)."""
+    if _index:
+        item = _index.get_by_mal(mal_id)
+        resolved = None
+        if _redis_client and not (item or {}).get('tvdb_id'):
+            resolved_data = await _redis_client.get(f"resolved:mal:{mal_id}")
+            resolved = json.loads(resolved_data) if resolved_data else None
+        return _ids_from_item(item, resolved)
+    if _redis_client:
+        # mal: and resolved: in one round trip
+        data, resolved_data = await _redis_client.mget(f"mal:{mal_id}", f"resolved:mal:{mal_id}")
+        return _ids_from_item(
+            json.loads(data) if data else None,
+            json.loads(resolved_data) if resolved_data else None,
+        )
+    return _ids_from_item(await _get_item('mal', mal_id))
+
+
+async def get_ids_for_mal_ids(mal_ids: list[str]) -> dict[str, dict]:
+    """Batch get_ids_from_mal_id() — one pipelined MGET on Redis."""
+    mal_ids = [str(m) for m in mal_ids]
+    if not mal_ids:
+        return {}
+    if _index:
+        items = {mal_id: _index.get_by_mal(mal_id) for mal_id in mal_ids}
+        need_resolved = [m for m, item in items.items() if not (item or {}).get('tvdb_id')]
+        resolved = {}
+        if _redis_client and need_resolved:
+            values = await _redis_client.mget([f"resolved:mal:{m}" for m in need_resolved])
+            resolved = {m: json.loads(v) for m, v in zip(need_resolved, values) if v}
+        return {m: _ids_from_item(items[m], resolved.get(m)) for m in mal_ids}
+    if _redis_client:
+        keys = []
+        for mal_id in mal_ids:
+            keys += [f"mal:{mal_id}", f"resolved:mal:{mal_id}"]
+        values = await _redis_client.mget(keys)
+        return {
+            mal_id: _ids_from_item(
+                json.loads(values[2 * i]) if values[2 * i] else None,
+                json.loads(values[2 * i + 1]) if values[2 * i + 1] else None,
+            )
+            for i, mal_id in enumerate(mal_ids)
+        }
+    return {mal_id: _ids_from_item(await _get_item('mal', mal_id)) for mal_id in mal_ids}
+
+
+async def _get_imdb_items(imdb_id: str) -> list:
     """Get list of items for IMDB ID (can have multiple seasons)"""
+    if _index:
+        items = _index.get_by_imdb(imdb_id)
+        if items or not _redis_client:
+            return items
+        # Not in the static mapping — Redis may still hold a resolved: reverse key
     if _redis_client:
-        data = _redis_client.get(f"imdb:{imdb_id}")
+        data = await _redis_client.get(f"imdb:{imdb_id}")
         if data:
             items = json.loads(data)
             return items if isinstance(items, list) else [items]
@@ -283,13 +446,16 @@ def _get_imdb_items(imdb_id: str) -> list:
     return []
 
 
-def get_all_seasons_for_tvdb_id(tvdb_id: int) -> list[dict]:
+async def get_all_seasons_for_tvdb_id(tvdb_id: int) -> list[dict]:
     """Get all MAL entries that share the same TVDB ID (multi-season series).
     
     Returns list of dicts with keys: mal_id, kitsu_id, tvdb_season, sorted by tvdb_season.
     """
+    if _index:
+        items = _index.get_by_tvdb(tvdb_id)
+        return sorted(items, key=lambda x: int(x.get('season', {}).get('tvdb', 0)))
     if _redis_client:
-        data = _redis_client.get(f"tvdb:{tvdb_id}")
+        data = await _redis_client.get(f"tvdb:{tvdb_id}")
         if data:
             items = json.loads(data)
             items = items if isinstance(items, list) else [items]
@@ -300,10 +466,13 @@ def get_all_seasons_for_tvdb_id(tvdb_id: int) -> list[dict]:
             return sorted(items, key=lambda x: int(x.get('season', {}).get('tvdb', 0) if isinstance(x.get('season'), dict) else 0))
     return []
 
-def _get_item(key_type: str, key_value: str) -> Optional[dict]:
-    """Internal helper to get item from Redis or TinyDB"""
+async def _get_item(key_type: str, key_value: str) -> Optional[dict]:
+    """Internal helper to get item from the mmapped index, Redis or SQLite"""
+    if _index:
+        item = _index.get_by_mal(key_value) if key_type == 'mal' else _index.get_by_kitsu(key_value)
+        return item
     if _redis_client:
-        data = _redis_client.get(f"{key_type}:{key_value}")
+        data = await _redis_client.get(f"{key_type}:{key_value}")
         if data:
             return json.loads(data)
     else:
@@ -313,10 +482,26 @@ def _get_item(key_type: str, key_value: str) -> Optional[dict]:
             return db.get_anime_by_kitsu_id(int(key_value))
     return None
 
+
+async def cache_resolved_mapping(mal_id: str, mini: dict):
+    """Store a Simkl/AniList-resolved mapping under resolved:mal:{id} (Redis only, TTL 7 days).
+
+    Also creates a reverse imdb: lookup key if none exists yet. Pipelined into one round trip.
+    """
+    if not _redis_client:
+        return
+    ttl = 86400 * 7
+    async with _redis_client.pipeline(transaction=False) as pipe:
+        pipe.setex(f"resolved:mal:{mal_id}", ttl, json.dumps(mini))
+        if mini.get('imdb_id'):
+            pipe.set(f"imdb:{mini['imdb_id']}", json.dumps([mini]), ex=ttl, nx=True)
+        await pipe.execute()
+
+
 async def get_mal_id_from_slug(slug: str) -> Optional[int]:
-    """Get MAL ID from Docchi slug (Redis or TinyDB, then Docchi API)"""
+    """Get MAL ID from Docchi slug (Redis or SQLite, then Docchi API)"""
     if _redis_client:
-        mal_id = _redis_client.get(f"slug:docchi:{slug}")
+        mal_id = await _redis_client.get(f"slug:docchi:{slug}")
         if mal_id:
             return int(mal_id)
     else:
@@ -331,25 +516,36 @@ async def get_mal_id_from_slug(slug: str) -> Optional[int]:
     except Exception:
         mal_id = None
     if mal_id:
-        save_mal_slug_mapping(mal_id, slug)
+        await save_mal_slug_mapping(mal_id, slug)
     return int(mal_id) if mal_id else None
 
-def save_mal_slug_mapping(mal_id, slug: str):
-    """Save mal_id <-> slug mapping to Redis or TinyDB."""
+async def save_mal_slug_mapping(mal_id, slug: str):
+    """Save mal_id <-> slug mapping to Redis or SQLite."""
     if not mal_id or not slug:
         return
-    mal_id = int(mal_id)
+    await save_mal_slug_mappings({mal_id: slug})
+
+
+async def save_mal_slug_mappings(mappings: dict):
+    """Save many mal_id <-> slug mappings (one Redis pipeline / one SQLite transaction)."""
+    mappings = {int(m): s for m, s in mappings.items() if m and s}
+    if not mappings:
+        return
     if _redis_client:
-        _redis_client.setex(f"slug:mal:{mal_id}", 86400 * 90, slug)
-        _redis_client.setex(f"slug:docchi:{slug}", 86400 * 90, str(mal_id))
+        ttl = 86400 * 90
+        async with _redis_client.pipeline(transaction=False) as pipe:
+            for mal_id, slug in mappings.items():
+                pipe.setex(f"slug:mal:{mal_id}", ttl, slug)
+                pipe.setex(f"slug:docchi:{slug}", ttl, str(mal_id))
+            await pipe.execute()
     else:
-        db.save_slug_from_mal_id(mal_id, slug)
+        db.save_slug_mappings(mappings)
 
 
 async def get_slug_from_mal_id(mal_id: str) -> Optional[str]:
-    """Get Docchi slug from MAL ID (Redis or TinyDB, then Docchi API)"""
+    """Get Docchi slug from MAL ID (Redis or SQLite, then Docchi API)"""
     if _redis_client:
-        slug = _redis_client.get(f"slug:mal:{mal_id}")
+        slug = await _redis_client.get(f"slug:mal:{mal_id}")
         if slug:
             return slug
     else:
@@ -357,12 +553,19 @@ async def get_slug_from_mal_id(mal_id: str) -> Optional[str]:
         if exists and slug:
             return slug
 
-    slug = None
+    from app.utils.negative_cache import is_known_missing, mark_missing, clear_missing
+    if await is_known_missing('slug', mal_id):
+        return None
     try:
         from app.routes import docchi_client
         slug = await docchi_client.get_slug_from_mal_id(mal_id)
-    except Exception:
-        pass
+    except Exception as e:
+        if getattr(e, 'status', None) != 404:
+            return None  # transient Docchi failure, not a known miss
+        slug = None
     if slug:
-        save_mal_slug_mapping(mal_id, slug)
+        await save_mal_slug_mapping(mal_id, slug)
+        await clear_missing('slug', mal_id)
+    else:
+        await mark_missing('slug', mal_id)
     return slug
@@ -0,0 +1,72 @@
+"""Versioned compressed encoding for the large cached JSON rows.
+
+meta_cache, videos_cache, franchise_videos and season_episodes_cache rows are
+stored as
+
+    b'DC' | version (1 byte) | codec (1 byte) | payload
+
+where payload is orjson compressed with zstd (codec 'z', when the zstandard
+package is installed) or zlib ('l'). decode() also accepts the plain JSON text
+rows written before this format existed, so old rows keep working and get
+re-encoded on their next write (or in bulk via `python run.py --migrate-blobs`).
+"""
+import zlib
+
+import orjson
+
+try:
+    import zstandard
+    _zstd_c = zstandard.ZstdCompressor(level=3)
+    _zstd_d = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+MAGIC = b'DC'
+VERSION = 1
+CODEC = b'z' if zstandard else b'l'
+_ZLIB_LEVEL = 6
+
+
+def compress(raw: bytes) -> bytes:
+    """Header + compressed payload for already-serialised orjson bytes."""
+    if CODEC == b'z':
+        payload = _zstd_c.compress(raw)
+    else:
+        payload = zlib.compress(raw, _ZLIB_LEVEL)
+    return MAGIC + bytes([VERSION]) + CODEC + payload
+
+
+def encode(value) -> bytes:
+    return compress(orjson.dumps(value))
+
+
+def is_encoded(data) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:2]) == MAGIC
+
+
+def _raw(data) -> bytes | str:
+    """JSON text of a row value (decompressing encoded rows)."""
+    if not is_encoded(data):
+        return data
+    data = bytes(data)
+    version, codec, payload = data[2], data[3:4], data[4:]
+    if version != VERSION:
+        raise ValueError(f"unsupported blob version {version}")
+    if codec == b'z':
+        if zstandard is None:
+            raise ValueError("zstd-encoded row but the zstandard package is not installed")
+        return _zstd_d.decompress(payload)
+    if codec == b'l':
+        return zlib.decompress(payload)
+    raise ValueError(f"unknown blob codec {codec!r}")
+
+
+def decode(data):
+    """Inverse of encode(); legacy JSON text rows decode as-is."""
+    return orjson.loads(_raw(data))
+
+
+def decode_sized(data) -> tuple:
+    """(value, JSON length) — the length is the memory-tier weight of the value."""
+    raw = _raw(data)
+    return orjson.loads(raw), len(raw)
@@ -7,6 +7,7 @@ import random
 import aiohttp
 from config import Config
 from app.utils import jsunpack
+from app.utils.http_sessions import http_session
 from async_tls_client import AsyncSession
 
 
@@ -17,7 +18,7 @@ async def get_fanart_images(imdb_id: str = None, tvdb_id: int = None, tmdb_id: i
     result = {}
     if Config.FANART_API_KEY and (tvdb_id or tmdb_id or imdb_id):
         try:
-            async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+            async with http_session('fanart', TIMEOUT) as session:
                 # Fetch tvdb and tmdb fanart in parallel
                 tasks = {}
                 if tvdb_id:
@@ -56,7 +57,7 @@ async def get_fanart_images(imdb_id: str = None, tvdb_id: int = None, tmdb_id: i
             pass
     if imdb_id and (not result.get("logo") or not result.get("background")):
         try:
-            async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+            async with http_session('metahub', TIMEOUT) as session:
                 # Fetch metahub logo and background in parallel
                 meta_tasks = []
                 need_logo = not result.get("logo")
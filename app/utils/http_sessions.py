@@ -0,0 +1,146 @@
+"""Shared aiohttp sessions, one per upstream API.
+
+Each upstream gets a long-lived session with keep-alive, DNS caching and a
+per-host connection limit, so warm requests skip TCP/TLS setup. Sessions are
+created lazily on first use and closed by close_sessions() on app shutdown.
+Every request also goes through the upstream's token bucket (app.utils.rate_limit).
+
+Usage mirrors a per-call session, minus the teardown:
+
+    async with http_session('tmdb', TIMEOUT) as session:
+        async with session.get(url) as resp:
+            ...
+"""
+import logging
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from app.utils import rate_limit
+
+# Max concurrent connections per upstream host
+_LIMIT_PER_HOST = {
+    'docchi': 10,
+    'tvdb': 10,
+    'tmdb': 10,
+    'kitsu': 10,
+    'mal': 10,
+    'fanart': 10,
+    'metahub': 10,
+    'anilist': 5,
+    'simkl': 5,
+    'translate': 4,
+}
+_DEFAULT_LIMIT_PER_HOST = 10
+_DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30)
+_KEEPALIVE_TIMEOUT = 60  # seconds an idle connection stays in the pool
+_DNS_CACHE_TTL = 300  # 5 min
+_MAX_429_RETRIES = 2  # re-sends after a 429 whose backoff is short
+_MAX_429_RETRY_WAIT = 5.0  # longer Retry-After: hand the 429 to the caller
+
+_sessions: dict[str, aiohttp.ClientSession] = {}
+
+
+def get_session(name: str) -> aiohttp.ClientSession:
+    """Get (or lazily create) the shared session for an upstream."""
+    session = _sessions.get(name)
+    if session is None or session.closed:
+        limit = _LIMIT_PER_HOST.get(name, _DEFAULT_LIMIT_PER_HOST)
+        connector = aiohttp.TCPConnector(
+            limit=limit * 4,
+            limit_per_host=limit,
+            ttl_dns_cache=_DNS_CACHE_TTL,
+            keepalive_timeout=_KEEPALIVE_TIMEOUT,
+        )
+        # DummyCookieJar: API calls are stateless and must not share cookies between users
+        session = aiohttp.ClientSession(
+            connector=connector, timeout=_DEFAULT_TIMEOUT, cookie_jar=aiohttp.DummyCookieJar()
+        )
+        _sessions[name] = session
+    return session
+
+
+class _LimitedRequest:
+    """session.get()/post() result: usable with `async with` or `await`, like aiohttp's.
+
+    Takes a token from the upstream's rate limiter before sending and re-sends
+    after a short 429 backoff (up to _MAX_429_RETRIES times).
+    """
+
+    def __init__(self, name: str, session: aiohttp.ClientSession, method: str, url, kwargs: dict):
+        self._name = name
+        self._session = session
+        self._method = method
+        self._url = url
+        self._kwargs = kwargs
+        self._resp = None
+
+    async def _send(self) -> aiohttp.ClientResponse:
+        for attempt in range(_MAX_429_RETRIES + 1):
+            await rate_limit.acquire(self._name)
+            resp = await self._session.request(self._method, self._url, **self._kwargs)
+            delay = rate_limit.note_response(self._name, resp.status, resp.headers)
+            if delay is None or attempt == _MAX_429_RETRIES or delay > _MAX_429_RETRY_WAIT:
+                return resp
+            resp.release()  # acquire() waits out the backoff before the retry
+        return resp
+
+    def __await__(self):
+        return self._send().__await__()
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self._resp = await self._send()
+        return await self._resp.__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._resp.__aexit__(exc_type, exc, tb)
+
+
+class _TimedSession:
+    """Thin view over a shared session that applies a default per-call timeout and rate limit."""
+
+    def __init__(self, name: str, session: aiohttp.ClientSession, timeout: aiohttp.ClientTimeout | None):
+        self._name = name
+        self._session = session
+        self._timeout = timeout
+
+    def request(self, method: str, url, **kwargs) -> _LimitedRequest:
+        if self._timeout is not None:
+            kwargs.setdefault('timeout', self._timeout)
+        return _LimitedRequest(self._name, self._session, method, url, kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+def timed_session(name: str, timeout: aiohttp.ClientTimeout | float | None = None) -> _TimedSession:
+    """Shared session for an upstream with a default timeout for every call made through it."""
+    if isinstance(timeout, (int, float)):
+        timeout = aiohttp.ClientTimeout(total=timeout)
+    return _TimedSession(name, get_session(name), timeout)
+
+
+@asynccontextmanager
+async def http_session(name: str, timeout: aiohttp.ClientTimeout | float | None = None):
+    """Borrow the shared session for an upstream (not closed on exit)."""
+    yield timed_session(name, timeout)
+
+
+async def reset_session(name: str):
+    """Drop a session after transport errors (e.g. broken SSL); next use creates a fresh one."""
+    session = _sessions.pop(name, None)
+    if session and not session.closed:
+        try:
+            await session.close()
+        except Exception:
+            pass
+
+
+async def close_sessions():
+    """Close all shared sessions (called on app shutdown)."""
+    for name in list(_sessions):
+        await reset_session(name)
+    logging.info("Closed shared HTTP sessions")
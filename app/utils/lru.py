@@ -0,0 +1,105 @@
+"""Byte-bounded LRU cache used for the in-process meta/videos tiers."""
+import sys
+from collections import OrderedDict
+
+import orjson
+
+
+def _approx_size(value) -> int:
+    """Approximate in-memory weight of a cached value via its JSON size."""
+    try:
+        return len(orjson.dumps(value))
+    except TypeError:
+        return sys.getsizeof(value)
+
+
+class ByteLRU:
+    """Dict-like LRU bounded by the approximate byte size of its values.
+
+    All operations are O(1) except the size estimate on insert. Reads via
+    get() move the key to the most-recent end and update hit/miss counters;
+    inserts evict from the least-recent end until the total fits max_bytes.
+    """
+
+    def __init__(self, max_bytes: int, name: str = ''):
+        self.max_bytes = max_bytes
+        self.name = name
+        self._data: OrderedDict = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, key, default=None):
+        """Read without touching recency or counters."""
+        entry = self._data.get(key)
+        return entry[0] if entry is not None else default
+
+    def weight(self, key) -> int | None:
+        """Charged size of a cached key (None if absent)."""
+        entry = self._data.get(key)
+        return entry[1] if entry is not None else None
+
+    def __getitem__(self, key):
+        value, _ = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def put(self, key, value, size: int | None = None):
+        """Insert value; pass size when the caller already knows it (e.g. serialised length)."""
+        if size is None:
+            size = _approx_size(value)
+        self.pop(key, None)
+        if size > self.max_bytes:
+            return  # would evict everything else; serve this one from the DB tier
+        self._data[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, old_size) = self._data.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def __delitem__(self, key):
+        _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self._bytes -= entry[1]
+        return entry[0]
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+        }
@@ -0,0 +1,239 @@
+"""Memory-mapped binary index of anime-list-full.json for in-process ID lookups.
+
+The mapping file is static, so instead of querying SQLite/Redis and JSON-decoding
+on every lookup we write it once as a compact snapshot and mmap it in each worker.
+Lookups are binary searches over sorted integer arrays (O(log n), no per-lookup
+decoding); the OS page cache shares the file between workers.
+
+File layout (native byte order):
+    header      MAGIC, version, source hash, section counts
+    imdb_keys   int64[n_imdb]    encoded IMDB id (see _imdb_key), sorted
+    entries     int32[n * 6]     mal, kitsu, tvdb, tmdb, season_tvdb, imdb string idx (-1 = none)
+    mal/kitsu/tvdb keys+vals     int32 sorted keys and entry indexes
+    imdb_vals   int32[n_imdb]    entry indexes for imdb_keys
+    str_offsets int32[n_str + 1] offsets into the interned IMDB string blob
+    str_blob    bytes
+"""
+import bisect
+import logging
+import mmap
+import os
+import re
+import struct
+from array import array
+
+MAGIC = b'DMAPIDX1'
+VERSION = 1
+_HEADER = struct.Struct('=8sI32s7I')  # magic, version, source_hash, 7 counts
+_ENTRY_FIELDS = 6
+_IMDB_RE = re.compile(r'^tt(\d{1,15})$')
+
+
+def _imdb_key(imdb_id: str) -> int | None:
+    """Encode 'tt0123456' as an integer that preserves the digit count (leading zeros)."""
+    m = _IMDB_RE.match(imdb_id or '')
+    if not m:
+        return None
+    digits = m.group(1)
+    return int(digits) * 16 + len(digits)
+
+
+def _first(value):
+    """Collapse list/dict ID fields (e.g. {"tv": 123}, ["tt1", "tt2"]) to their first value."""
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None) if value else None
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return value
+
+
+def _as_int(value) -> int:
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def normalize_entry(item: dict) -> tuple:
+    """Reduce a raw mapping item to (mal, kitsu, tvdb, tmdb, season_tvdb, imdb_ids)."""
+    imdb = item.get('imdb_id')
+    imdb_ids = [i for i in (imdb if isinstance(imdb, list) else [imdb]) if i]
+    season = item.get('season')
+    return (
+        _as_int(item.get('mal_id')),
+        _as_int(item.get('kitsu_id')),
+        _as_int(item.get('tvdb_id')),
+        _as_int(_first(item.get('themoviedb_id'))),
+        _as_int(season.get('tvdb')) if isinstance(season, dict) else 0,
+        imdb_ids,
+    )
+
+
+def build_index(entries, path: str, source_hash: str) -> int:
+    """Write the binary snapshot for an iterable of raw mapping items or normalize_entry() tuples.
+
+    Written to a temp file and renamed, so concurrent workers never see a partial file.
+    Returns the number of entries written.
+    """
+    rows = array('i')
+    strings: dict[str, int] = {}  # interned IMDB id -> string index
+    mal_pairs, kitsu_pairs, tvdb_pairs, imdb_pairs = [], [], [], []
+
+    n = 0
+    for item in entries:
+        mal, kitsu, tvdb, tmdb, season, imdb_ids = item if isinstance(item, tuple) else normalize_entry(item)
+        str_idx = -1
+        for pos, iid in enumerate(imdb_ids):
+            idx = strings.setdefault(iid, len(strings))
+            if pos == 0:
+                str_idx = idx
+            key = _imdb_key(iid)
+            if key is not None:
+                imdb_pairs.append((key, n))
+        rows.extend((mal, kitsu, tvdb, tmdb, season, str_idx))
+        if mal:
+            mal_pairs.append((mal, n))
+        if kitsu:
+            kitsu_pairs.append((kitsu, n))
+        if tvdb:
+            tvdb_pairs.append((tvdb, n))
+        n += 1
+
+    # Stable sort by key keeps file order for duplicate keys (same as SQLite/Redis backends)
+    sections = []
+    for pairs in (mal_pairs, kitsu_pairs, tvdb_pairs):
+        pairs.sort(key=lambda p: p[0])
+        sections.append((array('i', (k for k, _ in pairs)), array('i', (v for _, v in pairs))))
+    imdb_pairs.sort(key=lambda p: p[0])
+    imdb_keys = array('q', (k for k, _ in imdb_pairs))
+    imdb_vals = array('i', (v for _, v in imdb_pairs))
+
+    blob = bytearray()
+    offsets = array('i', [0])
+    for iid in strings:  # dict preserves insertion (= index) order
+        blob += iid.encode()
+        offsets.append(len(blob))
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, source_hash.encode()[:32].ljust(32, b'\0'),
+        n, len(mal_pairs), len(kitsu_pairs), len(tvdb_pairs), len(imdb_pairs), len(strings), len(blob),
+    )
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(b'\0' * (-len(header) % 8))  # 8-byte align the int64 section
+        imdb_keys.tofile(f)
+        rows.tofile(f)
+        for keys, vals in sections:
+            keys.tofile(f)
+            vals.tofile(f)
+        imdb_vals.tofile(f)
+        offsets.tofile(f)
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return n
+
+
+class MappingIndex:
+    """Read-only view over an mmapped snapshot written by build_index()."""
+
+    def __init__(self, mm: mmap.mmap, counts: tuple):
+        n, n_mal, n_kitsu, n_tvdb, n_imdb, n_str, blob_len = counts
+        self._mm = mm
+        view = memoryview(mm)
+        offset = _HEADER.size + (-_HEADER.size % 8)
+
+        def take(fmt: str, count: int):
+            nonlocal offset
+            size = count * (8 if fmt == 'q' else 4)
+            section = view[offset:offset + size].cast(fmt)
+            offset += size
+            return section
+
+        self._imdb_keys = take('q', n_imdb)
+        self._entries = take('i', n * _ENTRY_FIELDS)
+        self._mal_keys, self._mal_vals = take('i', n_mal), take('i', n_mal)
+        self._kitsu_keys, self._kitsu_vals = take('i', n_kitsu), take('i', n_kitsu)
+        self._tvdb_keys, self._tvdb_vals = take('i', n_tvdb), take('i', n_tvdb)
+        self._imdb_vals = take('i', n_imdb)
+        self._str_offsets = take('i', n_str + 1)
+        self._str_blob = view[offset:offset + blob_len]
+        self.size = n
+
+    def _entry(self, idx: int) -> dict:
+        """Build a mapping item dict in the same shape the SQLite/Redis backends return."""
+        base = idx * _ENTRY_FIELDS
+        mal, kitsu, tvdb, tmdb, season, str_idx = self._entries[base:base + _ENTRY_FIELDS]
+        item = {}
+        if mal:
+            item['mal_id'] = mal
+        if kitsu:
+            item['kitsu_id'] = kitsu
+        if str_idx >= 0:
+            start, end = self._str_offsets[str_idx], self._str_offsets[str_idx + 1]
+            item['imdb_id'] = bytes(self._str_blob[start:end]).decode()
+        if tvdb:
+            item['tvdb_id'] = tvdb
+        if tmdb:
+            item['themoviedb_id'] = tmdb
+        if season:
+            item['season'] = {'tvdb': season}
+        return item
+
+    @staticmethod
+    def _range(keys, key: int) -> tuple[int, int]:
+        lo = bisect.bisect_left(keys, key)
+        hi = bisect.bisect_right(keys, key, lo)
+        return lo, hi
+
+    def _first_match(self, keys, vals, key) -> dict | None:
+        try:
+            key = int(key)
+        except (TypeError, ValueError):
+            return None
+        lo, hi = self._range(keys, key)
+        return self._entry(vals[lo]) if lo < hi else None
+
+    def _all_matches(self, keys, vals, key) -> list[dict]:
+        lo, hi = self._range(keys, key)
+        return [self._entry(vals[i]) for i in range(lo, hi)]
+
+    def get_by_mal(self, mal_id) -> dict | None:
+        return self._first_match(self._mal_keys, self._mal_vals, mal_id)
+
+    def get_by_kitsu(self, kitsu_id) -> dict | None:
+        return self._first_match(self._kitsu_keys, self._kitsu_vals, kitsu_id)
+
+    def get_by_tvdb(self, tvdb_id) -> list[dict]:
+        try:
+            tvdb_id = int(tvdb_id)
+        except (TypeError, ValueError):
+            return []
+        return self._all_matches(self._tvdb_keys, self._tvdb_vals, tvdb_id)
+
+    def get_by_imdb(self, imdb_id: str) -> list[dict]:
+        key = _imdb_key(imdb_id)
+        if key is None:
+            return []
+        return self._all_matches(self._imdb_keys, self._imdb_vals, key)
+
+
+def open_index(path: str, source_hash: str) -> MappingIndex | None:
+    """mmap an existing snapshot. Returns None if missing, corrupt or built from a different source."""
+    try:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    except OSError as e:
+        logging.warning(f"Could not open mapping index {path}: {e}")
+        return None
+    try:
+        magic, version, stored_hash, *counts = _HEADER.unpack_from(mm, 0)
+    except struct.error:
+        mm.close()
+        return None
+    if magic != MAGIC or version != VERSION or stored_hash.rstrip(b'\0').decode() != source_hash[:32]:
+        mm.close()
+        return None
+    return MappingIndex(mm, tuple(counts))
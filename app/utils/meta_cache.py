@@ -1,69 +1,142 @@
 """Shared cache for anime metadata."""
 import asyncio
+import hashlib
 import time
 import orjson
 import urllib.parse
 from config import Config
 from app.utils.anime_mapping import get_ids_from_mal_id, get_all_seasons_for_tvdb_id
-from app.db import execute
+from app.db import execute, execute_batch
+from app.utils.single_flight import single_flight
+from app.utils.lru import ByteLRU
+from app.utils.http_sessions import http_session
+from app.utils.shared_cache import l2_get, l2_set
+from app.utils import blob_codec
 
 CACHE_TTL = 2592000  # 1 month
 CACHE_TTL_UPCOMING = 43200  # 12 hours for "Upcoming" series (status may change)
 VIDEOS_TTL_AIRING = 3600  # 1 hour for airing series
 VIDEOS_TTL_FINISHED = 86400  # 1 day for finished series (detects new seasons quickly)
 VIDEOS_TTL_MOVIE = 2592000  # 1 month for movies (never changes)
-_MAX_MEM_CACHE = 50  # Max entries in memory (reduced for 512MB environments)
-_mem_cache: dict[str, tuple[dict, float]] = {}  # mal_id -> (meta, timestamp)
-_videos_mem_cache: dict[str, tuple[list, float, int, list]] = {}  # mal_id -> (videos, timestamp, ttl_override, season_posters)
-# Per-season episode cache TTLs (data lives in DB, not RAM)
+# In-process LRU tiers bounded by approximate bytes (sized for 512MB environments)
+_mem_cache = ByteLRU(int(Config.META_MEM_CACHE_MB * 1024 * 1024), 'meta')  # mal_id -> (meta, timestamp)
+# mal_id -> (videos, timestamp, ttl_override, season_posters), or mal_id -> "franchise:tvdb_id:layout"
+# pointing at one shared entry of that form, mirroring franchise_videos/videos_pointer
+_videos_mem_cache = ByteLRU(int(Config.VIDEOS_MEM_CACHE_MB * 1024 * 1024), 'videos')
+_VIDEOS_MEM_POINTER_SIZE = 64
+# Max age of the series-level episode store when serving a season (data lives in DB, hot series in RAM)
 _SEASON_CACHE_TTL_FINISHED = 2592000  # 1 month for finished seasons
 _SEASON_CACHE_TTL_ONGOING = 1800  # 30 min for ongoing (last) season
+_series_episodes_mem = ByteLRU(8 * 1024 * 1024, 'tvdb_episodes')  # "tvdb_id:all:lang" -> (episodes, ts)
 
 
-def _evict_mem_cache():
-    """Evict oldest entries if memory cache exceeds limit."""
-    if len(_mem_cache) > _MAX_MEM_CACHE:
-        # Remove oldest 25%
-        sorted_keys = sorted(_mem_cache, key=lambda k: _mem_cache[k][1])
-        for k in sorted_keys[:len(sorted_keys) // 4]:
-            del _mem_cache[k]
-    if len(_videos_mem_cache) > _MAX_MEM_CACHE:
-        sorted_keys = sorted(_videos_mem_cache, key=lambda k: _videos_mem_cache[k][1])
-        for k in sorted_keys[:len(sorted_keys) // 4]:
-            del _videos_mem_cache[k]
+# Cross-worker L2 between the memory tiers and the DB — only worth it when the DB is remote
+# (a local SQLite file is already shared by every worker of the container)
+_USE_L2 = bool(Config.TURSO_URL and Config.TURSO_TOKEN)
+
+# Stale-while-revalidate: max seconds past TTL an entry may still be served, per source
+_SWR_MAX_STALE = {'meta': Config.SWR_META_MAX_STALE, 'videos': Config.SWR_VIDEOS_MAX_STALE}
+_refresh_tasks: dict[str, asyncio.Task] = {}  # "source:mal_id" -> background refresh
+_swr_stats = {'stale_served': 0, 'refreshes': 0, 'refresh_failures': 0}
+
+
+def mem_cache_stats() -> dict:
+    """Hit/miss/eviction counters of the in-process meta, videos and TVDB episode tiers."""
+    return {'meta': _mem_cache.stats(), 'videos': _videos_mem_cache.stats(), 'tvdb_episodes': _series_episodes_mem.stats()}
+
+
+def swr_stats() -> dict:
+    """Stale-while-revalidate counters (stale responses served, background refreshes)."""
+    return {**_swr_stats, 'refreshing': len(_refresh_tasks)}
+
+
+def _can_serve_stale(source: str, ts: float, ttl: int) -> bool:
+    """True if an expired entry is still within the source's max-staleness window."""
+    return 0 <= time.time() - ts - ttl <= _SWR_MAX_STALE.get(source, 0)
+
+
+def _schedule_refresh(source: str, mal_id: str, factory):
+    """Rebuild an entry in the background, at most once at a time per (source, mal_id).
+
+    Runs through single_flight, so a foreground miss for the same mal_id joins it.
+    """
+    import logging
+    key = f"{source}:{mal_id}"
+    if key in _refresh_tasks:
+        return
+
+    async def _run():
+        try:
+            result = await single_flight(source, mal_id, factory)
+            _swr_stats['refreshes' if result else 'refresh_failures'] += 1
+        except Exception as e:
+            _swr_stats['refresh_failures'] += 1
+            logging.warning(f"[SWR] Background refresh failed for {key}: {type(e).__name__}: {e}")
+        finally:
+            _refresh_tasks.pop(key, None)
+
+    _refresh_tasks[key] = asyncio.ensure_future(_run())
 
 
 async def _fetch_season_cached(tvdb_id: int, season_num: int, lang: str, is_last_season: bool) -> list:
-    """Fetch episodes for a TVDB season with DB-backed caching.
+    """Episodes of one TVDB season, sliced from the series-level episode store.
     
-    Finished seasons (not last) are cached for 1 month.
-    The last/ongoing season is cached for 3h.
+    TVDB returns every page of the series regardless of season, so all
+    episodes are fetched once per (tvdb_id, lang) and every season is served
+    from that list. Requests for finished seasons (not last) accept a store
+    up to 1 month old; the last/ongoing season needs one younger than 30 min.
     """
-    from app.api.tvdb import get_series_episodes
-
-    cache_key = f"{tvdb_id}:{season_num}:{lang}"
     ttl = _SEASON_CACHE_TTL_ONGOING if is_last_season else _SEASON_CACHE_TTL_FINISHED
+    episodes = await _fetch_series_episodes_cached(tvdb_id, lang, ttl)
+    if season_num is None:
+        return episodes  # no season mapping: the whole series (e.g. single-entry long runners)
+    return [ep for ep in episodes if ep.get("seasonNumber") == season_num]
 
-    # Check DB cache
-    rows = await execute(
-        "SELECT episodes, timestamp FROM season_episodes_cache WHERE cache_key=?",
-        (cache_key,)
-    )
-    if rows:
-        ts = rows[0]['timestamp']
-        if time.time() - ts < ttl:
-            return orjson.loads(rows[0]['episodes'])
-        # Expired — delete
-        await execute("DELETE FROM season_episodes_cache WHERE cache_key=?", (cache_key,))
 
-    # Fetch from TVDB
-    episodes = await get_series_episodes(tvdb_id, season_number=season_num, lang=lang)
+async def purge_legacy_season_rows():
+    """Drop per-season rows ("tvdb_id:season:lang") left over from before the series-level store."""
+    await execute("DELETE FROM season_episodes_cache WHERE cache_key NOT LIKE '%:all:%'")
+
+
+async def _fetch_series_episodes_cached(tvdb_id: int, lang: str, max_age: int) -> list:
+    """All episodes of a TVDB series (memory -> DB -> one TVDB listing), at most max_age old."""
+    cache_key = f"{tvdb_id}:all:{lang}"
+    entry = _series_episodes_mem.get(cache_key)
+    if entry is None:
+        rows = await execute(
+            "SELECT episodes, timestamp FROM season_episodes_cache WHERE cache_key=?",
+            (cache_key,)
+        )
+        if rows:
+            episodes, size = blob_codec.decode_sized(rows[0]['episodes'])
+            entry = (episodes, rows[0]['timestamp'])
+            _series_episodes_mem.put(cache_key, entry, size=size)
+    if entry is not None and time.time() - entry[1] < max_age:
+        return entry[0]
+
+    # Concurrent season requests of one series share a single download
+    return await single_flight('tvdb_episodes', cache_key, lambda: _download_series_episodes(tvdb_id, lang, cache_key))
+
 
-    # Store in DB (don't cache empty results for finished seasons — might be transient error)
+async def _download_series_episodes(tvdb_id: int, lang: str, cache_key: str) -> list:
+    from app.api.tvdb import get_series_episodes, IncompleteListing
+
+    try:
+        episodes = await get_series_episodes(tvdb_id, lang=lang)
+    except IncompleteListing as e:
+        import logging
+        # A page was dropped mid-listing — serve nothing rather than cache the gap
+        logging.warning(f"[TVDB] {e}, not caching")
+        return []
+
+    # Don't cache empty results — might be transient error
     if episodes:
+        now = int(time.time())
+        episodes_json = orjson.dumps(episodes)
+        _series_episodes_mem.put(cache_key, (episodes, now), size=len(episodes_json))
         await execute(
             "INSERT OR REPLACE INTO season_episodes_cache (cache_key, episodes, timestamp) VALUES (?,?,?)",
-            (cache_key, orjson.dumps(episodes).decode(), int(time.time()))
+            (cache_key, blob_codec.compress(episodes_json), now)
         )
 
     return episodes
@@ -81,163 +154,441 @@ def _meta_ttl(meta: dict) -> int:
 
 async def get_cached_meta(mal_id: str):
     """Get cached metadata by MAL ID."""
-    if mal_id in _mem_cache:
-        meta, ts = _mem_cache[mal_id]
+    entry = _mem_cache.get(mal_id)
+    if entry:
+        meta, ts = entry
         if time.time() - ts < _meta_ttl(meta):
             return meta
-        del _mem_cache[mal_id]
+        if not _can_serve_stale('meta', ts, _meta_ttl(meta)):
+            del _mem_cache[mal_id]
+    elif _USE_L2:
+        shared = await l2_get('meta', mal_id)
+        if shared and time.time() - shared['ts'] < _meta_ttl(shared['meta']):
+            _mem_cache[mal_id] = (shared['meta'], shared['ts'])
+            return shared['meta']
     rows = await execute("SELECT meta, timestamp FROM meta_cache WHERE mal_id=?", (mal_id,))
     if rows:
-        meta = orjson.loads(rows[0]['meta'])
+        meta = blob_codec.decode(rows[0]['meta'])
         if time.time() - rows[0]['timestamp'] < _meta_ttl(meta):
             return meta
         # Expired — don't delete here, _get_expired_meta needs it for translation reuse
     return None
 
 
+async def _get_stale_meta(mal_id: str) -> dict | None:
+    """Get an expired meta that is still within the SWR window (mem tier first, then DB)."""
+    if not _SWR_MAX_STALE['meta']:
+        return None
+    entry = _mem_cache.peek(mal_id)
+    if entry:
+        meta, ts = entry
+    else:
+        rows = await execute("SELECT meta, timestamp FROM meta_cache WHERE mal_id=?", (mal_id,))
+        if not rows:
+            return None
+        meta, ts = blob_codec.decode(rows[0]['meta']), rows[0]['timestamp']
+    return meta if _can_serve_stale('meta', ts, _meta_ttl(meta)) else None
+
+
 async def _get_expired_meta(mal_id: str) -> dict | None:
     """Get expired cached meta (for reusing old translations). Does not delete."""
     rows = await execute("SELECT meta FROM meta_cache WHERE mal_id=?", (mal_id,))
     if rows:
-        return orjson.loads(rows[0]['meta'])
+        return blob_codec.decode(rows[0]['meta'])
     return None
 
 
+def _pending_statement(mal_id: str, kind: str, pending: int) -> tuple[str, tuple]:
+    """translation_pending upkeep for one row: (mal_id, kind) is listed only while pending > 0."""
+    if pending:
+        return ("INSERT OR REPLACE INTO translation_pending (mal_id, kind, pending) VALUES (?,?,?)",
+                (mal_id, kind, pending))
+    return ("DELETE FROM translation_pending WHERE mal_id=? AND kind=?", (mal_id, kind))
+
+
+def _meta_pending(meta: dict) -> int:
+    return 1 if meta.get('_untranslated_description') and meta.get('description') else 0
+
+
+def _videos_pending(videos: list) -> int:
+    """Episodes the translation cron would pick up (flagged and non-empty)."""
+    return sum(
+        1 for v in videos or []
+        if (v.get('_untranslated_title') and v.get('title')) or (v.get('_untranslated_overview') and v.get('overview'))
+    )
+
+
+async def ensure_translation_pending_index():
+    """One-time backfill of translation_pending from rows cached before it existed.
+
+    The only LIKE scan left; afterwards set_cached_meta/set_cached_videos keep
+    the table current. Video rows get pending=1 until their next write. Only
+    legacy JSON text rows can lack an entry, so the scan never needs to look
+    inside compressed (blob_codec) rows.
+    """
+    if await execute("SELECT 1 FROM schema_migrations WHERE name='translation_pending_backfill'"):
+        return
+    # Earlier builds marked the backfill with a ('', 'backfilled') row in translation_pending itself
+    done = await execute("SELECT 1 FROM translation_pending WHERE kind='backfilled' LIMIT 1")
+    statements = [] if done else [
+        ("INSERT OR IGNORE INTO translation_pending (mal_id, kind, pending) "
+         "SELECT mal_id, 'meta', 1 FROM meta_cache WHERE meta LIKE '%_untranslated_description%'", ()),
+        ("INSERT OR IGNORE INTO translation_pending (mal_id, kind, pending) "
+         "SELECT mal_id, 'videos', 1 FROM videos_cache WHERE videos LIKE '%_untranslated_%'", ()),
+    ]
+    await execute_batch(statements + [
+        ("DELETE FROM translation_pending WHERE kind='backfilled'", ()),
+        ("INSERT OR REPLACE INTO schema_migrations (name, applied_at) VALUES ('translation_pending_backfill', ?)",
+         (int(time.time()),)),
+    ])
+    if not done:
+        import logging
+        logging.info("[Translate] Backfilled translation_pending index")
+
+
+# (table, key column, value column) of the rows stored through blob_codec
+_BLOB_TABLES = [
+    ('meta_cache', 'mal_id', 'meta'),
+    ('videos_cache', 'mal_id', 'videos'),
+    ('season_episodes_cache', 'cache_key', 'episodes'),
+]
+
+
+async def migrate_blob_rows(chunk: int = 200) -> dict:
+    """Re-encode legacy JSON text rows with blob_codec, chunk rows per round trip.
+
+    Returns {table: {'rows', 'bytes_before', 'bytes_after'}}. Rows rewritten
+    concurrently (different timestamp) are left to their writer.
+    """
+    import logging
+    await ensure_translation_pending_index()  # its LIKE scan needs the text rows
+    report = {}
+    for table, key_col, value_col in _BLOB_TABLES:
+        stats = {'rows': 0, 'bytes_before': 0, 'bytes_after': 0}
+        last_key = ''
+        while True:
+            rows = await execute(
+                f"SELECT {key_col}, {value_col}, timestamp FROM {table} "
+                f"WHERE {key_col} > ? AND hex(substr({value_col}, 1, 2)) != ? ORDER BY {key_col} LIMIT ?",
+                (last_key, blob_codec.MAGIC.hex().upper(), chunk)
+            )
+            if not rows:
+                break
+            statements = []
+            for row in rows:
+                raw = row[value_col]
+                raw = raw.encode() if isinstance(raw, str) else bytes(raw)
+                blob = blob_codec.compress(orjson.dumps(orjson.loads(raw)))
+                statements.append((
+                    f"UPDATE {table} SET {value_col}=? WHERE {key_col}=? AND timestamp=?",
+                    (blob, row[key_col], row['timestamp'])
+                ))
+                stats['rows'] += 1
+                stats['bytes_before'] += len(raw)
+                stats['bytes_after'] += len(blob)
+            await execute_batch(statements)
+            last_key = rows[-1][key_col]
+        report[table] = stats
+        logging.info(f"[BlobCodec] {table}: re-encoded {stats['rows']} rows, "
+                     f"{stats['bytes_before']} -> {stats['bytes_after']} bytes")
+    return report
+
+
 async def set_cached_meta(mal_id: str, meta: dict):
     """Cache metadata by MAL ID with timestamp (videos excluded)."""
     meta_to_cache = {k: v for k, v in meta.items() if k != 'videos'}
-    _mem_cache[mal_id] = (meta_to_cache, int(time.time()))
-    _evict_mem_cache()
-    await execute(
-        "INSERT OR REPLACE INTO meta_cache (mal_id, meta, timestamp) VALUES (?,?,?)",
-        (mal_id, orjson.dumps(meta_to_cache).decode(), int(time.time()))
-    )
+    meta_json = orjson.dumps(meta_to_cache)
+    _mem_cache.put(mal_id, (meta_to_cache, int(time.time())), size=len(meta_json))
+    await execute_batch([
+        ("INSERT OR REPLACE INTO meta_cache (mal_id, meta, timestamp) VALUES (?,?,?)",
+         (mal_id, blob_codec.compress(meta_json), int(time.time()))),
+        _pending_statement(mal_id, 'meta', _meta_pending(meta_to_cache)),
+    ])
+    if _USE_L2:
+        await l2_set('meta', mal_id, {'meta': meta_to_cache, 'ts': int(time.time())}, _meta_ttl(meta_to_cache))
+
+
+async def set_cached_meta_many(metas: dict[str, dict]):
+    """Cache several metas in one DB round trip (used by translation cron)."""
+    if not metas:
+        return
+    now = int(time.time())
+    statements = []
+    for mal_id, meta in metas.items():
+        meta_to_cache = {k: v for k, v in meta.items() if k != 'videos'}
+        meta_json = orjson.dumps(meta_to_cache)
+        _mem_cache.put(mal_id, (meta_to_cache, now), size=len(meta_json))
+        statements.append((
+            "INSERT OR REPLACE INTO meta_cache (mal_id, meta, timestamp) VALUES (?,?,?)",
+            (mal_id, blob_codec.compress(meta_json), now)
+        ))
+        statements.append(_pending_statement(mal_id, 'meta', _meta_pending(meta_to_cache)))
+        if _USE_L2:
+            await l2_set('meta', mal_id, {'meta': meta_to_cache, 'ts': now}, _meta_ttl(meta_to_cache))
+    await execute_batch(statements)
+
+
+def _videos_mem_entry(mal_id: str, peek: bool = False) -> tuple | None:
+    """Memory-tier videos entry of a MAL ID, following franchise pointers."""
+    lookup = _videos_mem_cache.peek if peek else _videos_mem_cache.get
+    entry = lookup(mal_id)
+    if isinstance(entry, str):
+        entry = lookup(entry)
+        if entry is None:
+            _videos_mem_cache.pop(mal_id, None)  # shared entry was evicted
+    return entry
+
+
+def _franchise_key(tvdb_id, layout: str) -> str:
+    """Key of a shared franchise entry in the videos memory tier and L2 (mirrors franchise_videos)."""
+    return f"franchise:{tvdb_id}:{layout}"
+
+
+def _videos_mem_put(mal_ids: list[str], entry: tuple, size: int | None, tvdb_id=None, layout: str = None):
+    """Store an entry once: shared under its franchise key (charged once) when known, else per MAL ID.
+
+    size=None reuses the weight of an already cached franchise entry (or measures it).
+    """
+    if tvdb_id is None or layout is None:
+        for mal_id in mal_ids:
+            _videos_mem_cache.put(mal_id, entry, size=size)
+        return
+    key = _franchise_key(tvdb_id, layout)
+    _videos_mem_cache.put(key, entry, size=size or _videos_mem_cache.weight(key))
+    for mal_id in mal_ids:
+        _videos_mem_cache.put(mal_id, key, size=_VIDEOS_MEM_POINTER_SIZE)
+
+
+async def _videos_mem_remember(mal_id: str, entry: tuple):
+    """Put a freshly built entry in the memory tier under the same franchise key set_cached_videos will use."""
+    videos = entry[0]
+    tvdb_id = (await get_ids_from_mal_id(mal_id)).get('tvdb_id') if videos else None
+    if tvdb_id:
+        _videos_mem_put([mal_id], entry, None, int(tvdb_id), _videos_layout(videos))
+    else:
+        _videos_mem_put([mal_id], entry, None)
 
 
 async def get_cached_videos(mal_id: str) -> list | None:
     """Get cached videos by MAL ID, respecting TTL based on airing status or override."""
-    if mal_id in _videos_mem_cache:
-        videos, ts, ttl_override, _ = _videos_mem_cache[mal_id]
+    entry = _videos_mem_entry(mal_id)
+    if entry:
+        videos, ts, ttl_override, _ = entry
         ttl = ttl_override if ttl_override else _videos_ttl(videos)
         if time.time() - ts < ttl:
             return videos
         del _videos_mem_cache[mal_id]
+    elif (shared := await _get_shared_videos(mal_id)) is not None:
+        return shared[0]
 
-    rows = await execute("SELECT videos, timestamp FROM videos_cache WHERE mal_id=?", (mal_id,))
+    rows = await execute("SELECT videos, timestamp, tvdb_id, layout FROM videos_view WHERE mal_id=?", (mal_id,))
     if rows:
-        data = orjson.loads(rows[0]['videos'])
+        data, size = blob_codec.decode_sized(rows[0]['videos'])
         videos, sp = _unpack_videos_cache(data)
         ts = rows[0]['timestamp']
         ttl = _videos_ttl(videos)
         if time.time() - ts < ttl:
-            _videos_mem_cache[mal_id] = (videos, ts, 0, sp)
+            _videos_mem_put([mal_id], (videos, ts, 0, sp), size, rows[0]['tvdb_id'], rows[0]['layout'])
             return videos
     return None
 
 
 async def _get_cached_videos_with_expired(mal_id: str) -> tuple:
-    """Get cached videos. Returns (valid_cache, expired_data).
+    """Get cached videos. Returns (valid_cache, expired_data, stale_posters).
     
-    - If cache is valid: returns (videos, None)
-    - If cache is expired: returns (None, expired_videos) for reuse as prev_translations
-    - If no cache at all: returns (None, None)
+    - If cache is valid: returns (videos, None, None)
+    - If cache is expired: returns (None, expired_videos, None) for reuse as prev_translations
+    - If expired but within the SWR window: returns (None, expired_videos, season_posters)
+    - If no cache at all: returns (None, None, None)
     Single DB query instead of two.
     """
-    if mal_id in _videos_mem_cache:
-        videos, ts, ttl_override, _ = _videos_mem_cache[mal_id]
+    entry = _videos_mem_entry(mal_id)
+    if entry:
+        videos, ts, ttl_override, sp = entry
         ttl = ttl_override if ttl_override else _videos_ttl(videos)
         if time.time() - ts < ttl:
-            return videos, None
+            return videos, None, None
         del _videos_mem_cache[mal_id]
-        return None, videos  # expired but reusable
+        # expired but reusable
+        return None, videos, (sp if videos and _can_serve_stale('videos', ts, ttl) else None)
+    if (shared := await _get_shared_videos(mal_id)) is not None:
+        return shared[0], None, None
 
-    rows = await execute("SELECT videos, timestamp FROM videos_cache WHERE mal_id=?", (mal_id,))
+    rows = await execute("SELECT videos, timestamp, tvdb_id, layout FROM videos_view WHERE mal_id=?", (mal_id,))
     if rows:
-        data = orjson.loads(rows[0]['videos'])
+        data, size = blob_codec.decode_sized(rows[0]['videos'])
         videos, sp = _unpack_videos_cache(data)
         ts = rows[0]['timestamp']
         ttl = _videos_ttl(videos)
         # Force refetch if cache is in old format (no season posters) and series has multiple seasons
         if not sp and isinstance(data, list) and videos:
-            ids = get_ids_from_mal_id(mal_id)
+            ids = await get_ids_from_mal_id(mal_id)
             if ids.get('tvdb_id'):
-                all_seasons = get_all_seasons_for_tvdb_id(ids['tvdb_id'])
+                all_seasons = await get_all_seasons_for_tvdb_id(ids['tvdb_id'])
                 if len(all_seasons) > 1:
-                    return None, videos  # treat as expired to trigger refetch with posters
+                    return None, videos, None  # treat as expired to trigger refetch with posters
         if time.time() - ts < ttl:
-            _videos_mem_cache[mal_id] = (videos, ts, 0, sp)
-            return videos, None
-        return None, videos  # expired but reusable
-    return None, None
+            _videos_mem_put([mal_id], (videos, ts, 0, sp), size, rows[0]['tvdb_id'], rows[0]['layout'])
+            return videos, None, None
+        # expired but reusable
+        return None, videos, (sp if videos and _can_serve_stale('videos', ts, ttl) else None)
+    return None, None, None
+
+
+async def _get_shared_videos(mal_id: str) -> tuple | None:
+    """Fresh videos entry from the cross-worker L2 (also fills the memory tier), or None."""
+    if not _USE_L2:
+        return None
+    shared = await l2_get('videos', mal_id)
+    franchise = None
+    if shared and 'ref' in shared:
+        # Pointer to the franchise entry shared by all sibling MAL IDs
+        franchise = shared['ref']
+        shared = await l2_get('videos', _franchise_key(*franchise))
+    if not shared:
+        return None
+    ttl = shared['ttl_override'] or _videos_ttl(shared['videos'])
+    if time.time() - shared['ts'] >= ttl:
+        return None
+    entry = (shared['videos'], shared['ts'], shared['ttl_override'], shared['sp'])
+    _videos_mem_put([mal_id], entry, None, *(franchise or ()))
+    return entry
+
+
+async def get_sibling_videos(mal_id: str, tvdb_id) -> list[tuple[str, list]]:
+    """Load cached videos of all sibling MAL IDs (same tvdb_id) in one query.
+
+    Returns [(sibling_mal_id, videos), ...] in season order, excluding mal_id itself.
+    """
+    if not tvdb_id:
+        return []
+    sib_ids = [str(s.get('mal_id')) for s in await get_all_seasons_for_tvdb_id(tvdb_id)
+               if s.get('mal_id') and str(s.get('mal_id')) != str(mal_id)]
+    if not sib_ids:
+        return []
+    placeholders = ','.join('?' * len(sib_ids))
+    rows = await execute(
+        f"SELECT mal_id, videos, tvdb_id, layout FROM videos_view WHERE mal_id IN ({placeholders})",
+        tuple(sib_ids)
+    )
+    # Siblings pointing at the same franchise row share one list (decoded once, listed once)
+    by_id, seen = {}, set()
+    for row in rows:
+        if row['layout'] is not None:
+            if (row['tvdb_id'], row['layout']) in seen:
+                continue
+            seen.add((row['tvdb_id'], row['layout']))
+        by_id[str(row['mal_id'])] = _unpack_videos_cache(blob_codec.decode(row['videos']))[0]
+    return [(sib, by_id[sib]) for sib in sib_ids if by_id.get(sib)]
+
+
+def _translation_map(videos: list) -> dict:
+    """Build vid_id -> {"title": ..., "overview": ...} from already-translated episodes."""
+    result = {}
+    for v in videos or []:
+        vid_id = v.get('id')
+        if not vid_id:
+            continue
+        if v.get('title') and not v.get('_untranslated_title'):
+            result.setdefault(vid_id, {})['title'] = v['title']
+        if v.get('overview') and not v.get('_untranslated_overview'):
+            result.setdefault(vid_id, {})['overview'] = v['overview']
+    return result
+
+
+def apply_translation_map(videos: list, translations: dict) -> int:
+    """Copy translations onto untranslated episodes. Returns number of fields applied."""
+    applied = 0
+    for v in videos:
+        prev = translations.get(v.get('id'))
+        if not prev:
+            continue
+        if prev.get('title') and v.get('_untranslated_title'):
+            v['title'] = prev['title']
+            v.pop('_untranslated_title', None)
+            applied += 1
+        if prev.get('overview') and v.get('_untranslated_overview'):
+            v['overview'] = prev['overview']
+            v.pop('_untranslated_overview', None)
+            applied += 1
+    return applied
+
+
+def _videos_layout(videos: list) -> str:
+    """Digest of the ordered video IDs: rebuilds and translation fixes keep it, new episodes change it."""
+    return hashlib.sha1('\n'.join(str(v.get('id') or '') for v in videos).encode()).hexdigest()[:16]
 
 
 async def set_cached_videos(mal_id: str, videos: list, ttl_override: int = 0, season_posters: list = None):
     """Cache videos list by MAL ID. If ttl_override > 0, use that instead of computed TTL.
     
-    Also propagates cache to all sibling MAL IDs that share the same tvdb_id,
-    so translations done for one season are immediately available for all.
-    Before propagating, merges any translations from siblings into our data.
+    Entries with a tvdb_id are stored once per franchise in franchise_videos
+    (keyed by tvdb_id and the layout of the list) and every sibling MAL ID
+    sharing the tvdb_id gets a pointer row, so translations done for one
+    season are immediately available for all and a fix rewrites one row.
+    Before saving, merges any translations from siblings into our data.
+    Entries without a tvdb_id (and movies) keep a plain videos_cache row.
+    All writes go out as one batch.
     """
-    cache_data = _pack_videos_cache(videos, season_posters)
-    cache_json = orjson.dumps(cache_data).decode()
     now = int(time.time())
 
     # Before saving, check siblings for translations we're missing
-    ids = get_ids_from_mal_id(mal_id)
+    ids = await get_ids_from_mal_id(mal_id)
     if ids.get('tvdb_id') and videos and any(v.get('_untranslated_title') or v.get('_untranslated_overview') for v in videos):
-        siblings = get_all_seasons_for_tvdb_id(ids['tvdb_id'])
-        for sibling in siblings:
-            sib_mal = str(sibling.get('mal_id'))
-            if sib_mal and sib_mal != mal_id:
-                sib_rows = await execute("SELECT videos FROM videos_cache WHERE mal_id=?", (sib_mal,))
-                if sib_rows:
-                    sib_data = orjson.loads(sib_rows[0]['videos'])
-                    sib_vids = sib_data['v'] if isinstance(sib_data, dict) and 'v' in sib_data else (sib_data if isinstance(sib_data, list) else [])
-                    # Build map of translations from sibling
-                    sib_map = {}
-                    for v in sib_vids:
-                        vid_id = v.get('id')
-                        if not vid_id:
-                            continue
-                        if v.get('title') and not v.get('_untranslated_title'):
-                            sib_map.setdefault(vid_id, {})['title'] = v['title']
-                        if v.get('overview') and not v.get('_untranslated_overview'):
-                            sib_map.setdefault(vid_id, {})['overview'] = v['overview']
-                    if sib_map:
-                        # Apply sibling's translations to our videos
-                        for v in videos:
-                            vid_id = v.get('id')
-                            if vid_id and vid_id in sib_map:
-                                if sib_map[vid_id].get('title') and v.get('_untranslated_title'):
-                                    v['title'] = sib_map[vid_id]['title']
-                                    v.pop('_untranslated_title', None)
-                                if sib_map[vid_id].get('overview') and v.get('_untranslated_overview'):
-                                    v['overview'] = sib_map[vid_id]['overview']
-                                    v.pop('_untranslated_overview', None)
-                        # Rebuild cache data with merged translations
-                        cache_data = _pack_videos_cache(videos, season_posters)
-                        cache_json = orjson.dumps(cache_data).decode()
-                        break  # one sibling is enough
-
-    await execute(
-        "INSERT OR REPLACE INTO videos_cache (mal_id, videos, timestamp) VALUES (?,?,?)",
-        (mal_id, cache_json, now)
-    )
-    _videos_mem_cache[mal_id] = (videos, now, ttl_override, season_posters or [])
-
-    # Propagate to siblings
+        for _, sib_vids in await get_sibling_videos(mal_id, ids['tvdb_id']):
+            sib_map = _translation_map(sib_vids)
+            if sib_map:
+                apply_translation_map(videos, sib_map)
+                break  # one sibling is enough
+
+    cache_json = orjson.dumps(_pack_videos_cache(videos, season_posters))
+    cache_blob = blob_codec.compress(cache_json)
+    targets = [mal_id]
     if ids.get('tvdb_id') and videos:
-        siblings = get_all_seasons_for_tvdb_id(ids['tvdb_id'])
-        for sibling in siblings:
-            sib_mal = str(sibling.get('mal_id'))
-            if sib_mal and sib_mal != mal_id:
-                await execute(
-                    "INSERT OR REPLACE INTO videos_cache (mal_id, videos, timestamp) VALUES (?,?,?)",
-                    (sib_mal, cache_json, now)
-                )
-                _videos_mem_cache[sib_mal] = (videos, now, ttl_override, season_posters or [])
+        targets += [str(s.get('mal_id')) for s in await get_all_seasons_for_tvdb_id(ids['tvdb_id'])
+                    if s.get('mal_id') and str(s.get('mal_id')) != mal_id]
 
-    _evict_mem_cache()
+    # Franchise row + pointers (and their translation_pending entries) in one round trip
+    pending = _videos_pending(videos)
+    placeholders = ','.join('?' * len(targets))
+    tvdb_id = layout = None
+    if ids.get('tvdb_id') and videos:
+        tvdb_id, layout = int(ids['tvdb_id']), _videos_layout(videos)
+        statements = [
+            ("INSERT OR REPLACE INTO franchise_videos (tvdb_id, layout, videos, timestamp) VALUES (?,?,?,?)",
+             (tvdb_id, layout, cache_blob, now)),
+            (f"DELETE FROM videos_cache WHERE mal_id IN ({placeholders})", tuple(targets)),
+        ]
+        for target in targets:
+            # Unchanged pointers are not rewritten
+            statements.append(("INSERT INTO videos_pointer (mal_id, tvdb_id, layout) VALUES (?,?,?) "
+                               "ON CONFLICT(mal_id) DO UPDATE SET tvdb_id=excluded.tvdb_id, layout=excluded.layout "
+                               "WHERE tvdb_id!=excluded.tvdb_id OR layout!=excluded.layout",
+                               (target, tvdb_id, layout)))
+            statements.append(_pending_statement(target, 'videos', pending))
+        # Layouts no MAL ID points at any more
+        statements.append(("DELETE FROM franchise_videos WHERE tvdb_id=? AND layout!=? AND NOT EXISTS "
+                           "(SELECT 1 FROM videos_pointer p WHERE p.tvdb_id=franchise_videos.tvdb_id "
+                           "AND p.layout=franchise_videos.layout)", (tvdb_id, layout)))
+    else:
+        statements = [
+            ("INSERT OR REPLACE INTO videos_cache (mal_id, videos, timestamp) VALUES (?,?,?)",
+             (mal_id, cache_blob, now)),
+            ("DELETE FROM videos_pointer WHERE mal_id=?", (mal_id,)),
+            _pending_statement(mal_id, 'videos', pending),
+        ]
+    await execute_batch(statements)
+    _videos_mem_put(targets, (videos, now, ttl_override, season_posters or []), len(cache_json), tvdb_id, layout)
+    if _USE_L2:
+        # Same shape as the DB: one franchise entry plus small pointers per MAL ID
+        shared = {'videos': videos, 'ts': now, 'ttl_override': ttl_override, 'sp': season_posters or []}
+        ttl = ttl_override or _videos_ttl(videos)
+        if tvdb_id is None:
+            await l2_set('videos', mal_id, shared, ttl)
+        else:
+            await l2_set('videos', _franchise_key(tvdb_id, layout), shared, ttl)
+            for target in targets:
+                await l2_set('videos', target, {'ref': [tvdb_id, layout]}, ttl)
 
 
 def _pack_videos_cache(videos: list, season_posters: list = None) -> dict | list:
@@ -340,9 +691,9 @@ async def batch_fetch_and_cache_meta(content_ids: list[str], is_vip: bool = Fals
     cached_mal_ids = set()
     for row in rows:
         if time.time() - row['timestamp'] < CACHE_TTL:
-            meta = orjson.loads(row['meta'])
+            meta, size = blob_codec.decode_sized(row['meta'])
             cid = mal_id_map[str(row['mal_id'])]
-            _mem_cache[str(row['mal_id'])] = (meta, row['timestamp'])
+            _mem_cache.put(str(row['mal_id']), (meta, row['timestamp']), size=size)
             results[cid] = with_genre_links(meta, is_vip)
             cached_mal_ids.add(str(row['mal_id']))
 
@@ -358,6 +709,48 @@ async def batch_fetch_and_cache_meta(content_ids: list[str], is_vip: bool = Fals
     return results
 
 
+async def resolve_mal_id_from_imdb(imdb_id: str, season: int = None) -> str | None:
+    """Resolve an IMDB ID (+ optional season) to a MAL ID.
+
+    Local mapping first, then the AniList SEQUEL chain from season 1 and
+    Simkl. Definitive misses of the whole chain go to the negative cache;
+    transient upstream failures do not.
+    """
+    from app.routes import mapping
+    from app.utils.negative_cache import is_known_missing, mark_missing, clear_missing, UpstreamUnavailable
+    mal_id = await mapping.get_mal_id_from_imdb_id(imdb_id, season)
+    if mal_id:
+        return mal_id
+    neg_key = f"{imdb_id}:{season or ''}"
+    if await is_known_missing('imdb', neg_key):
+        return None
+    transient = False
+    if season and season > 1:
+        base_mal_id = await mapping.get_mal_id_from_imdb_id(imdb_id, 1)
+        if base_mal_id:
+            from app.api.anilist import get_tv_sequel_mal_id
+            try:
+                resolved = await get_tv_sequel_mal_id(int(base_mal_id), season - 1, strict=True)
+            except UpstreamUnavailable:
+                resolved, transient = None, True
+            if resolved:
+                mal_id = str(resolved)
+    # Fallback: try Simkl for IMDB -> MAL resolution
+    if not mal_id and Config.SIMKL_CLIENT_ID:
+        from app.api.simkl import get_ids_from_mal_by_imdb
+        try:
+            simkl_mal = await get_ids_from_mal_by_imdb(imdb_id, strict=True)
+        except UpstreamUnavailable:
+            simkl_mal, transient = None, True
+        if simkl_mal:
+            mal_id = str(simkl_mal)
+    if mal_id:
+        await clear_missing('imdb', neg_key)
+    elif not transient:
+        await mark_missing('imdb', neg_key)
+    return mal_id
+
+
 async def _resolve_mal_id(content_id: str, is_vip: bool = False) -> str | None:
     """Resolve content_id to MAL ID without fetching metadata."""
     parts = content_id.split(':')
@@ -366,38 +759,20 @@ async def _resolve_mal_id(content_id: str, is_vip: bool = False) -> str | None:
     if prefix == 'mal' and len(parts) > 1:
         return parts[1]
     elif prefix.startswith('tt') and is_vip and len(parts) >= 1:
-        from app.routes import mapping
         season = int(parts[1]) if len(parts) > 1 else None
-        mal_id = mapping.get_mal_id_from_imdb_id(prefix, season)
-        if not mal_id and season and season > 1:
-            base_mal_id = mapping.get_mal_id_from_imdb_id(prefix, 1)
-            if base_mal_id:
-                from app.api.anilist import get_tv_sequel_mal_id
-                resolved = await get_tv_sequel_mal_id(int(base_mal_id), season - 1)
-                if resolved:
-                    mal_id = str(resolved)
-        # Fallback: try Simkl for IMDB -> MAL resolution
-        if not mal_id and Config.SIMKL_CLIENT_ID:
-            from app.api.simkl import get_ids_from_mal_by_imdb
-            simkl_mal = await get_ids_from_mal_by_imdb(prefix)
-            if simkl_mal:
-                mal_id = str(simkl_mal)
+        mal_id = await resolve_mal_id_from_imdb(prefix, season)
         # Fallback: scan resolved: keys in Redis (from previous Simkl/AniList lookups)
         if not mal_id:
-            from app.utils.anime_mapping import _redis_client
+            from app.utils.anime_mapping import _redis_client, _get_imdb_items
             if _redis_client:
-                import json as _json
                 # Check if imdb: was created by _cache_resolved_mapping
-                imdb_data = _redis_client.get(f"imdb:{prefix}")
-                if imdb_data:
-                    items = _json.loads(imdb_data)
-                    items = items if isinstance(items, list) else [items]
-                    if items and items[0].get('mal_id'):
-                        mal_id = str(items[0]['mal_id'])
+                items = await _get_imdb_items(prefix)
+                if items and items[0].get('mal_id'):
+                    mal_id = str(items[0]['mal_id'])
         return mal_id
     elif prefix == 'kitsu' and len(parts) > 1:
         from app.routes import mapping
-        return mapping.get_mal_id_from_kitsu_id(parts[1])
+        return await mapping.get_mal_id_from_kitsu_id(parts[1])
     return None
 
 
@@ -413,22 +788,37 @@ async def _resolve_tvdb_via_anilist(mal_id: str, ids: dict) -> dict | None:
     """
     import logging
     from config import Config
+    from app.utils.negative_cache import is_known_missing, mark_missing, UpstreamUnavailable
+
+    if await is_known_missing('tvdb', mal_id):
+        return None
+
+    # Only definitive "not found" answers are recorded as misses
+    transient = False
 
     # Try Simkl first (fast, direct season info)
     if Config.SIMKL_CLIENT_ID:
         from app.api.simkl import get_ids_from_mal
-        simkl_result = await get_ids_from_mal(int(mal_id))
+        try:
+            simkl_result = await get_ids_from_mal(int(mal_id), strict=True)
+        except UpstreamUnavailable:
+            simkl_result, transient = None, True
         if simkl_result:
             # Cache even without tvdb_id (imdb/tmdb useful for fanart)
-            _cache_resolved_mapping(mal_id, simkl_result)
+            await _cache_resolved_mapping(mal_id, simkl_result)
             if simkl_result.get('tvdb_id'):
                 return simkl_result
 
     # Fallback: AniList PREQUEL chain
     from app.api.anilist import get_tv_prequel_chain
 
-    prequels = await get_tv_prequel_chain(int(mal_id))
+    try:
+        prequels = await get_tv_prequel_chain(int(mal_id), strict=True)
+    except UpstreamUnavailable:
+        return None
     if not prequels:
+        if not transient:
+            await mark_missing('tvdb', mal_id)
         return None
 
     for prequel in prequels:
@@ -436,7 +826,7 @@ async def _resolve_tvdb_via_anilist(mal_id: str, ids: dict) -> dict | None:
         if not prequel_mal_id:
             continue
 
-        prequel_ids = get_ids_from_mal_id(str(prequel_mal_id))
+        prequel_ids = await get_ids_from_mal_id(str(prequel_mal_id))
         if prequel_ids.get('tvdb_id'):
             prequel_season = int(prequel_ids['tvdb_season']) if prequel_ids.get('tvdb_season') else 1
             resolved_season = prequel_season + prequel['steps']
@@ -450,20 +840,19 @@ async def _resolve_tvdb_via_anilist(mal_id: str, ids: dict) -> dict | None:
                 'imdb_id': ids.get('imdb_id') or prequel_ids.get('imdb_id'),
                 'tmdb_id': ids.get('tmdb_id') or prequel_ids.get('tmdb_id'),
             }
-            _cache_resolved_mapping(mal_id, result)
+            await _cache_resolved_mapping(mal_id, result)
             return result
 
+    if not transient:
+        await mark_missing('tvdb', mal_id)
     return None
 
 
-def _cache_resolved_mapping(mal_id: str, resolved: dict):
+async def _cache_resolved_mapping(mal_id: str, resolved: dict):
     """Cache a resolved mapping in Redis for future lookups (TTL 7 days).
     Uses a separate key prefix to avoid being overwritten by load_mapping.
     Also creates reverse imdb: lookup key for IMDB -> MAL resolution."""
-    import json as _json
-    from app.utils.anime_mapping import _redis_client
-    if not _redis_client:
-        return
+    from app.utils.anime_mapping import cache_resolved_mapping
     try:
         mini = {'mal_id': int(mal_id)}
         if resolved.get('tvdb_id'):
@@ -475,13 +864,7 @@ def _cache_resolved_mapping(mal_id: str, resolved: dict):
         # Default season to 1 if not provided (single-season series)
         season = resolved.get('tvdb_season') or 1
         mini['season'] = {'tvdb': int(season)}
-        _redis_client.setex(f"resolved:mal:{mal_id}", 86400 * 7, _json.dumps(mini))
-        # Create reverse IMDB -> MAL lookup if imdb_id available
-        if resolved.get('imdb_id'):
-            imdb_id = resolved['imdb_id']
-            existing = _redis_client.get(f"imdb:{imdb_id}")
-            if not existing:
-                _redis_client.setex(f"imdb:{imdb_id}", 86400 * 7, _json.dumps([mini]))
+        await cache_resolved_mapping(mal_id, mini)
     except Exception:
         pass
 
@@ -518,25 +901,11 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
     if prefix == 'mal' and len(parts) > 1:
         mal_id = parts[1]
     elif prefix.startswith('tt') and is_vip and len(parts) >= 1:
-        from app.routes import mapping
         season = int(parts[1]) if len(parts) > 1 else None
-        mal_id = mapping.get_mal_id_from_imdb_id(prefix, season)
-        if not mal_id and season and season > 1:
-            base_mal_id = mapping.get_mal_id_from_imdb_id(prefix, 1)
-            if base_mal_id:
-                from app.api.anilist import get_tv_sequel_mal_id
-                resolved = await get_tv_sequel_mal_id(int(base_mal_id), season - 1)
-                if resolved:
-                    mal_id = str(resolved)
-        # Fallback: try Simkl for IMDB -> MAL resolution
-        if not mal_id and Config.SIMKL_CLIENT_ID:
-            from app.api.simkl import get_ids_from_mal_by_imdb
-            simkl_mal = await get_ids_from_mal_by_imdb(prefix)
-            if simkl_mal:
-                mal_id = str(simkl_mal)
+        mal_id = await resolve_mal_id_from_imdb(prefix, season)
     elif prefix == 'kitsu' and len(parts) > 1:
         from app.routes import mapping
-        mal_id = mapping.get_mal_id_from_kitsu_id(parts[1])
+        mal_id = await mapping.get_mal_id_from_kitsu_id(parts[1])
     
     if not mal_id:
         return None, None
@@ -557,7 +926,29 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
         logging.info(f"[META timing] cache hit for mal:{mal_id} in {_time.time()-_t_start:.3f}s")
         return _with_genre_links(cached), mal_id
 
+    # Serve recently expired meta right away and refresh it in the background
+    stale = await _get_stale_meta(mal_id)
+    if stale:
+        _swr_stats['stale_served'] += 1
+        _schedule_refresh('meta', mal_id, lambda: _build_meta(mal_id, _time.time()))
+        logging.info(f"[META timing] stale hit for mal:{mal_id} in {_time.time()-_t_start:.3f}s, refreshing")
+        return _with_genre_links(stale), mal_id
+
     logging.info(f"[META timing] cache miss for mal:{mal_id}, fetching...")
+    meta = await single_flight('meta', mal_id, lambda: _build_meta(mal_id, _t_start))
+    if meta:
+        return _with_genre_links(meta), mal_id
+    return None, None
+
+
+async def _build_meta(mal_id: str, _t_start: float) -> dict | None:
+    """Fetch metadata for a MAL ID from TVDB/TMDB/Kitsu/MAL and cache it.
+
+    Shared by all concurrent fetch_and_cache_meta callers for the same mal_id
+    (see single_flight), so it returns the cached meta without per-caller genre links.
+    """
+    import time as _time
+    import logging
 
     # Check for expired cache to reuse translations
     expired_meta = await _get_expired_meta(mal_id)
@@ -565,11 +956,10 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
     # Check if this is a movie or special — skip TVDB series (often has wrong mapping)
     _is_movie = False
     _is_special = False
-    ids = get_ids_from_mal_id(mal_id)
+    ids = await get_ids_from_mal_id(mal_id)
     if Config.MAL_CLIENT_ID:
         try:
-            import aiohttp as _aiohttp
-            async with _aiohttp.ClientSession(timeout=_aiohttp.ClientTimeout(total=3)) as _sess:
+            async with http_session('mal', 3) as _sess:
                 async with _sess.get(
                     f"https://api.myanimelist.net/v2/anime/{mal_id}",
                     params={"fields": "media_type,num_episodes"},
@@ -608,9 +998,8 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
                     meta['_untranslated_description'] = True
                 await _enrich_poster_from_mal(meta, mal_id)
                 await set_cached_meta(mal_id, meta)
-                return _with_genre_links(meta), mal_id
+                return meta
         except Exception as e:
-            import logging
             logging.error(f"[TVDB movie] Exception for mal:{mal_id}: {type(e).__name__}: {e}")
 
     # Try TMDB movie endpoint for movies (fallback when TVDB movie fails or has no tvdb_id)
@@ -641,7 +1030,7 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
                     await _enrich_poster_from_mal(meta, mal_id)
                     await set_cached_meta(mal_id, meta)
                     logging.info(f"[TMDB movie] Success for mal:{mal_id} via tmdb_id={_tmdb_id}")
-                    return _with_genre_links(meta), mal_id
+                    return meta
             except Exception as e:
                 logging.error(f"[TMDB movie] Exception for mal:{mal_id}: {type(e).__name__}: {e}")
 
@@ -677,7 +1066,7 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
                             meta['_untranslated_description'] = True
                     await _enrich_poster_from_mal(meta, mal_id)
                     await set_cached_meta(mal_id, meta)
-                    return _with_genre_links(meta), mal_id
+                    return meta
         except Exception as e:
             import logging
             logging.error(f"[TVDB meta] Exception for mal:{mal_id}: {type(e).__name__}: {e}")
@@ -713,14 +1102,14 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
                     await _enrich_poster_from_mal(meta, mal_id)
                     await set_cached_meta(mal_id, meta)
                     logging.info(f"[TMDB meta] Success for mal:{mal_id} via tmdb_id={_tmdb_id}")
-                    return _with_genre_links(meta), mal_id
+                    return meta
             except Exception as e:
                 import logging
                 logging.error(f"[TMDB meta] Exception for mal:{mal_id}: {type(e).__name__}: {e}")
 
     try:
         from app.api.kitsu import get_anime_meta as kitsu_get_meta
-        ids = get_ids_from_mal_id(mal_id)
+        ids = await get_ids_from_mal_id(mal_id)
         if ids['kitsu_id']:
             meta = await kitsu_get_meta(ids['kitsu_id'], mal_id=mal_id,
                                         imdb_id=ids['imdb_id'], tvdb_id=ids['tvdb_id'], tmdb_id=ids['tmdb_id'])
@@ -734,7 +1123,7 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
                         meta['_untranslated_description'] = True
                 await _enrich_poster_from_mal(meta, mal_id)
                 await set_cached_meta(mal_id, meta)
-                return _with_genre_links(meta), mal_id
+                return meta
     except Exception:
         pass
 
@@ -752,41 +1141,29 @@ async def fetch_and_cache_meta(content_id: str, is_vip: bool = False):
                     else:
                         meta['_untranslated_description'] = True
                 await set_cached_meta(mal_id, meta)
-                return _with_genre_links(meta), mal_id
+                return meta
         except Exception:
             pass
 
-    return None, None
+    return None
 
 
 async def _get_episode_counts(mal_ids: list[str]) -> list[int]:
-    """Get episode count for each MAL ID from Kitsu API.
+    """Get episode count for each MAL ID from Kitsu API (one bulk lookup).
     
     Returns list of episode counts in same order as input.
     Falls back to 0 if unavailable (will use remaining episodes).
     """
-    import aiohttp as _aiohttp
-    from app.utils.anime_mapping import get_kitsu_from_mal_id
+    from app.utils.anime_mapping import get_ids_for_mal_ids
+    from app.api.kitsu import get_anime_attributes
 
-    async def _fetch_one(session, mid):
-        try:
-            kitsu_id = get_kitsu_from_mal_id(mid)
-            if kitsu_id:
-                async with session.get(
-                    f"https://kitsu.io/api/edge/anime/{kitsu_id}",
-                    headers={"Accept": "application/vnd.api+json", "User-Agent": "Mozilla/5.0"},
-                    params={"fields[anime]": "episodeCount"}
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        return int(data.get("data", {}).get("attributes", {}).get("episodeCount") or 0)
-        except Exception:
-            pass
-        return 0
-
-    async with _aiohttp.ClientSession(timeout=_aiohttp.ClientTimeout(total=5)) as session:
-        results = await asyncio.gather(*[_fetch_one(session, mid) for mid in mal_ids])
-    return list(results)
+    try:
+        ids = await get_ids_for_mal_ids(mal_ids)
+        kitsu_ids = [ids.get(str(mid), {}).get('kitsu_id') for mid in mal_ids]
+        attrs = await get_anime_attributes([k for k in kitsu_ids if k])
+    except Exception:
+        return [0] * len(mal_ids)
+    return [int((attrs.get(k) or {}).get("episodeCount") or 0) if k else 0 for k in kitsu_ids]
 
 
 async def _enrich_poster_from_mal(meta: dict, mal_id: str):
@@ -801,8 +1178,7 @@ async def _enrich_poster_from_mal(meta: dict, mal_id: str):
     if not poster or 'cdn.myanimelist.net' in poster:
         return  # Already MAL CDN or no poster
     try:
-        import aiohttp as _aiohttp
-        async with _aiohttp.ClientSession(timeout=_aiohttp.ClientTimeout(total=3)) as _sess:
+        async with http_session('mal', 3) as _sess:
             async with _sess.get(
                 f"https://api.myanimelist.net/v2/anime/{mal_id}",
                 params={"fields": "main_picture"},
@@ -840,7 +1216,6 @@ async def _separate_specials(all_seasons: list) -> tuple[list, list]:
     Batch-fetches subtypes from Kitsu for all entries that have kitsu_id.
     Returns (specials, regular_seasons) where specials are sorted by mal_id.
     """
-    import aiohttp as _aiohttp
 
     if not all_seasons or len(all_seasons) <= 1:
         return [], all_seasons
@@ -850,26 +1225,10 @@ async def _separate_specials(all_seasons: list) -> tuple[list, list]:
     if not entries_with_kitsu:
         return [], all_seasons
 
-    # Batch fetch subtypes from Kitsu (max 20 at once)
-    kitsu_ids = [str(s.get('kitsu_id')) for _, s in entries_with_kitsu]
-    subtype_map = {}  # kitsu_id -> subtype
-
+    # Batch fetch subtypes from Kitsu (bulk client, cached)
+    from app.api.kitsu import get_anime_attributes
     try:
-        ids_param = ",".join(kitsu_ids[:20])
-        async with _aiohttp.ClientSession(timeout=_aiohttp.ClientTimeout(total=5)) as session:
-            async with session.get(
-                "https://kitsu.io/api/edge/anime",
-                params={"filter[id]": ids_param, "fields[anime]": "subtype,episodeCount"}
-            ) as resp:
-                if resp.status == 200:
-                    data = (await resp.json()).get("data", [])
-                    for item in data:
-                        kid = item.get("id")
-                        attrs = item.get("attributes", {})
-                        subtype_map[kid] = {
-                            "subtype": attrs.get("subtype"),
-                            "episodeCount": attrs.get("episodeCount"),
-                        }
+        subtype_map = await get_anime_attributes([s.get('kitsu_id') for _, s in entries_with_kitsu])
     except Exception:
         return [], all_seasons
 
@@ -980,30 +1339,42 @@ async def fetch_videos(mal_id: str) -> dict | str:
     Returns dict {"videos": list, "seasonPosters": list} or "movie" sentinel.
     Cache TTL: 3h for airing series (has future episode dates), 1 month for finished.
     When TVDB is configured, fetches episodes for ALL seasons sharing the same tvdb_id.
+    Concurrent misses for the same mal_id share one build (see single_flight);
+    recently expired entries are served stale while a background refresh runs.
     """
-    import logging
-    import time as _time
-
     # Check cache first (also returns expired data for prev_translations reuse)
-    cached, expired_videos = await _get_cached_videos_with_expired(mal_id)
+    cached, expired_videos, stale_posters = await _get_cached_videos_with_expired(mal_id)
     if cached is not None:
         if cached == []:
             return "movie"  # empty cache = movie (was intentionally set)
         # Get season posters from mem cache if available
         sp = []
-        if mal_id in _videos_mem_cache:
-            sp = _videos_mem_cache[mal_id][3]
+        if (entry := _videos_mem_entry(mal_id, peek=True)) is not None:
+            sp = entry[3]
         return {"videos": cached, "seasonPosters": sp}
 
+    # Serve recently expired episodes right away and rebuild them in the background
+    if stale_posters is not None:
+        _swr_stats['stale_served'] += 1
+        _schedule_refresh('videos', mal_id, lambda: _build_videos(mal_id, expired_videos))
+        return {"videos": expired_videos, "seasonPosters": stale_posters}
+
+    return await single_flight('videos', mal_id, lambda: _build_videos(mal_id, expired_videos))
+
+
+async def _build_videos(mal_id: str, expired_videos: list | None) -> dict | str:
+    """Build and cache the episode list for fetch_videos after a cache miss."""
+    import logging
+    import time as _time
+
     _t0 = _time.time()
-    ids = get_ids_from_mal_id(mal_id)
+    ids = await get_ids_from_mal_id(mal_id)
     videos = []
 
     # Movies and single-episode specials don't need episode list
     if Config.MAL_CLIENT_ID:
         try:
-            import aiohttp as _aiohttp
-            async with _aiohttp.ClientSession(timeout=_aiohttp.ClientTimeout(total=3)) as _sess:
+            async with http_session('mal', 3) as _sess:
                 async with _sess.get(
                     f"https://api.myanimelist.net/v2/anime/{mal_id}",
                     params={"fields": "media_type,num_episodes"},
@@ -1015,7 +1386,7 @@ async def fetch_videos(mal_id: str) -> dict | str:
                         _num_eps = _mdata.get("num_episodes") or 0
                         if _media_type == "movie" or (_media_type in ("tv_special", "special", "ova", "ona") and _num_eps <= 1):
                             # Sentinel: empty list cached with _is_movie marker
-                            _videos_mem_cache[mal_id] = ([], int(_time.time()), VIDEOS_TTL_MOVIE, [])
+                            await _videos_mem_remember(mal_id, ([], int(_time.time()), VIDEOS_TTL_MOVIE, []))
                             asyncio.ensure_future(set_cached_videos(mal_id, [], VIDEOS_TTL_MOVIE))
                             return "movie"  # sentinel value for meta route
         except Exception:
@@ -1040,29 +1411,12 @@ async def fetch_videos(mal_id: str) -> dict | str:
         logging.info(f"[TVDB] mal:{mal_id} no expired_videos available for prev_translations")
 
     # If no prev_translations from own cache, try sibling mal_ids (same tvdb_id)
-    # This reuses translations already done under a sibling's cache
+    # This reuses translations already done under a sibling's cache (single IN query)
     if not prev_translations and ids.get('tvdb_id'):
-        siblings = get_all_seasons_for_tvdb_id(ids['tvdb_id'])
-        for sibling in siblings:
-            sib_mal = str(sibling.get('mal_id'))
-            if sib_mal and sib_mal != mal_id:
-                sib_rows = await execute("SELECT videos FROM videos_cache WHERE mal_id=?", (sib_mal,))
-                if sib_rows:
-                    sib_data = orjson.loads(sib_rows[0]['videos'])
-                    sib_videos = sib_data['v'] if isinstance(sib_data, dict) and 'v' in sib_data else (sib_data if isinstance(sib_data, list) else [])
-                    for v in sib_videos:
-                        vid_id = v.get("id")
-                        if not vid_id:
-                            continue
-                        entry = {}
-                        if v.get("title") and not v.get("_untranslated_title"):
-                            entry["title"] = v["title"]
-                        if v.get("overview") and not v.get("_untranslated_overview"):
-                            entry["overview"] = v["overview"]
-                        if entry:
-                            prev_translations[vid_id] = entry
-                    if prev_translations:
-                        break  # found translations from a sibling, no need to check more
+        for _, sib_videos in await get_sibling_videos(mal_id, ids['tvdb_id']):
+            prev_translations = _translation_map(sib_videos)
+            if prev_translations:
+                break  # found translations from a sibling, no need to check more
 
     # Try TVDB first with multi-season support
     # If tvdb_id is missing, try to resolve it via AniList relations (PREQUEL chain)
@@ -1090,7 +1444,7 @@ async def fetch_videos(mal_id: str) -> dict | str:
                 original_country = cached_meta.get("country") or ""
 
             # Get all seasons that share the same tvdb_id
-            all_seasons = get_all_seasons_for_tvdb_id(tvdb_id)
+            all_seasons = await get_all_seasons_for_tvdb_id(tvdb_id)
 
             # Separate specials/OVAs from regular seasons
             # Specials go into season 0, numbered by MAL ID order
@@ -1454,7 +1808,7 @@ async def fetch_videos(mal_id: str) -> dict | str:
                         # New data is a regression — TVDB likely returned empty translations
                         logging.warning(f"[TVDB] Regression detected for mal:{mal_id}: old had {old_quality} enriched eps, new has {new_quality}. Keeping old data.")
                         sp = _build_season_posters(series_ext, all_seasons, expired_videos)
-                        _videos_mem_cache[mal_id] = (expired_videos, int(time.time()), 300, sp)  # short TTL to retry soon
+                        await _videos_mem_remember(mal_id, (expired_videos, int(time.time()), 300, sp))  # short TTL to retry soon
                         asyncio.ensure_future(set_cached_videos(mal_id, expired_videos, 300, sp))
                         return {"videos": expired_videos, "seasonPosters": sp}
                 
@@ -1462,7 +1816,7 @@ async def fetch_videos(mal_id: str) -> dict | str:
                 # Update in-memory cache immediately so next request hits cache
                 # For large series (>50 eps), await save to ensure it persists before potential restart
                 sp = _build_season_posters(series_ext, all_seasons, videos)
-                _videos_mem_cache[mal_id] = (videos, int(time.time()), 0, sp)
+                await _videos_mem_remember(mal_id, (videos, int(time.time()), 0, sp))
                 if len(videos) > 50:
                     await set_cached_videos(mal_id, videos, 0, sp)
                 else:
@@ -1518,7 +1872,7 @@ async def fetch_videos(mal_id: str) -> dict | str:
                     v['thumbnail'] = backdrop
 
     if videos:
-        _videos_mem_cache[mal_id] = (videos, int(time.time()), 0, [])
+        await _videos_mem_remember(mal_id, (videos, int(time.time()), 0, []))
         asyncio.ensure_future(set_cached_videos(mal_id, videos))
         return {"videos": videos, "seasonPosters": []}
 
@@ -1526,7 +1880,7 @@ async def fetch_videos(mal_id: str) -> dict | str:
     if expired_videos:
         import logging
         logging.info(f"[Videos] No fresh data for mal:{mal_id}, serving expired cache ({len(expired_videos)} eps)")
-        _videos_mem_cache[mal_id] = (expired_videos, int(time.time()), 3600, [])  # re-try in 1h
+        await _videos_mem_remember(mal_id, (expired_videos, int(time.time()), 3600, []))  # re-try in 1h
         asyncio.ensure_future(set_cached_videos(mal_id, expired_videos, 3600))
         return {"videos": expired_videos, "seasonPosters": []}
 
@@ -0,0 +1,83 @@
+"""Shared "known missing" cache for IDs the resolution chain cannot resolve.
+
+Each consecutive miss doubles the entry's TTL (NEGATIVE_CACHE_BASE_TTL up to
+NEGATIVE_CACHE_MAX_TTL), so a mapping that is only briefly missing is retried
+soon, while a popular item that is never mapped settles at one upstream
+attempt per max TTL. Entries live in the negative_cache table (shared by all
+workers and instances) with a per-process LRU in front; a later successful
+resolution clears the entry. L1 entries are only trusted for _L1_TTL so
+misses marked (or cleared) by other workers become visible quickly.
+"""
+import logging
+import time
+from config import Config
+from app.db import execute
+from app.utils.lru import ByteLRU
+
+_mem_cache = ByteLRU(512 * 1024, 'negative')  # "kind:key" -> (strikes, expires_at, loaded_at)
+_L1_TTL = 60  # seconds before re-reading the shared table
+
+
+class UpstreamUnavailable(Exception):
+    """A resolver could not reach its upstream (timeout, 429/5xx): nothing is known, so no miss is marked."""
+_stats = {'hits': 0, 'checks': 0, 'marked': 0, 'cleared': 0}
+
+
+def negative_cache_stats() -> dict:
+    return {**_stats, 'mem': _mem_cache.stats()}
+
+
+async def _load(cache_key: str) -> tuple[int, int] | None:
+    entry = _mem_cache.get(cache_key)
+    if entry is not None and time.time() - entry[2] < _L1_TTL:
+        return entry[:2]
+    try:
+        rows = await execute("SELECT strikes, expires_at FROM negative_cache WHERE cache_key=?", (cache_key,))
+    except Exception as e:
+        logging.warning(f"[NegativeCache] read failed for {cache_key}: {e}")
+        return None
+    entry = (rows[0]['strikes'], rows[0]['expires_at']) if rows else (0, 0)
+    _mem_cache[cache_key] = (*entry, time.time())
+    return entry
+
+
+async def is_known_missing(kind: str, key) -> bool:
+    """True while a recent lookup of (kind, key) found nothing."""
+    _stats['checks'] += 1
+    entry = await _load(f"{kind}:{key}")
+    if entry and entry[1] > time.time():
+        _stats['hits'] += 1
+        return True
+    return False
+
+
+async def mark_missing(kind: str, key):
+    """Record a definitive miss; the TTL doubles with every consecutive miss."""
+    cache_key = f"{kind}:{key}"
+    strikes = ((await _load(cache_key)) or (0, 0))[0] + 1
+    ttl = min(Config.NEGATIVE_CACHE_BASE_TTL * 2 ** (strikes - 1), Config.NEGATIVE_CACHE_MAX_TTL)
+    expires_at = int(time.time()) + ttl
+    _mem_cache[cache_key] = (strikes, expires_at, time.time())
+    _stats['marked'] += 1
+    try:
+        await execute(
+            "INSERT OR REPLACE INTO negative_cache (cache_key, strikes, expires_at) VALUES (?,?,?)",
+            (cache_key, strikes, expires_at)
+        )
+    except Exception as e:
+        logging.warning(f"[NegativeCache] write failed for {cache_key}: {e}")
+
+
+async def clear_missing(kind: str, key):
+    """Forget earlier misses after (kind, key) resolved.
+
+    Always deletes the shared row: another worker may have recorded the miss.
+    """
+    cache_key = f"{kind}:{key}"
+    entry = _mem_cache.pop(cache_key)
+    if entry and entry[0]:
+        _stats['cleared'] += 1
+    try:
+        await execute("DELETE FROM negative_cache WHERE cache_key=?", (cache_key,))
+    except Exception as e:
+        logging.warning(f"[NegativeCache] delete failed for {cache_key}: {e}")
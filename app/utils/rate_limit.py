@@ -0,0 +1,158 @@
+"""Per-upstream token buckets with Retry-After-aware backoff.
+
+Every request made through app.utils.http_sessions takes a token from its
+upstream's bucket first (waiting for a refill when the burst is spent). A 429
+(or a 503 carrying Retry-After) pauses the whole upstream until Retry-After,
+or for an exponential backoff when the header is missing, instead of letting
+a burst of callers each collect their own 429. Waits longer than the
+upstream's max wait fail fast with RateLimited, which callers already handle like any other
+aiohttp.ClientError.
+
+Buckets live in each worker process, so the container-wide _RATES below are
+divided by WEB_CONCURRENCY (rate and burst). Separate containers sharing one
+egress IP are not coordinated.
+"""
+import asyncio
+import email.utils
+import logging
+import time
+
+import aiohttp
+from config import Config
+
+# upstream -> (sustained requests per second, burst size) for the whole container; unlisted upstreams only get 429 backoff
+_RATES = {
+    'anilist': (85 / 60, 5),  # documented 90/min
+    'translate': (18 / 60, 2),  # OpenRouter free tier: 20/min
+    'simkl': (5, 10),
+    'mal': (5, 10),
+    'kitsu': (10, 20),
+    'fanart': (10, 20),
+    'tvdb': (20, 40),
+    'docchi': (20, 40),
+    'tmdb': (40, 40),  # ~50/s per IP
+}
+_DEFAULT_MAX_WAIT = 10.0  # seconds a caller may wait for budget before RateLimited
+_MAX_WAIT = {'translate': 90.0}  # background translation batches may queue longer
+_MAX_BACKOFF = 300.0  # cap for Retry-After / exponential backoff
+_BASE_BACKOFF = 1.0  # first backoff without Retry-After, doubles per consecutive 429
+
+
+class RateLimited(aiohttp.ClientError):
+    """Upstream budget exhausted for longer than the caller may wait."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float | None, capacity: int | None, max_wait: float = _DEFAULT_MAX_WAIT):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = float(capacity or 0)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0  # consecutive 429s
+        self.stats = {'requests': 0, 'throttled': 0, 'waited_s': 0.0, 'rejected': 0, 'rate_limited': 0}
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going negative) and return how long to wait for it."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.rate:
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+        return wait
+
+    async def acquire(self, name: str):
+        self.stats['requests'] += 1
+        wait = self._reserve()
+        if wait <= 0:
+            return
+        if wait > self.max_wait:
+            if self.rate:
+                self.tokens += 1  # give the reservation back
+            self.stats['rejected'] += 1
+            raise RateLimited(f"{name}: rate limited for another {wait:.1f}s")
+        self.stats['throttled'] += 1
+        self.stats['waited_s'] += wait
+        await asyncio.sleep(wait)
+
+    def backoff(self, retry_after: float | None) -> float:
+        self.strikes += 1
+        self.stats['rate_limited'] += 1
+        if retry_after is None:
+            retry_after = _BASE_BACKOFF * 2 ** (self.strikes - 1)
+        delay = min(max(retry_after, 0.0), _MAX_BACKOFF)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        if self.rate:
+            self.tokens = min(self.tokens, 0.0)  # resume at the sustained rate, not a fresh burst
+        return delay
+
+
+_buckets: dict[str, TokenBucket] = {}
+
+
+def _bucket(name: str) -> TokenBucket:
+    bucket = _buckets.get(name)
+    if bucket is None:
+        rate, capacity = _RATES.get(name, (None, None))
+        if rate:
+            # Every worker holds its own bucket: split the container budget evenly
+            workers = Config.WEB_CONCURRENCY
+            rate, capacity = rate / workers, max(1, capacity // workers)
+        bucket = _buckets[name] = TokenBucket(rate, capacity, _MAX_WAIT.get(name, _DEFAULT_MAX_WAIT))
+    return bucket
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as delta-seconds or HTTP date; None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+async def acquire(name: str):
+    """Wait for request budget on an upstream (raises RateLimited past its max wait)."""
+    await _bucket(name).acquire(name)
+
+
+def note_response(name: str, status: int, headers) -> float | None:
+    """Feed a response status back; returns the backoff delay for 429/503+Retry-After, else None."""
+    bucket = _bucket(name)
+    retry_after = _parse_retry_after(headers.get('Retry-After')) if headers else None
+    if status == 429 or (status == 503 and retry_after is not None):
+        delay = bucket.backoff(retry_after)
+        logging.warning(f"[RateLimit] {name} answered {status}, backing off {delay:.1f}s")
+        return delay
+    if status < 400:
+        bucket.strikes = 0
+    return None
+
+
+def rate_limit_stats() -> dict:
+    """Current budget and throttle counters per upstream."""
+    now = time.monotonic()
+    result = {}
+    for name, bucket in _buckets.items():
+        bucket._refill(now)
+        result[name] = {
+            **bucket.stats,
+            'waited_s': round(bucket.stats['waited_s'], 2),
+            'budget': round(bucket.tokens, 2) if bucket.rate else None,
+            'rate_per_min': round(bucket.rate * 60, 1) if bucket.rate else None,
+            'blocked_for_s': round(max(0.0, bucket.blocked_until - now), 1),
+        }
+    return result
@@ -0,0 +1,224 @@
+"""Shared L2 cache tier for running several uvicorn workers per container.
+
+Per-process caches (catalog responses, meta responses, the meta/videos memory
+tiers) stay as L1; on an L1 miss they consult this tier before doing any
+upstream or remote DB work, and writes go to both. Backends:
+
+    redis   - Config.REDIS_URL (shared by every worker and container)
+    sqlite  - a local WAL-mode file (shared by workers of one container)
+    off     - no L2; every call is a no-op
+
+Values are stored as JSON with a per-entry TTL. SQLite calls run in a worker
+thread (asyncio.to_thread) so a busy WAL file never stalls the event loop.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import orjson
+from config import Config
+
+_backend = None  # 'redis' | 'sqlite' | None
+_redis = None
+_sqlite = None
+_sqlite_lock = threading.Lock()
+_writes = 0
+_PURGE_EVERY = 500  # writes between expired-row purges (sqlite)
+_stats = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+
+
+def _init():
+    """Pick the backend once, on first use."""
+    global _backend, _redis, _sqlite
+    if _backend is not None:
+        return
+    choice = Config.SHARED_CACHE
+    if choice == 'auto':
+        choice = 'redis' if Config.USE_REDIS and Config.REDIS_URL else 'sqlite'
+    if choice == 'redis':
+        try:
+            import redis.asyncio as aioredis
+            _redis = aioredis.from_url(Config.REDIS_URL, max_connections=10)
+            _backend = 'redis'
+        except ImportError:
+            logging.warning("redis package not installed. Shared cache falls back to SQLite")
+            choice = 'sqlite'
+    if choice == 'sqlite':
+        _sqlite = sqlite3.connect(Config.SHARED_CACHE_PATH, check_same_thread=False, timeout=2)
+        _sqlite.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS l2_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB,
+                expires_at REAL
+            );
+        """)
+        _backend = 'sqlite'
+    if _backend is None:
+        _backend = 'off'
+    logging.info(f"[SharedCache] backend: {_backend}")
+
+
+def _sqlite_get(full_key: str):
+    with _sqlite_lock:
+        row = _sqlite.execute(
+            "SELECT value FROM l2_cache WHERE key=? AND expires_at>?", (full_key, time.time())
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _sqlite_set(full_key: str, raw: bytes, ttl: int):
+    global _writes
+    now = time.time()
+    with _sqlite_lock:
+        with _sqlite:
+            _sqlite.execute(
+                "INSERT OR REPLACE INTO l2_cache (key, value, expires_at) VALUES (?,?,?)",
+                (full_key, raw, now + ttl)
+            )
+            _writes += 1
+            if _writes % _PURGE_EVERY == 0:
+                _sqlite.execute("DELETE FROM l2_cache WHERE expires_at<=?", (now,))
+
+
+def _sqlite_claim(full_key: str, ttl: int) -> bool:
+    now = time.time()
+    with _sqlite_lock:
+        with _sqlite:
+            _sqlite.execute("DELETE FROM l2_cache WHERE key=? AND expires_at<=?", (full_key, now))
+            cur = _sqlite.execute(
+                "INSERT OR IGNORE INTO l2_cache (key, value, expires_at) VALUES (?,?,?)",
+                (full_key, b'1', now + ttl)
+            )
+            return cur.rowcount == 1
+
+
+def _sqlite_release(full_key: str):
+    with _sqlite_lock:
+        with _sqlite:
+            _sqlite.execute("DELETE FROM l2_cache WHERE key=?", (full_key,))
+
+
+def shared_cache_stats() -> dict:
+    lookups = _stats['hits'] + _stats['misses']
+    return {
+        'backend': _backend,
+        **_stats,
+        'hit_ratio': round(_stats['hits'] / lookups, 3) if lookups else None,
+    }
+
+
+async def l2_get(namespace: str, key: str):
+    """Return the cached value or None."""
+    _init()
+    if _backend == 'off':
+        return None
+    full_key = f"{namespace}:{key}"
+    try:
+        if _backend == 'redis':
+            raw = await _redis.get(f"l2:{full_key}")
+        else:
+            raw = await asyncio.to_thread(_sqlite_get, full_key)
+    except Exception as e:
+        _stats['errors'] += 1
+        logging.warning(f"[SharedCache] get {full_key} failed: {e}")
+        return None
+    if raw is None:
+        _stats['misses'] += 1
+        return None
+    _stats['hits'] += 1
+    return orjson.loads(raw)
+
+
+async def l2_set(namespace: str, key: str, value, ttl: int):
+    """Store value for ttl seconds (no-op for ttl <= 0)."""
+    _init()
+    if _backend == 'off' or ttl <= 0:
+        return
+    full_key = f"{namespace}:{key}"
+    try:
+        raw = orjson.dumps(value)
+        if _backend == 'redis':
+            await _redis.setex(f"l2:{full_key}", int(ttl), raw)
+        else:
+            await asyncio.to_thread(_sqlite_set, full_key, raw, ttl)
+        _stats['writes'] += 1
+    except Exception as e:
+        _stats['errors'] += 1
+        logging.warning(f"[SharedCache] set {full_key} failed: {e}")
+
+
+async def l2_claim(name: str, ttl: int) -> bool:
+    """Set-if-absent lock shared by all workers: True for exactly one caller per ttl window.
+
+    Always True without an L2 backend (single process owns all background work).
+    """
+    _init()
+    if _backend == 'off':
+        return True
+    full_key = f"claim:{name}"
+    try:
+        if _backend == 'redis':
+            return bool(await _redis.set(f"l2:{full_key}", b'1', nx=True, ex=max(1, int(ttl))))
+        return await asyncio.to_thread(_sqlite_claim, full_key, ttl)
+    except Exception as e:
+        _stats['errors'] += 1
+        logging.warning(f"[SharedCache] claim {name} failed: {e}")
+        return True
+
+
+async def l2_release(name: str):
+    """Drop a claim taken with l2_claim before its ttl runs out (e.g. the claimed work failed)."""
+    _init()
+    if _backend == 'off':
+        return
+    full_key = f"claim:{name}"
+    try:
+        if _backend == 'redis':
+            await _redis.delete(f"l2:{full_key}")
+        else:
+            await asyncio.to_thread(_sqlite_release, full_key)
+    except Exception as e:
+        _stats['errors'] += 1
+        logging.warning(f"[SharedCache] release {name} failed: {e}")
+
+
+async def close_shared_cache():
+    """Close backend connections (called on app shutdown)."""
+    global _backend, _redis, _sqlite
+    if _redis:
+        try:
+            await _redis.aclose()
+        except Exception:
+            pass
+    if _sqlite:
+        with _sqlite_lock:
+            _sqlite.close()
+    _backend, _redis, _sqlite = None, None, None
+
+
+class TieredCache:
+    """aiocache-style get/set over a per-process L1 and the shared L2 tier."""
+
+    def __init__(self, namespace: str, l1):
+        self.namespace = namespace
+        self._l1 = l1  # anything with async get(key) / set(key, value, ttl=)
+
+    async def get(self, key: str):
+        value = await self._l1.get(key)
+        if value is not None:
+            return value
+        entry = await l2_get(self.namespace, key)
+        if entry is None:
+            return None
+        remaining = entry['expires_at'] - time.time()
+        if remaining <= 0:
+            return None
+        await self._l1.set(key, entry['value'], ttl=int(remaining) or 1)
+        return entry['value']
+
+    async def set(self, key: str, value, ttl: int):
+        await self._l1.set(key, value, ttl=ttl)
+        await l2_set(self.namespace, key, {'value': value, 'expires_at': time.time() + ttl}, ttl)
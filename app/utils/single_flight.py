@@ -0,0 +1,50 @@
+"""Keyed in-flight registry: concurrent callers for the same key share one computation.
+
+Used to collapse cache-miss stampedes (e.g. dozens of clients opening a new
+seasonal show at once) into a single upstream fan-out.
+"""
+import asyncio
+import logging
+
+_inflight: dict[tuple[str, str], asyncio.Task] = {}
+_stats: dict[str, dict[str, int]] = {}  # namespace -> {'calls', 'coalesced'}
+
+
+def _stats_for(namespace: str) -> dict[str, int]:
+    return _stats.setdefault(namespace, {'calls': 0, 'coalesced': 0})
+
+
+async def single_flight(namespace: str, key: str, factory):
+    """Await factory() once per (namespace, key) among concurrent callers.
+
+    The computation runs as its own task, so a caller that gets cancelled
+    (client disconnect) does not cancel it for the others. Results are not
+    cached here — once the task finishes, the next caller starts a new one.
+    """
+    stats = _stats_for(namespace)
+    stats['calls'] += 1
+    inflight_key = (namespace, str(key))
+    task = _inflight.get(inflight_key)
+    if task is not None:
+        stats['coalesced'] += 1
+    else:
+        task = asyncio.ensure_future(factory())
+        _inflight[inflight_key] = task
+        task.add_done_callback(lambda t: _on_done(inflight_key, t))
+    return await asyncio.shield(task)
+
+
+def _on_done(inflight_key: tuple[str, str], task: asyncio.Task):
+    if _inflight.get(inflight_key) is task:
+        del _inflight[inflight_key]
+    if not task.cancelled() and task.exception() is not None:
+        # Marks the exception as retrieved even if every waiter was cancelled
+        logging.debug(f"[SingleFlight] {inflight_key[0]}:{inflight_key[1]} failed: {task.exception()}")
+
+
+def single_flight_stats() -> dict:
+    """Per-namespace call/coalesced counters plus currently in-flight keys."""
+    return {
+        ns: {**counts, 'inflight': sum(1 for n, _ in _inflight if n == ns)}
+        for ns, counts in _stats.items()
+    }
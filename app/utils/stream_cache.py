@@ -0,0 +1,94 @@
+"""Server-side cache of extracted player streams, keyed by (slug, episode, vip).
+
+Each player is cached separately with its own TTL (extracted URLs are signed
+and expire at different rates per host). Failed players are never cached, so
+the next request re-extracts only what failed or expired.
+"""
+import logging
+import time
+import orjson
+from config import Config
+from app.db import execute
+from app.utils.lru import ByteLRU
+
+# Per-host lifetime of an extracted URL (seconds); hosts not listed use STREAM_CACHE_TTL
+_PLAYER_TTLS = {
+    'filemoon': 300,  # 5 min, short-lived signed HLS
+    'streamtape': 300,  # 5 min, tokenised links
+    'vk': 1800,  # 30 min
+    'gdrive': 1800,  # 30 min
+    'rumble': 3600,  # 1 hour
+}
+_mem_cache = ByteLRU(4 * 1024 * 1024, 'streams')  # cache_key -> {player_url: {'stream': dict, 'ts': int}}
+_stats = {'hits': 0, 'partial': 0, 'misses': 0, 'players_reused': 0, 'players_extracted': 0}
+
+
+def _cache_key(slug: str, episode, is_vip: bool) -> str:
+    return f"{slug}:{episode}:{1 if is_vip else 0}"
+
+
+def _player_ttl(player_hosting: str) -> int:
+    return _PLAYER_TTLS.get(player_hosting, Config.STREAM_CACHE_TTL)
+
+
+def _fresh_only(entries: dict) -> dict:
+    now = time.time()
+    return {
+        url: e for url, e in entries.items()
+        if now - e['ts'] < _player_ttl(e['stream'].get('player_hosting', ''))
+    }
+
+
+def stream_cache_stats() -> dict:
+    return {**_stats, 'mem': _mem_cache.stats()}
+
+
+async def get_cached_streams(slug: str, episode, is_vip: bool) -> dict:
+    """Return {player_url: stream} for players whose extracted stream is still fresh."""
+    if not Config.STREAM_CACHE_TTL:
+        return {}
+    key = _cache_key(slug, episode, is_vip)
+    entries = _mem_cache.get(key)
+    if entries is None:
+        try:
+            rows = await execute("SELECT players FROM stream_cache WHERE cache_key=?", (key,))
+        except Exception as e:
+            logging.warning(f"[StreamCache] DB read failed for {key}: {e}")
+            rows = None
+        entries = orjson.loads(rows[0]['players']) if rows else {}
+    entries = _fresh_only(entries)
+    if entries:
+        _mem_cache[key] = entries
+    return {url: e['stream'] for url, e in entries.items()}
+
+
+async def save_streams(slug: str, episode, is_vip: bool, cached: dict, extracted: dict, total: int):
+    """Merge newly extracted streams with still-fresh cached ones and persist them.
+
+    cached/extracted: {player_url: stream} (extracted contains successful players only).
+    total: number of players on the episode (for hit/partial/miss accounting).
+    """
+    _stats['players_reused'] += len(cached)
+    _stats['players_extracted'] += total - len(cached)
+    if cached and len(cached) == total:
+        _stats['hits'] += 1
+    elif cached:
+        _stats['partial'] += 1
+    else:
+        _stats['misses'] += 1
+
+    if not extracted or not Config.STREAM_CACHE_TTL:
+        return
+    key = _cache_key(slug, episode, is_vip)
+    now = int(time.time())
+    entries = _fresh_only(_mem_cache.peek(key) or {})
+    entries.update({url: {'stream': s, 'ts': now} for url, s in extracted.items()})
+    players_json = orjson.dumps(entries).decode()
+    _mem_cache.put(key, entries, size=len(players_json))
+    try:
+        await execute(
+            "INSERT OR REPLACE INTO stream_cache (cache_key, players, timestamp) VALUES (?,?,?)",
+            (key, players_json, now)
+        )
+    except Exception as e:
+        logging.warning(f"[StreamCache] DB write failed for {key}: {e}")
@@ -4,12 +4,18 @@ Free tier: 20 RPM, 1000 RPD (with $10+ credits purchased).
 On failure (429/error), returns None — caller should serve English text and cache briefly.
 
 Strategy: batch multiple texts into single API calls to minimize RPM usage.
+Every text is first looked up in the translation memory (a table keyed by a
+hash of the whitespace-normalised English source), so recap titles, generic
+"Episode N" titles and overviews shared between split-cour entries are only
+sent to the model once; successful translations are added to it.
 """
-import asyncio
+import hashlib
 import logging
 import time
 import aiohttp
 from config import Config
+from app.db import execute, execute_batch
+from app.utils.http_sessions import http_session
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 TIMEOUT = aiohttp.ClientTimeout(total=60)
@@ -41,11 +47,6 @@ BATCH_TRANSLATE_PROMPT = (
     "Now translate the following. Use EXACTLY the format above (TITLE: and DESC: headers, --- separator):\n\n"
 )
 
-# Rate limiting: sliding window, 20 RPM max
-_request_times: list[float] = []
-_MAX_RPM = 18  # stay slightly under 20
-_WINDOW = 60.0
-
 
 # Patterns that indicate AI prompt leakage in translation output
 _CORRUPTION_PATTERNS = [
@@ -62,6 +63,57 @@ _CORRUPTION_PATTERNS = [
 ]
 
 
+_tm_stats = {'lookups': 0, 'saved': 0, 'saved_chars': 0, 'stored': 0}
+
+
+def translation_memory_stats() -> dict:
+    """Translations served from memory instead of the model (since process start)."""
+    return dict(_tm_stats)
+
+
+def _tm_key(text: str) -> str:
+    return hashlib.sha1(" ".join(text.split()).encode()).hexdigest()
+
+
+async def _tm_lookup(texts: list[str]) -> dict[str, str]:
+    """Known translations for texts, keyed by source hash."""
+    keys = list({_tm_key(t) for t in texts if t and t.strip()})
+    if not keys:
+        return {}
+    _tm_stats['lookups'] += len(keys)
+    try:
+        placeholders = ",".join("?" * len(keys))
+        rows = await execute(
+            f"SELECT src_hash, translation FROM translation_memory WHERE src_hash IN ({placeholders})", tuple(keys)
+        )
+    except Exception as e:
+        logging.warning(f"[Translate] memory lookup failed: {e}")
+        return {}
+    return {row['src_hash']: row['translation'] for row in rows or []}
+
+
+def _tm_saved(text: str):
+    _tm_stats['saved'] += 1
+    _tm_stats['saved_chars'] += len(text)
+
+
+async def _tm_store(pairs: list[tuple[str, str | None]]):
+    """Remember successful (source, translation) pairs."""
+    now = int(time.time())
+    rows = {_tm_key(src): dst for src, dst in pairs if src and src.strip() and dst}
+    if not rows:
+        return
+    try:
+        await execute_batch([
+            ("INSERT OR REPLACE INTO translation_memory (src_hash, translation, timestamp) VALUES (?,?,?)",
+             (key, dst, now))
+            for key, dst in rows.items()
+        ])
+        _tm_stats['stored'] += len(rows)
+    except Exception as e:
+        logging.warning(f"[Translate] memory write failed: {e}")
+
+
 def _is_corrupted(text: str) -> bool:
     """Check if translated text contains AI prompt leakage."""
     if not text:
@@ -72,27 +124,12 @@ def _is_corrupted(text: str) -> bool:
     return False
 
 
-def _acquire_rate_slot():
-    """Synchronous sliding window check. Returns seconds to wait, or 0 if slot available."""
-    now = time.time()
-    while _request_times and _request_times[0] < now - _WINDOW:
-        _request_times.pop(0)
-    if len(_request_times) >= _MAX_RPM:
-        return _request_times[0] + _WINDOW - now + 0.1
-    _request_times.append(now)
-    return 0
-
-
 async def _openrouter_request(prompt_text: str) -> str | None:
     """Make a single rate-limited request to OpenRouter API with fallback model."""
     if not Config.OPENROUTER_API_KEY:
         return None
 
-    wait = _acquire_rate_slot()
-    if wait > 0:
-        await asyncio.sleep(wait)
-        _request_times.append(time.time())
-
+    # 20 RPM budget is enforced by the 'translate' token bucket (app.utils.rate_limit)
     headers = {
         "Authorization": f"Bearer {Config.OPENROUTER_API_KEY}",
         "Content-Type": "application/json",
@@ -107,7 +144,7 @@ async def _openrouter_request(prompt_text: str) -> str | None:
         }
 
         try:
-            async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+            async with http_session('translate', TIMEOUT) as session:
                 async with session.post(OPENROUTER_URL, json=payload, headers=headers) as resp:
                     if resp.status == 429:
                         logging.warning(f"OpenRouter translation rate limited (429) on {model}")
@@ -134,6 +171,16 @@ async def translate_to_polish(text: str) -> str | None:
     """Translate a single text from English to Polish."""
     if not text or not Config.OPENROUTER_API_KEY:
         return None
+    known = (await _tm_lookup([text])).get(_tm_key(text))
+    if known:
+        _tm_saved(text)
+        return known
+    result = await _translate_one(text)
+    await _tm_store([(text, result)])
+    return result
+
+
+async def _translate_one(text: str) -> str | None:
     result = await _openrouter_request(f"{TRANSLATE_PROMPT}{text}")
     if result and _is_corrupted(result):
         logging.warning(f"[Translate] Corrupted single translation detected, discarding")
@@ -149,8 +196,27 @@ async def batch_translate_to_polish(texts: list[str]) -> list[str | None]:
     if not Config.OPENROUTER_API_KEY or not texts:
         return [None] * len(texts)
 
+    known = await _tm_lookup(texts)
+    pending = {}  # source hash -> text, for texts the memory does not know yet
+    for text in texts:
+        if not text or not text.strip():
+            continue
+        key = _tm_key(text)
+        if key in known:
+            _tm_saved(text)
+        elif key not in pending:
+            pending[key] = text
+    pending = list(pending.values())
+    if pending:
+        translated = await _batch_translate_uncached(pending)
+        await _tm_store(list(zip(pending, translated)))
+        known.update({_tm_key(src): dst for src, dst in zip(pending, translated) if dst})
+    return [known.get(_tm_key(t)) if t and t.strip() else None for t in texts]
+
+
+async def _batch_translate_uncached(texts: list[str]) -> list[str | None]:
     if len(texts) == 1:
-        result = await translate_to_polish(texts[0])
+        result = await _translate_one(texts[0])
         return [result]
 
     BATCH_SIMPLE_PROMPT = (
@@ -178,7 +244,7 @@ async def batch_translate_to_polish(texts: list[str]) -> list[str | None]:
         logging.warning(f"[Translate] Batch mismatch: expected {len(texts)} parts, got {len(parts)}. Falling back to individual.")
         results = []
         for text in texts:
-            r = await translate_to_polish(text)
+            r = await _translate_one(text)
             results.append(r)
         return results
     translations = []
@@ -209,6 +275,41 @@ async def batch_translate_episodes(episodes: list[dict]) -> list[dict]:
     if not Config.OPENROUTER_API_KEY or not episodes:
         return [{"title": None, "overview": None}] * len(episodes)
 
+    known = await _tm_lookup([t for ep in episodes for t in (ep.get("title"), ep.get("overview")) if t])
+
+    def _from_memory(text):
+        return known.get(_tm_key(text)) if text and text.strip() else None
+
+    results, pending = [], []
+    for i, ep in enumerate(episodes):
+        title, overview = ep.get("title"), ep.get("overview")
+        cached = {"title": _from_memory(title), "overview": _from_memory(overview)}
+        for field, text in (("title", title), ("overview", overview)):
+            if text and cached[field]:
+                _tm_saved(text)
+        if (title and not cached["title"]) or (overview and not cached["overview"]):
+            pending.append(i)
+        results.append(cached)
+
+    if pending:
+        # Only the fields the memory does not know go to the model
+        todo = [{
+            "title": None if results[i]["title"] else episodes[i].get("title"),
+            "overview": None if results[i]["overview"] else episodes[i].get("overview"),
+        } for i in pending]
+        translated = await _batch_translate_episodes_uncached(todo)
+        await _tm_store([
+            pair for ep, tr in zip(todo, translated)
+            for pair in ((ep["title"], tr["title"]), (ep["overview"], tr["overview"]))
+        ])
+        for i, ep, tr in zip(pending, todo, translated):
+            for field in ("title", "overview"):
+                if ep[field]:
+                    results[i][field] = tr[field]
+    return results
+
+
+async def _batch_translate_episodes_uncached(episodes: list[dict]) -> list[dict]:
     # Build structured prompt
     parts = []
     for ep in episodes:
@@ -0,0 +1,80 @@
+"""Bytes moved and decode time of cached rows: JSON text vs zlib vs zstd blobs.
+
+Uses synthetic rows shaped like the real meta_cache / videos_cache /
+season_episodes_cache values (no DB or network needed):
+
+    python benchmarks/blob_codec.py [--episodes 500] [--rounds 200]
+"""
+import argparse
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+from app.utils import blob_codec  # noqa: E402
+
+_OVERVIEW = ("The crew of the ship drifts toward the outer colonies while an old rival "
+             "closes in, forcing a choice between the mission and the people aboard. ")
+
+
+def _videos(episodes: int) -> dict:
+    return {"v": [{
+        "id": f"mal:1:{(n - 1) // 25 + 1}:{n}", "title": f"Episode {n}: Chapter {n * 7 % 31}",
+        "season": (n - 1) // 25 + 1, "episode": n, "released": f"20{10 + n % 14:02d}-04-{1 + n % 28:02d}T00:00:00.000Z",
+        "thumbnail": f"https://artworks.thetvdb.com/banners/v4/episode/{9000000 + n}/screencap/{n:x}.jpg",
+        "overview": _OVERVIEW * (1 + n % 3),
+    } for n in range(1, episodes + 1)], "sp": [f"https://artworks.thetvdb.com/banners/v4/season/{s}/posters/a.jpg"
+                                           for s in range(1, episodes // 25 + 2)]}
+
+
+def _meta() -> dict:
+    return {
+        "id": "mal:1", "type": "series", "name": "Benchmark Anime", "description": _OVERVIEW * 6,
+        "genres": ["Action", "Sci-Fi", "Drama"], "releaseInfo": "2012-2016", "imdbRating": "8.4",
+        "poster": "https://cdn.myanimelist.net/images/anime/1/1.jpg", "background": "https://fanart.tv/x.jpg",
+        "logo": "https://fanart.tv/logo.png", "links": [{"name": "MAL", "category": "Links", "url": "https://myanimelist.net/anime/1"}],
+        "status": "Finished", "runtime": "24 min",
+    }
+
+
+def _encoders() -> list:
+    encoders = [
+        ("json text", lambda v: orjson.dumps(v).decode(), orjson.loads),
+        ("zlib blob", lambda v: b"DC\x01l" + zlib.compress(orjson.dumps(v), 6), blob_codec.decode),
+    ]
+    if blob_codec.zstandard:
+        encoders.append(("zstd blob", blob_codec.encode, blob_codec.decode))
+    else:
+        print("zstandard not installed — zstd column skipped")
+    return encoders
+
+
+def _bench(label: str, value, rounds: int):
+    print(f"\n{label}")
+    base = None
+    for name, enc, dec in _encoders():
+        data = enc(value)
+        size = len(data.encode() if isinstance(data, str) else data)
+        base = base or size
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            dec(data)
+        decode_us = (time.perf_counter() - t0) / rounds * 1e6
+        print(f"  {name:<10} {size:>9} bytes ({size / base:6.1%})  decode {decode_us:8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    _bench("meta_cache row", _meta(), args.rounds)
+    _bench(f"videos_cache row ({args.episodes} episodes)", _videos(args.episodes), args.rounds)
+    _bench(f"season_episodes_cache row ({args.episodes} episodes)", _videos(args.episodes)["v"], args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Wall time of a long TVDB episode listing: sequential vs concurrent page fetches.
+
+Runs against a local fake TVDB (aiohttp server with a fixed per-request
+latency), so no API key or network is needed:
+
+    python benchmarks/tvdb_pages.py [--episodes 1150] [--long-episodes 11000] [--latency 0.15]
+
+The long case (~22 pages) is where the concurrent fetch pays off; the peak
+in-flight column shows the semaphore holding each listing to _PAGE_CONCURRENCY
+(pol+eng run side by side, so up to twice that, within the tvdb session's
+per-host connection limit). Each round starts from a fresh tvdb token bucket,
+like a listing on an idle worker.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+from config import Config  # noqa: E402
+from app.api import tvdb  # noqa: E402
+from app.utils import rate_limit  # noqa: E402
+from app.utils.http_sessions import close_sessions  # noqa: E402
+
+PAGE_SIZE = 500
+
+_in_flight = 0
+_peak_in_flight = 0
+
+
+def _fake_tvdb(latency: float) -> web.Application:
+    async def login(request):
+        return web.json_response({"data": {"token": "bench"}})
+
+    async def episodes(request):
+        global _in_flight, _peak_in_flight
+        _in_flight += 1
+        _peak_in_flight = max(_peak_in_flight, _in_flight)
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            _in_flight -= 1
+        total_episodes = int(request.match_info["tvdb_id"])  # series id doubles as its length
+        page = int(request.query.get("page", 0))
+        start = page * PAGE_SIZE
+        numbers = range(start + 1, min(start + PAGE_SIZE, total_episodes) + 1)
+        base = f"http://{request.host}{request.path}"
+        return web.json_response({
+            "data": {"episodes": [
+                {"id": n, "number": n, "seasonNumber": 1 + (n - 1) // 50, "name": f"Episode {n}"}
+                for n in numbers
+            ]},
+            "links": {
+                "next": f"{base}?page={page + 1}" if start + PAGE_SIZE < total_episodes else None,
+                "total_items": total_episodes,
+                "page_size": PAGE_SIZE,
+            },
+        })
+
+    app = web.Application()
+    app.router.add_post("/v4/login", login)
+    app.router.add_get("/v4/series/{tvdb_id}/episodes/default/{lang}", episodes)
+    return app
+
+
+async def _timed(label: str, total_episodes: int, concurrency: int, rounds: int) -> float:
+    global _peak_in_flight
+    tvdb._PAGE_CONCURRENCY = concurrency
+    _peak_in_flight = 0
+    best = None
+    for _ in range(rounds):
+        rate_limit._buckets.pop('tvdb', None)
+        t0 = time.perf_counter()
+        episodes = await tvdb.get_series_episodes(total_episodes, lang="pol")
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<24} {len(episodes):>6} episodes  {best * 1000:8.1f} ms (best of {rounds})"
+          f"  peak in-flight {_peak_in_flight}")
+    return best
+
+
+async def _compare(total_episodes: int, concurrency: int, rounds: int):
+    pages = -(-total_episodes // PAGE_SIZE)
+    print(f"\n{total_episodes} episodes ({pages} pages)")
+    sequential = await _timed("sequential (1 page)", total_episodes, 1, rounds)
+    concurrent = await _timed(f"concurrent ({concurrency} pages)", total_episodes, concurrency, rounds)
+    print(f"speedup: {sequential / concurrent:.2f}x")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=1150, help="episodes in the fake series (One Piece-sized)")
+    parser.add_argument("--long-episodes", type=int, default=11000, help="episodes in the long case (~22 pages)")
+    parser.add_argument("--latency", type=float, default=0.15, help="seconds per fake TVDB request")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    runner = web.AppRunner(_fake_tvdb(args.latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    tvdb.BASE_URL = f"http://127.0.0.1:{port}/v4"
+    Config.TVDB_API_KEY = Config.TVDB_API_KEY or "bench"
+    concurrency = tvdb._PAGE_CONCURRENCY
+    print(f"fake TVDB: {PAGE_SIZE}/page, {args.latency * 1000:.0f} ms/request, pol+eng")
+    try:
+        await _compare(args.episodes, concurrency, args.rounds)
+        await _compare(args.long_episodes, concurrency, args.rounds)
+    finally:
+        await close_sessions()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -15,6 +15,7 @@ class Config:
     STREAM_PROXY_URL = os.getenv('STREAM_PROXY_URL', "")  # MediaFlow Proxy
     STREAM_PROXY_PASSWORD = os.getenv('STREAM_PROXY_PASSWORD', "")  # MediaFlowProxy API_PASSWORD
     VIP_PATH = os.getenv('VIP_PATH', 'vip')  # Secret path for VIP users with proxy access
+    INTERNAL_STATS_KEY = os.getenv('INTERNAL_STATS_KEY', '')  # X-Internal-Key for /internal/stats (endpoint disabled when empty)
     FORCE_VIP_PLAYERS = os.getenv('FORCE_VIP_PLAYERS', 'false').lower() in ('true', '1', 'yes')  # Make VIP-only players available for all users
     MAL_CLIENT_ID = os.getenv('MAL_CLIENT_ID', '')  # MyAnimeList API Client ID
     FANART_API_KEY = os.getenv('FANART_API_KEY', '')  # fanart.tv API key (optional)
@@ -30,10 +31,27 @@ class Config:
     # Redis for anime mapping
     USE_REDIS = os.getenv('USE_REDIS', 'false').lower() in ('true', '1', 'yes')
     REDIS_URL = os.getenv('REDIS_URL', '')
+    MAPPING_INDEX_FILE = os.getenv('MAPPING_INDEX_FILE', '')  # binary ID index path (default: data/anime-mapping.idx)
 
     # Turso for meta cache
     TURSO_URL = os.getenv('TURSO_URL', '')
     TURSO_TOKEN = os.getenv('TURSO_TOKEN', '')
+    TURSO_POOL_SIZE = int(os.getenv('TURSO_POOL_SIZE', '4'))  # persistent Turso clients kept open
+    META_MEM_CACHE_MB = float(os.getenv('META_MEM_CACHE_MB', '8'))  # in-process meta LRU budget
+    VIDEOS_MEM_CACHE_MB = float(os.getenv('VIDEOS_MEM_CACHE_MB', '24'))  # in-process videos LRU budget
+    # Stale-while-revalidate: serve expired entries for up to N seconds past TTL while refreshing (0 = off)
+    SWR_META_MAX_STALE = int(os.getenv('SWR_META_MAX_STALE', str(86400 * 7)))  # 7 days
+    SWR_VIDEOS_MAX_STALE = int(os.getenv('SWR_VIDEOS_MAX_STALE', '21600'))  # 6 hours
+    STREAM_CACHE_TTL = int(os.getenv('STREAM_CACHE_TTL', '600'))  # default per-player stream cache TTL (0 = off)
+    DOCCHI_CACHE_DB = os.getenv('DOCCHI_CACHE_DB', 'true').lower() in ('true', '1', 'yes')  # persist long-lived Docchi responses
+    SIMKL_CACHE_TTL = int(os.getenv('SIMKL_CACHE_TTL', '604800'))  # 1 week, found and not-found lookups
+    KITSU_CACHE_TTL = int(os.getenv('KITSU_CACHE_TTL', '86400'))  # 1 day, bulk subtype/episodeCount/images
+    NEGATIVE_CACHE_BASE_TTL = int(os.getenv('NEGATIVE_CACHE_BASE_TTL', '600'))  # 10 min, first miss of an unresolvable ID
+    NEGATIVE_CACHE_MAX_TTL = int(os.getenv('NEGATIVE_CACHE_MAX_TTL', '86400'))  # 1 day, cap after repeated misses
+    CATALOG_PREWARM = os.getenv('CATALOG_PREWARM', 'true').lower() in ('true', '1', 'yes')  # rebuild fixed catalogs in background
+    SHARED_CACHE = os.getenv('SHARED_CACHE', 'auto').lower()  # cross-worker L2: auto | redis | sqlite | off
+    SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', '/tmp/shared_cache.db')  # sqlite L2 file
+    WEB_CONCURRENCY = max(1, int(os.getenv('WEB_CONCURRENCY', '1')))  # uvicorn workers; upstream rate budgets are split between them
 
     # Env dependent configs
     if DEBUG in ["1", True, "True"]:  # Local development
@@ -11,12 +11,13 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import FileResponse
 
-from app.routes.catalog import catalog_router
+from app.routes.catalog import catalog_router, start_catalog_prewarm, stop_catalog_prewarm
 from app.routes.manifest import manifest_router
 from app.routes.meta import meta_router
 from app.routes.stream import stream_router
 from app.routes.translate import translate_router
-from app.utils.anime_mapping import load_mapping
+from app.routes.stats import stats_router
+from app.utils.anime_mapping import load_mapping, close_mapping
 from config import Config
 from version import __version__
 
@@ -49,8 +50,9 @@ templates = Jinja2Templates(directory="templates")
 async def lifespan(app: FastAPI):
     # Startup
     load_mapping()
-    # Ensure season_episodes_cache table exists (Turso migration)
-    from app.db import execute
+    from app.db import execute, init_db, close_db
+    await init_db()
+    # Ensure cache tables exist (Turso migration)
     await execute("""
         CREATE TABLE IF NOT EXISTS season_episodes_cache (
             cache_key TEXT PRIMARY KEY,
@@ -58,9 +60,117 @@ async def lifespan(app: FastAPI):
             timestamp INTEGER
         )
     """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS stream_cache (
+            cache_key TEXT PRIMARY KEY,
+            players TEXT,
+            timestamp INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS docchi_cache (
+            url TEXT PRIMARY KEY,
+            status INTEGER,
+            body TEXT,
+            expires_at INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS anilist_media (
+            anilist_id INTEGER PRIMARY KEY,
+            mal_id INTEGER,
+            node TEXT,
+            timestamp INTEGER
+        )
+    """)
+    await execute("CREATE INDEX IF NOT EXISTS idx_anilist_media_mal ON anilist_media(mal_id)")
+    await execute("""
+        CREATE TABLE IF NOT EXISTS simkl_cache (
+            cache_key TEXT PRIMARY KEY,
+            value TEXT,
+            expires_at INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS kitsu_cache (
+            kitsu_id TEXT PRIMARY KEY,
+            attrs TEXT,
+            expires_at INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS kitsu_mal_cache (
+            kitsu_id TEXT PRIMARY KEY,
+            mal_id TEXT,
+            expires_at INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS negative_cache (
+            cache_key TEXT PRIMARY KEY,
+            strikes INTEGER,
+            expires_at INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS translation_memory (
+            src_hash TEXT PRIMARY KEY,
+            translation TEXT,
+            timestamp INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS translation_pending (
+            mal_id TEXT,
+            kind TEXT,
+            pending INTEGER,
+            PRIMARY KEY (mal_id, kind)
+        )
+    """)
+    await execute("CREATE INDEX IF NOT EXISTS idx_translation_pending_kind ON translation_pending(kind)")
+    await execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at INTEGER
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS franchise_videos (
+            tvdb_id INTEGER,
+            layout TEXT,
+            videos BLOB,
+            timestamp INTEGER,
+            PRIMARY KEY (tvdb_id, layout)
+        )
+    """)
+    await execute("""
+        CREATE TABLE IF NOT EXISTS videos_pointer (
+            mal_id TEXT PRIMARY KEY,
+            tvdb_id INTEGER,
+            layout TEXT
+        )
+    """)
+    await execute("""
+        CREATE VIEW IF NOT EXISTS videos_view AS
+            SELECT p.mal_id AS mal_id, f.videos AS videos, f.timestamp AS timestamp, f.tvdb_id AS tvdb_id, f.layout AS layout
+            FROM videos_pointer p JOIN franchise_videos f ON f.tvdb_id = p.tvdb_id AND f.layout = p.layout
+            UNION ALL
+            SELECT mal_id, videos, timestamp, NULL, NULL FROM videos_cache
+    """)
+    from app.utils.meta_cache import ensure_translation_pending_index, purge_legacy_season_rows
+    await ensure_translation_pending_index()
+    await purge_legacy_season_rows()
+    start_catalog_prewarm()
     logging.info(f"Starting Docchi Stremio Addon v{__version__}")
     yield
-    # Shutdown (nothing needed)
+    # Shutdown
+    await stop_catalog_prewarm()
+    from app.utils.http_sessions import close_sessions
+    from app.utils.shared_cache import close_shared_cache
+    await close_sessions()
+    await close_shared_cache()
+    await close_db()
+    await close_mapping()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -98,6 +208,7 @@ app.include_router(catalog_router)
 app.include_router(meta_router)
 app.include_router(stream_router)
 app.include_router(translate_router)
+app.include_router(stats_router)
 
 # Register routers with VIP prefix
 app.include_router(manifest_router, prefix=f"/{Config.VIP_PATH}")
@@ -145,19 +256,27 @@ if __name__ == '__main__':
     import sys as _sys
     if '--clear-cache' in _sys.argv:
         import asyncio
-        from app.utils.anime_mapping import _redis_client
+        from app.utils.anime_mapping import _redis_client, _get_sync_redis
         if _redis_client:
-            _redis_client.flushdb()
+            _get_sync_redis().flushdb()
             print("Redis cache cleared")
         from app.db import execute, connection
         if Config.TURSO_URL and Config.TURSO_TOKEN:
             asyncio.run(execute("DELETE FROM meta_cache"))
+            asyncio.run(execute("DELETE FROM translation_pending WHERE kind='meta'"))
             print("Turso meta cache cleared")
         else:
             connection.execute("DELETE FROM meta_cache")
+            connection.execute("DELETE FROM translation_pending WHERE kind='meta'")
             connection.commit()
             print("SQLite meta cache cleared")
         _sys.exit(0)
+    if '--migrate-blobs' in _sys.argv:
+        import asyncio
+        from app.utils.meta_cache import migrate_blob_rows
+        for table, stats in asyncio.run(migrate_blob_rows()).items():
+            print(f"{table}: {stats['rows']} rows, {stats['bytes_before']} -> {stats['bytes_after']} bytes")
+        _sys.exit(0)
 
     import uvicorn
     logging.info(f"Starting Docchi Stremio Addon v{__version__} on http://0.0.0.0:5000")
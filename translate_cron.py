@@ -24,8 +24,11 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(mes
 async def main():
     from app.db import execute
     from app.utils.translate import batch_translate_episodes, batch_translate_to_polish
-    from app.utils.meta_cache import set_cached_videos, set_cached_meta, get_cached_meta
-    import orjson
+    from app.utils.meta_cache import set_cached_videos, set_cached_meta_many, get_sibling_videos, apply_translation_map, _translation_map
+    from app.utils.meta_cache import ensure_translation_pending_index
+    from app.utils import blob_codec
+
+    await ensure_translation_pending_index()
 
     translated_meta = 0
     translated_videos = 0
@@ -34,7 +37,7 @@ async def main():
     # 1. Translate ALL untranslated meta descriptions first (in pages of 10)
     logging.info("[Translate] Checking for untranslated meta descriptions...")
     count_rows = await execute(
-        "SELECT COUNT(*) as cnt FROM meta_cache WHERE meta LIKE '%_untranslated_description%'"
+        "SELECT COUNT(*) as cnt FROM translation_pending WHERE kind='meta'"
     )
     total_meta_to_translate = count_rows[0]['cnt'] if count_rows else 0
     logging.info(f"[Translate] Found {total_meta_to_translate} meta entries to translate")
@@ -42,7 +45,8 @@ async def main():
     consecutive_failures = 0
     while True:
         meta_rows = await execute(
-            "SELECT mal_id, meta FROM meta_cache WHERE meta LIKE '%_untranslated_description%' LIMIT 5"
+            "SELECT m.mal_id, m.meta FROM translation_pending p JOIN meta_cache m ON m.mal_id = p.mal_id "
+            "WHERE p.kind='meta' LIMIT 5"
         )
         if not meta_rows:
             break
@@ -51,15 +55,18 @@ async def main():
         texts = []
         metas = []
         for row in meta_rows:
-            meta = orjson.loads(row['meta'])
+            meta = blob_codec.decode(row['meta'])
             if meta.get('_untranslated_description'):
                 desc = meta.get('description', '')
                 if desc:
                     texts.append(desc)
                     metas.append((row['mal_id'], meta))
+                    continue
+            # Nothing to translate (e.g. backfilled row without description)
+            await execute("DELETE FROM translation_pending WHERE mal_id=? AND kind='meta'", (row['mal_id'],))
 
         if not texts:
-            break
+            continue
 
         # Deduplicate: translate unique texts only, then map back
         unique_texts = list(dict.fromkeys(texts))  # preserves order, removes dupes
@@ -76,13 +83,16 @@ async def main():
         translations = [translations_map.get(t) for t in texts]
 
         page_translated = 0
+        page_updates = {}
         for (mal_id, meta), translated in zip(metas, translations):
             if translated:
                 meta['description'] = translated
                 meta.pop('_untranslated_description', None)
-                await set_cached_meta(str(mal_id), meta)
+                page_updates[str(mal_id)] = meta
                 page_translated += 1
                 logging.info(f"[Translate] Meta translated: mal:{mal_id}")
+        # Save the whole page in one round trip
+        await set_cached_meta_many(page_updates)
 
         total_meta_translated += page_translated
         if page_translated == 0:
@@ -105,14 +115,13 @@ async def main():
 
     # 2. Translate untranslated video episodes
     logging.info("[Translate] Checking for untranslated video episodes...")
-    count_rows = await execute(
-        "SELECT COUNT(*) as cnt FROM videos_cache WHERE videos LIKE '%_untranslated_%'"
-    )
-    total_vids_to_translate = count_rows[0]['cnt'] if count_rows else 0
-    logging.info(f"[Translate] Found {total_vids_to_translate} entries with untranslated episodes")
+    # One row per franchise list (siblings share it through videos_pointer)
     vid_rows = await execute(
-        "SELECT mal_id, videos FROM videos_cache WHERE videos LIKE '%_untranslated_%'"
+        "SELECT MIN(v.mal_id) AS mal_id, v.videos FROM translation_pending p JOIN videos_view v ON v.mal_id = p.mal_id "
+        "WHERE p.kind='videos' GROUP BY COALESCE(v.tvdb_id || ':' || v.layout, v.mal_id)"
     )
+    total_vids_to_translate = len(vid_rows or [])
+    logging.info(f"[Translate] Found {total_vids_to_translate} entries with untranslated episodes")
 
     # Deduplicate: only process one mal_id per tvdb_id to avoid translating same data multiple times
     from app.utils.anime_mapping import get_ids_from_mal_id
@@ -120,7 +129,7 @@ async def main():
     deduplicated_rows = []
     for row in (vid_rows or []):
         mal_id = str(row['mal_id'])
-        ids = get_ids_from_mal_id(mal_id)
+        ids = await get_ids_from_mal_id(mal_id)
         tvdb_id = ids.get('tvdb_id')
         if tvdb_id:
             if tvdb_id in seen_tvdb_ids:
@@ -132,7 +141,7 @@ async def main():
         logging.info(f"[Translate] Deduplicated: {total_vids_to_translate} -> {len(deduplicated_rows)} unique entries")
 
     for row in deduplicated_rows:
-        data = orjson.loads(row['videos'])
+        data = blob_codec.decode(row['videos'])
         # Handle new dict format {"v": [...], "sp": [...]} and old list format
         if isinstance(data, dict) and "v" in data:
             videos = data["v"]
@@ -142,46 +151,15 @@ async def main():
             season_posters = []
         mal_id = str(row['mal_id'])
 
-        # Before translating, check siblings for existing translations
-        from app.utils.anime_mapping import get_ids_from_mal_id, get_all_seasons_for_tvdb_id
-        ids = get_ids_from_mal_id(mal_id)
+        # Before translating, check siblings for existing translations (one query for all siblings)
+        ids = await get_ids_from_mal_id(mal_id)
         if ids.get('tvdb_id'):
-            siblings = get_all_seasons_for_tvdb_id(ids['tvdb_id'])
-            for sibling in siblings:
-                sib_mal = str(sibling.get('mal_id'))
-                if sib_mal and sib_mal != mal_id:
-                    sib_rows = await execute('SELECT videos FROM videos_cache WHERE mal_id=?', (sib_mal,))
-                    if sib_rows:
-                        sib_data = orjson.loads(sib_rows[0]['videos'])
-                        sib_vids = sib_data['v'] if isinstance(sib_data, dict) and 'v' in sib_data else (sib_data if isinstance(sib_data, list) else [])
-                        # Build lookup: vid_id -> translated fields
-                        sib_map = {}
-                        for sv in sib_vids:
-                            sv_id = sv.get('id')
-                            if sv_id:
-                                if sv.get('title') and not sv.get('_untranslated_title'):
-                                    sib_map.setdefault(sv_id, {})['title'] = sv['title']
-                                if sv.get('overview') and not sv.get('_untranslated_overview'):
-                                    sib_map.setdefault(sv_id, {})['overview'] = sv['overview']
-                        # Apply sibling translations to current videos
-                        if sib_map:
-                            applied = 0
-                            for v in videos:
-                                vid_id = v.get('id')
-                                if vid_id and vid_id in sib_map:
-                                    sib = sib_map[vid_id]
-                                    if sib.get('title') and v.get('_untranslated_title'):
-                                        v['title'] = sib['title']
-                                        v.pop('_untranslated_title', None)
-                                        applied += 1
-                                    if sib.get('overview') and v.get('_untranslated_overview'):
-                                        v['overview'] = sib['overview']
-                                        v.pop('_untranslated_overview', None)
-                                        applied += 1
-                            if applied:
-                                logging.info(f"[Translate] mal:{mal_id} - reused {applied} translations from sibling mal:{sib_mal}")
-                                await set_cached_videos(mal_id, videos, 0, season_posters)
-                            break  # one sibling is enough
+            for sib_mal, sib_vids in await get_sibling_videos(mal_id, ids['tvdb_id']):
+                applied = apply_translation_map(videos, _translation_map(sib_vids))
+                if applied:
+                    logging.info(f"[Translate] mal:{mal_id} - reused {applied} translations from sibling mal:{sib_mal}")
+                    await set_cached_videos(mal_id, videos, 0, season_posters)
+                break  # one sibling is enough
 
         # Collect all episodes needing translation (after sibling reuse)
         to_translate = []
@@ -236,7 +214,10 @@ async def main():
         # Respect rate limits — pause between entries (OpenRouter: 20 RPM free tier)
         await asyncio.sleep(5)
 
+    from app.utils.translate import translation_memory_stats
+    tm = translation_memory_stats()
     logging.info(f"[Translate] Finished: {translated_meta} meta + {translated_videos} video fields translated")
+    logging.info(f"[Translate] Translation memory: {tm['saved']} texts ({tm['saved_chars']} chars) reused, {tm['stored']} stored")
 
 
 if __name__ == "__main__":